@@ -2,21 +2,93 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from functools import partial
 import logging
+import time
+from typing import TypeVar
+
 import yaml
 
+from homeassistant.components.network import async_get_source_ip
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_NAME, EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    callback,
+)
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import discovery
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    ARCHIVE_DIR,
+    ARCHIVE_SYNC_INTERVAL,
+    AUDIO_PRIORITIES,
+    AUDIO_PRIORITY_NORMAL,
+    CONF_ARCHIVE_SNAPSHOTS,
+    CONF_COALESCE_WINDOW,
+    CONF_FTP_BIND,
+    CONF_FTP_PORT,
+    CONF_FTP_RECEIVER,
+    CONF_OFFLINE_JOURNAL,
+    CONF_MOTION_REGION,
+    CONF_MOTION_THRESHOLD,
+    CONF_PRE_TRIGGER_FRAMES,
+    CONF_SNAPSHOT_MAX_AGE,
+    DATA_FTP,
+    DATA_HASS_CONFIG,
+    DATA_MEDIA_CACHE,
+    DATA_NOTIFY,
+    DATA_SCHEDULER,
+    DATA_SERVICES,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_MOTION_REGION,
+    DEFAULT_MOTION_THRESHOLD,
+    DEFAULT_POST_TRIGGER_FRAMES,
+    DEFAULT_PRE_TRIGGER_FRAMES,
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    DEFAULT_TIMELAPSE_FPS,
+    DEFAULT_TIMELAPSE_HOURS,
+    DOMAIN,
+    EVENT_SNAPSHOTS_FLUSHED,
+    EVENT_TIMELAPSE_DONE,
+    EVENT_TIMELAPSE_PROGRESS,
+    FTP_DEFAULT_BIND,
+    FTP_DEFAULT_PORT,
+    FTP_REMOTE_DIR,
+    MEDIA_CACHE_DIR,
+    MOOD_DEFAULT_DURATION,
+    POLL_MAX_CONCURRENT,
+    SOUND_DEFAULT_DURATION,
+    TIMELAPSE_DIR,
+    TIMELAPSE_PROGRESS_STEP,
+)
 from .api import OpenKarotzAPI
+from .archive import OpenKarotzPreTriggerBuffer, OpenKarotzSnapshotArchive
+from .audio import OpenKarotzAnnouncementBuffer, OpenKarotzAudioScheduler
+from .catalog import OpenKarotzCatalog, async_update_service_selectors
+from .coordinator import OpenKarotzCoordinator
+from .ftp import OpenKarotzFtpReceiver
+from .journal import OpenKarotzCommandJournal
+from .media import OpenKarotzMediaCache
+from .models import OpenKarotzData
+from .motion import OpenKarotzMotionDetector
+from .snapshot import OpenKarotzSnapshotCache
+from .staging import OpenKarotzSoundStager
+from .view import OpenKarotzMediaView, OpenKarotzSnapshotView
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.LIGHT,
@@ -30,19 +102,271 @@ PLATFORMS: list[Platform] = [
 ]
 
 
+class OpenKarotzPollScheduler:
+    """Stagger polls of all configured devices.
+
+    Every registered coordinator gets its own phase, evenly spread across
+    the poll interval, so a fleet of devices produces a flat request rate
+    instead of polling on the same tick. A semaphore caps the number of
+    polls in flight at once across the whole integration.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = POLL_MAX_CONCURRENT
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._members: list[OpenKarotzCoordinator] = []
+
+    @callback
+    def async_register(self, member: OpenKarotzCoordinator) -> CALLBACK_TYPE:
+        """Register a poller and return a callback that removes it again."""
+        self._members.append(member)
+
+        @callback
+        def _async_remove() -> None:
+            self._members.remove(member)
+
+        return _async_remove
+
+    def phase(self, member: OpenKarotzCoordinator) -> float:
+        """Return the phase of a poller as a fraction of the interval."""
+        try:
+            return self._members.index(member) / len(self._members)
+        except ValueError:
+            return 0.0
+
+    def delay(self, member: OpenKarotzCoordinator, interval: float) -> float:
+        """Return the delay until the next poll slot of a poller.
+
+        Slots repeat every interval at the poller's phase offset. The next
+        slot at least half an interval away is chosen so that consecutive
+        polls stay roughly one interval apart while drifting onto the grid.
+        """
+        offset = self.phase(member) * interval
+        delay = (offset - self.hass.loop.time()) % interval
+        if delay < interval / 2:
+            delay += interval
+        return delay
+
+    async def async_run(self, poll: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a poll once a concurrency slot is free."""
+        async with self._semaphore:
+            return await poll()
+
+
+@callback
+def _async_get_scheduler(hass: HomeAssistant) -> OpenKarotzPollScheduler:
+    """Return the integration-wide poll scheduler."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = OpenKarotzPollScheduler(hass)
+    return hass.data[DATA_SCHEDULER]
+
+
+async def _async_get_ftp_receiver(
+    hass: HomeAssistant, bind: str, port: int
+) -> OpenKarotzFtpReceiver:
+    """Return the FTP receiver listening on an address, starting it if needed."""
+    receivers: dict[tuple[str, int], OpenKarotzFtpReceiver] = hass.data.setdefault(
+        DATA_FTP, {}
+    )
+    if (receiver := receivers.get((bind, port))) is None:
+        receiver = OpenKarotzFtpReceiver(bind, port)
+        await receiver.async_start()
+        receivers[(bind, port)] = receiver
+    return receiver
+
+
+async def _async_release_ftp_account(
+    hass: HomeAssistant, bind: str, port: int, user: str
+) -> None:
+    """Remove an FTP account and stop its receiver once it has none left."""
+    receivers: dict[tuple[str, int], OpenKarotzFtpReceiver] = hass.data[DATA_FTP]
+    receiver = receivers[(bind, port)]
+    receiver.remove_account(user)
+    if not receiver.accounts:
+        del receivers[(bind, port)]
+        await receiver.async_stop()
+
+
+async def _async_get_media_cache(hass: HomeAssistant) -> OpenKarotzMediaCache:
+    """Return the integration-wide media cache, loading it if needed."""
+    if DATA_MEDIA_CACHE not in hass.data:
+        cache = OpenKarotzMediaCache(hass, hass.config.path(MEDIA_CACHE_DIR))
+        hass.data[DATA_MEDIA_CACHE] = cache
+        await cache.async_load()
+
+        async def _async_close_cache(_: Event) -> None:
+            await cache.async_close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_cache)
+    return hass.data[DATA_MEDIA_CACHE]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Open Karotz from a config entry."""
-    from homeassistant.helpers.aiohttp_client import async_get_clientsession
-    
     host = entry.data["host"]
-    session = async_get_clientsession(hass)
 
-    api = OpenKarotzAPI(host, session)
+    # Without a websession the API opens its own keep-alive pool for this
+    # device. Registered first, async_close runs after every other teardown,
+    # and also when setup fails further down.
+    api = OpenKarotzAPI(
+        host,
+        coalesce_window=entry.options.get(
+            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+        ),
+    )
+    entry.async_on_unload(api.async_close)
+    scheduler = _async_get_scheduler(hass)
+    coordinator = OpenKarotzCoordinator(hass, api, scheduler)
+    await scheduler.async_run(coordinator.async_config_entry_first_refresh)
+    # The coordinator registers its own shutdown with the config entry.
+    coordinator.async_schedule_poll()
+
+    catalog = OpenKarotzCatalog(hass, api, entry.entry_id)
+    await catalog.async_load()
+    entry.async_on_unload(catalog.async_shutdown)
+
+    snapshots = OpenKarotzSnapshotCache(
+        api,
+        max_age=entry.options.get(CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE),
+    )
+    entry.async_on_unload(snapshots.async_close)
+
+    motion = OpenKarotzMotionDetector(
+        hass,
+        snapshots,
+        entry.entry_id,
+        threshold=entry.options.get(CONF_MOTION_THRESHOLD, DEFAULT_MOTION_THRESHOLD),
+        region=entry.options.get(CONF_MOTION_REGION, DEFAULT_MOTION_REGION),
+    )
+    entry.async_on_unload(motion.async_disable)
+
+    archive = OpenKarotzSnapshotArchive(
+        hass, api, hass.config.path(ARCHIVE_DIR, entry.entry_id)
+    )
+    await archive.async_load()
+
+    pre_trigger = OpenKarotzPreTriggerBuffer(
+        snapshots,
+        max_frames=entry.options.get(
+            CONF_PRE_TRIGGER_FRAMES, DEFAULT_PRE_TRIGGER_FRAMES
+        ),
+    )
+
+    # Let the device push snapshots over FTP instead of pulling them. Push
+    # is optional, so a receiver that cannot listen leaves HTTP pulls on.
+    receiver: OpenKarotzFtpReceiver | None = None
+    if entry.options.get(CONF_FTP_RECEIVER, False):
+        ftp_bind = entry.options.get(CONF_FTP_BIND, FTP_DEFAULT_BIND)
+        ftp_port = entry.options.get(CONF_FTP_PORT, FTP_DEFAULT_PORT)
+        try:
+            receiver = await _async_get_ftp_receiver(hass, ftp_bind, ftp_port)
+        except OSError as err:
+            _LOGGER.warning(
+                "Unable to start FTP receiver on %s:%s, pulling snapshots instead: %s",
+                ftp_bind,
+                ftp_port,
+                err,
+            )
+    if receiver is not None:
+        user = f"karotz_{entry.entry_id}"
+
+        async def _async_handle_upload(name: str, image: bytes) -> None:
+            snapshots.push(image)
+            if entry.options.get(CONF_ARCHIVE_SNAPSHOTS, False):
+                await archive.async_add(image)
+
+        password = receiver.add_account(user, _async_handle_upload)
+        entry.async_on_unload(
+            partial(_async_release_ftp_account, hass, ftp_bind, ftp_port, user)
+        )
+        server = await async_get_source_ip(hass, target_ip=host)
+        if ftp_port != FTP_DEFAULT_PORT:
+            server = f"{server}:{ftp_port}"
+        snapshots.set_push_trigger(
+            partial(api.snapshot_ftp, server, user, password, FTP_REMOTE_DIR)
+        )
+
+    media_cache = await _async_get_media_cache(hass)
+    api.set_url_rewriter(media_cache.local_url)
+    staging = OpenKarotzSoundStager(
+        hass, entry.entry_id, media_cache, catalog, coordinator
+    )
+    await staging.async_load()
+    api.set_sound_router(staging.route)
+    entry.async_on_unload(staging.async_close)
+
+    journal: OpenKarotzCommandJournal | None = None
+    if entry.options.get(CONF_OFFLINE_JOURNAL, False):
+        journal = OpenKarotzCommandJournal(hass, api, entry.entry_id)
+        await journal.async_load()
+        entry.async_on_unload(journal.async_close)
+        if api.available:
+            journal.async_schedule_replay()
+
+    audio = OpenKarotzAudioScheduler(api)
+    entry.async_on_unload(audio.async_close)
+    announcements = OpenKarotzAnnouncementBuffer(audio)
+    entry.async_on_unload(announcements.async_close)
+
+    data = OpenKarotzData(
+        api=api,
+        coordinator=coordinator,
+        catalog=catalog,
+        snapshots=snapshots,
+        motion=motion,
+        archive=archive,
+        pre_trigger=pre_trigger,
+        audio=audio,
+        announcements=announcements,
+        staging=staging,
+        journal=journal,
+    )
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = api
-    entry.runtime_data = api
+    hass.data[DOMAIN][entry.entry_id] = data
+    entry.runtime_data = data
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Notify has no config entry support yet, so it is set up by discovery.
+    # Legacy services can not be removed per entry, so each entry is only
+    # discovered once and its service finds the live data on every message.
+    notify_entries: set[str] = hass.data.setdefault(DATA_NOTIFY, set())
+    if entry.entry_id not in notify_entries:
+        notify_entries.add(entry.entry_id)
+        hass.async_create_task(
+            discovery.async_load_platform(
+                hass,
+                Platform.NOTIFY,
+                DOMAIN,
+                {CONF_NAME: entry.title, "entry_id": entry.entry_id},
+                hass.data.get(DATA_HASS_CONFIG, {}),
+            )
+        )
+
+    @callback
+    def _async_update_selectors(*_: str) -> None:
+        async_update_service_selectors(hass, hass.data.get(DATA_SERVICES), catalog)
+
+    _async_update_selectors()
+    entry.async_on_unload(catalog.async_add_listener(_async_update_selectors))
+    catalog.async_ensure_fresh()
+
+    # Syncing clears the snapshots on the device, so it is opt-in.
+    if entry.options.get(CONF_ARCHIVE_SNAPSHOTS, False):
+
+        async def _async_sync_archive(_now: datetime) -> None:
+            await archive.async_sync()
+
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                _async_sync_archive,
+                timedelta(seconds=ARCHIVE_SYNC_INTERVAL),
+                name=f"{DOMAIN} snapshot archive",
+            )
+        )
 
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
@@ -63,6 +387,34 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     except yaml.YAMLError as err:
         _LOGGER.error("Error parsing services.yaml: %s", err)
         return False
+    # Kept so the selectors can be refreshed from the device catalogs.
+    hass.data[DATA_SERVICES] = services_config
+    hass.data[DATA_HASS_CONFIG] = config
+    if hass.http is not None:
+        hass.http.register_view(OpenKarotzSnapshotView())
+        hass.http.register_view(OpenKarotzMediaView())
+
+    def _async_get_data() -> OpenKarotzData:
+        """Return the runtime data of the first configured device."""
+        entries = hass.config_entries.async_entries(DOMAIN)
+        if not entries:
+            raise HomeAssistantError("No Open Karotz devices configured")
+
+        data = hass.data.get(DOMAIN, {}).get(entries[0].entry_id)
+        if not data:
+            raise HomeAssistantError("Open Karotz not initialized")
+        return data
+
+    def _async_get_api() -> OpenKarotzAPI:
+        """Return the API of the first configured device."""
+        return _async_get_data().api
+
+    def _get_priority(service_call: ServiceCall) -> str:
+        """Return the audio priority requested by a service call."""
+        priority = service_call.data.get("priority", AUDIO_PRIORITY_NORMAL)
+        if priority not in AUDIO_PRIORITIES:
+            raise HomeAssistantError(f"Invalid priority: {priority}")
+        return priority
 
     # Service handlers
     async def async_open_karotz_tts_service(service_call: ServiceCall) -> None:
@@ -73,16 +425,11 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if not text:
             raise HomeAssistantError("Text is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        data = _async_get_data()
+        priority = _get_priority(service_call)
 
         try:
-            await api.play_tts(text, voice)
+            await data.audio.async_play_tts(text, voice, priority)
         except Exception as err:
             raise HomeAssistantError(f"Failed to play TTS: {err}")
 
@@ -93,19 +440,16 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if not sound_id:
             raise HomeAssistantError("sound_id is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        data = _async_get_data()
+        priority = _get_priority(service_call)
 
         try:
-            await api.play_sound(sound_id)
+            await data.audio.async_play(
+                partial(data.api.play_sound, sound_id),
+                sound_id,
+                SOUND_DEFAULT_DURATION,
+                priority,
+            )
         except Exception as err:
             raise HomeAssistantError(f"Failed to play sound: {err}")
 
@@ -116,16 +460,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if volume is None:
             raise HomeAssistantError("volume is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.set_volume(volume)
@@ -139,16 +474,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if rgb_color is None:
             raise HomeAssistantError("rgb_color is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.set_led_color(rgb_color)
@@ -162,16 +488,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if position is None:
             raise HomeAssistantError("position is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.set_ear_position_single(position)
@@ -185,34 +502,22 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         if mood_id is None:
             raise HomeAssistantError("mood_id is required")
 
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        data = _async_get_data()
+        priority = _get_priority(service_call)
 
         try:
-            await api.set_mood(mood_id)
+            await data.audio.async_play(
+                partial(data.api.set_mood, mood_id),
+                f"Mood {mood_id}",
+                MOOD_DEFAULT_DURATION,
+                priority,
+            )
         except Exception as err:
             raise HomeAssistantError(f"Failed to set mood: {err}")
 
     async def async_open_karotz_wake_up_service(service_call: ServiceCall) -> None:
         """Handle wake_up service call."""
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.wake_up()
@@ -221,16 +526,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     async def async_open_karotz_sleep_service(service_call: ServiceCall) -> None:
         """Handle sleep service call."""
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.sleep()
@@ -239,22 +535,84 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     async def async_open_karotz_clear_cache_service(service_call: ServiceCall) -> None:
         """Handle clear_cache service call."""
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("No Open Karotz devices configured")
-
-        api = entries[0].runtime_data if hasattr(entries[0], "runtime_data") else None
-        if api is None:
-            api = hass.data[DOMAIN].get(entries[0].entry_id)
-
-        if not api:
-            raise HomeAssistantError("Open Karotz not initialized")
+        api = _async_get_api()
 
         try:
             await api.clear_cache()
         except Exception as err:
             raise HomeAssistantError(f"Failed to clear cache: {err}")
 
+    async def async_open_karotz_flush_snapshots_service(
+        service_call: ServiceCall,
+    ) -> None:
+        """Handle flush_snapshots service call."""
+        data = _async_get_data()
+        post_frames = int(
+            service_call.data.get("post_frames", DEFAULT_POST_TRIGGER_FRAMES)
+        )
+
+        try:
+            entries = await data.pre_trigger.async_flush(data.archive, post_frames)
+        except OSError as err:
+            raise HomeAssistantError(f"Failed to flush snapshots: {err}")
+
+        hass.bus.async_fire(
+            EVENT_SNAPSHOTS_FLUSHED,
+            {"files": [data.archive.file_path(entry) for entry in entries]},
+        )
+
+    async def async_open_karotz_build_timelapse_service(
+        service_call: ServiceCall,
+    ) -> None:
+        """Handle build_timelapse service call."""
+        data = _async_get_data()
+        hours = float(service_call.data.get("hours", DEFAULT_TIMELAPSE_HOURS))
+        fps = float(service_call.data.get("fps", DEFAULT_TIMELAPSE_FPS))
+        if hours <= 0 or fps <= 0:
+            raise HomeAssistantError("hours and fps must be positive")
+
+        now = dt_util.utcnow()
+        path = hass.config.path(
+            TIMELAPSE_DIR,
+            hass.config_entries.async_entries(DOMAIN)[0].entry_id,
+            f"timelapse_{now:%Y%m%d_%H%M%S}.avi",
+        )
+        reported = -1
+
+        def _progress(done: int, total: int) -> None:
+            """Report progress in steps; called from the executor."""
+            nonlocal reported
+            percent = done * 100 // total
+            if percent // TIMELAPSE_PROGRESS_STEP > reported:
+                reported = percent // TIMELAPSE_PROGRESS_STEP
+                hass.bus.fire(
+                    EVENT_TIMELAPSE_PROGRESS,
+                    {"file": path, "frames": done, "total": total, "percent": percent},
+                )
+
+        started = time.monotonic()
+        try:
+            frames = await data.archive.async_build_timelapse(
+                path,
+                now.timestamp() - hours * 3600,
+                now.timestamp(),
+                fps,
+                _progress,
+            )
+        except (OSError, RuntimeError) as err:
+            raise HomeAssistantError(f"Failed to build timelapse: {err}")
+        if not frames:
+            raise HomeAssistantError("No archived snapshots in the requested period")
+
+        hass.bus.async_fire(
+            EVENT_TIMELAPSE_DONE,
+            {
+                "file": path,
+                "frames": frames,
+                "elapsed": round(time.monotonic() - started, 3),
+            },
+        )
+
     # Register all services with schemas from services.yaml
     if services_config:
         for service_name, service_config in services_config.items():
@@ -344,6 +702,22 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
                     async_open_karotz_clear_cache_service,
                     schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
                 )
+            elif service_name == "flush_snapshots":
+                async_register_admin_service(
+                    hass,
+                    DOMAIN,
+                    service_name,
+                    async_open_karotz_flush_snapshots_service,
+                    schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
+                )
+            elif service_name == "build_timelapse":
+                async_register_admin_service(
+                    hass,
+                    DOMAIN,
+                    service_name,
+                    async_open_karotz_build_timelapse_service,
+                    schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
+                )
 
     return True
 
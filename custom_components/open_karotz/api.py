@@ -1,48 +1,676 @@
 """API module for Open Karotz integration."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 import json
+from enum import StrEnum
 import logging
-from typing import TYPE_CHECKING
+import random
+import re
+import urllib.parse
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import aiohttp
 
-from .const import BASE_URL
+from .const import (
+    BASE_URL,
+    COMMAND_CLASS_EARS,
+    COMMAND_CLASS_LED,
+    COMMAND_CLASS_MOOD,
+    COMMAND_CLASS_POWER,
+    COMMAND_CLASS_VOLUME,
+    CONNECTION_DNS_CACHE_TTL,
+    CONNECTION_KEEPALIVE_TIMEOUT,
+    CONNECTION_LIMIT_PER_HOST,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RECOVERY_TIMEOUT,
+    BREAKER_PROBE_ENDPOINT,
+    BREAKER_RECOVERY_TIMEOUT,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_QUEUE_TIMEOUT,
+    DEFAULT_REQUEST_DEADLINE,
+    DEFAULT_REQUEST_TIMEOUT,
+    ENDPOINT_TIMEOUTS,
+    IDEMPOTENT_ENDPOINTS,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_MAX_ATTEMPTS,
+    SNAPSHOT_CHUNK_SIZE,
+    SNAPSHOT_ENDPOINT,
+    SNAPSHOT_FILE_PATH,
+)
 
 if TYPE_CHECKING:
     from aiohttp import ClientSession
 
 _LOGGER = logging.getLogger(__name__)
 
+RESPONSE_NONE = "none"
+RESPONSE_JSON = "json"
+RESPONSE_IMAGE = "image"
+RESPONSE_TEXT = "text"
+
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+}
+
+
+class KarotzErrorKind(StrEnum):
+    """Why a request to the device failed."""
+
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    HTTP = "http"
+    PARSE = "parse"
+    REJECTED = "rejected"
+    UNAVAILABLE = "unavailable"
+
+
+TRANSIENT_ERRORS = {KarotzErrorKind.TIMEOUT, KarotzErrorKind.CONNECTION}
+
+
+class BreakerState(StrEnum):
+    """State of the per-device circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class KarotzResult:
+    """Outcome of a request to the device."""
+
+    ok: bool
+    status: int | None = None
+    data: Any = None
+    error: KarotzErrorKind | None = None
+    latency: float = 0.0
+    attempts: int = 0
+
+
+class CircuitBreaker:
+    """Track device reachability and decide when requests may be sent.
+
+    After ``failure_threshold`` consecutive transient failures the breaker
+    opens and requests fail immediately. Once the recovery timeout has
+    passed a single probe is allowed (half-open); its outcome closes the
+    breaker again or reopens it with a doubled recovery timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+        max_recovery_timeout: float = BREAKER_MAX_RECOVERY_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self.state = BreakerState.CLOSED
+        self._failure_threshold = failure_threshold
+        self._base_recovery_timeout = recovery_timeout
+        self._max_recovery_timeout = max_recovery_timeout
+        self._recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._listeners: list[Callable[[], None]] = []
+
+    def probe_due(self, now: float) -> bool:
+        """Return True if an open breaker may try a recovery probe."""
+        return (
+            self.state is BreakerState.OPEN
+            and now >= self._opened_at + self._recovery_timeout
+        )
+
+    def begin_probe(self) -> None:
+        """Let a single recovery probe through."""
+        self.state = BreakerState.HALF_OPEN
+
+    def record_success(self) -> None:
+        """Record a request that reached the device."""
+        self._failures = 0
+        self._recovery_timeout = self._base_recovery_timeout
+        self._set_state(BreakerState.CLOSED)
+
+    def record_failure(self, now: float) -> None:
+        """Record a request that could not reach the device."""
+        self._failures += 1
+        if self.state is BreakerState.HALF_OPEN:
+            self._recovery_timeout = min(
+                self._recovery_timeout * 2, self._max_recovery_timeout
+            )
+        elif self._failures < self._failure_threshold:
+            return
+        self._opened_at = now
+        self._set_state(BreakerState.OPEN)
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback for state changes and return its remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _set_state(self, state: BreakerState) -> None:
+        """Change state and notify listeners."""
+        if state is self.state:
+            return
+        self.state = state
+        for listener in list(self._listeners):
+            listener()
+
+
+def create_karotz_session() -> ClientSession:
+    """Create a connection pool tuned for a single slow embedded server.
+
+    Must be called from the event loop.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=CONNECTION_DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT),
+    )
+
+
+def sniff_image_type(head: bytes, content_type: str = "") -> str | None:
+    """Return the image type of a body from its first bytes, or None."""
+    for signature, image_type in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return image_type
+    if content_type.startswith("image/"):
+        return content_type.split(";", 1)[0]
+    return None
+
+
+def is_idempotent(endpoint: str) -> bool:
+    """Return True if repeating the request cannot change the outcome."""
+    path = endpoint.split("?", 1)[0]
+    return path in IDEMPOTENT_ENDPOINTS or path.startswith(SNAPSHOT_FILE_PATH)
+
+
+_SECRET_PARAM = re.compile(r"(?<=[?&]password=)[^&]*")
+
+
+def redact_endpoint(endpoint: str) -> str:
+    """Return an endpoint with credentials in its query masked for logging."""
+    return _SECRET_PARAM.sub("**REDACTED**", endpoint)
+
+
+def endpoint_timeout(endpoint: str) -> aiohttp.ClientTimeout:
+    """Return the timeout budget for an endpoint."""
+    path = endpoint.split("?", 1)[0]
+    return aiohttp.ClientTimeout(
+        total=ENDPOINT_TIMEOUTS.get(path, DEFAULT_REQUEST_TIMEOUT)
+    )
+
+
+@dataclass
+class KarotzCommand:
+    """A request waiting for its turn on the device."""
+
+    endpoint: str
+    handler: Callable[[], Awaitable[Any]]
+    future: asyncio.Future = field(repr=False)
+    command_class: str | None = None
+    enqueued_at: float = 0.0
+    superseded: int = 0
+
 
 class OpenKarotzAPI:
-    """Class to interact with Open Karotz API."""
+    """Class to interact with Open Karotz API.
+
+    The Karotz CGI server only handles one request at a time, so every
+    request is pushed onto a bounded per-device queue and executed by a
+    single worker. Callers await a per-command future for the result.
 
-    def __init__(self, host: str, websession: ClientSession | None = None) -> None:
-        """Initialize the API."""
+    State-setting commands (LED, ears, volume, mood) are coalesced: while
+    a command of the same class is still waiting in the queue, a newer one
+    replaces its value instead of being queued behind it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        websession: ClientSession | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+    ) -> None:
+        """Initialize the API.
+
+        When no websession is given, the API creates and owns a dedicated
+        connection pool which is closed by ``async_close``.
+        """
         self._host = host
         self._websession = websession
+        self._owns_session = False
+        self._closed = False
+        self._queue: asyncio.Queue[KarotzCommand] = asyncio.Queue(maxsize=queue_size)
+        self._queue_timeout = queue_timeout
+        self._worker: asyncio.Task | None = None
+        self._coalesce_window = coalesce_window
+        self._pending: dict[str, KarotzCommand] = {}
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._last_result: KarotzResult | None = None
+        self._breaker = CircuitBreaker()
+        self._probe: asyncio.Task | None = None
+        self._fast_failed = 0
+        self._activity_listeners: list[Callable[[], None]] = []
+        self._inflight: dict[tuple[str, str], asyncio.Task[KarotzResult]] = {}
+        self._read_hits = 0
+        self._read_misses = 0
+        self._url_rewriter: Callable[[str], str] | None = None
+        self._sound_router: Callable[[str], str | None] | None = None
+        self._command_observer: Callable[[str, str, KarotzResult], None] | None = None
+
+    @property
+    def host(self) -> str:
+        """Return the device host."""
+        return self._host
+
+    @property
+    def session(self) -> ClientSession:
+        """Return the HTTP session used to talk to the device.
+
+        Raises RuntimeError once the API is closed, so a late caller can
+        not silently open a new connection pool.
+        """
+        if self._closed:
+            raise RuntimeError(f"Open Karotz API for {self._host} is closed")
+        if self._websession is None:
+            self._websession = create_karotz_session()
+            self._owns_session = True
+        return self._websession
+
+    @property
+    def closed(self) -> bool:
+        """Return True once the API has been closed."""
+        return self._closed
+
+    def has_pending(self, command_class: str) -> bool:
+        """Return True if a command of ``command_class`` waits in the queue."""
+        return command_class in self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting for the device."""
+        return self._queue.qsize()
+
+    @property
+    def available(self) -> bool:
+        """Return False while the circuit breaker considers the device down."""
+        return self._breaker.state is BreakerState.CLOSED
+
+    @property
+    def breaker_state(self) -> BreakerState:
+        """Return the circuit breaker state."""
+        return self._breaker.state
 
-    async def _async_get(self, endpoint: str) -> dict | None:
-        """Perform GET request to Open Karotz."""
-        session = self._websession or async_get_clientsession(None)
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` whenever device availability changes."""
+        return self._breaker.add_listener(listener)
+
+    def async_add_activity_listener(
+        self, listener: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Call ``listener`` after every state-setting command the device accepted."""
+        self._activity_listeners.append(listener)
+        return lambda: self._activity_listeners.remove(listener)
+
+    @property
+    def last_result(self) -> KarotzResult | None:
+        """Return the result of the most recent request."""
+        return self._last_result
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return command pipeline counters."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "fast_failed": self._fast_failed,
+            "read_hits": self._read_hits,
+            "read_misses": self._read_misses,
+            "breaker": self._breaker.state.value,
+        }
+
+    async def _async_submit(
+        self,
+        endpoint: str,
+        handler: Callable[[], Awaitable[Any]],
+        default: Any = None,
+        command_class: str | None = None,
+    ) -> Any:
+        """Queue a request for the device and wait for its result.
+
+        When the queue stays full for longer than the queue timeout the
+        command is rejected and ``default`` is returned, so a burst of
+        automations cannot stack up unbounded work.
+        """
+        if command_class is not None and (
+            pending := self._pending.get(command_class)
+        ) is not None:
+            self._coalesced += 1
+            if pending.endpoint != endpoint:
+                self._dropped += 1
+                pending.superseded += 1
+                pending.endpoint = endpoint
+                pending.handler = handler
+            return await asyncio.shield(pending.future)
+
+        loop = asyncio.get_running_loop()
+        command = KarotzCommand(
+            endpoint,
+            handler,
+            loop.create_future(),
+            command_class=command_class,
+            enqueued_at=loop.time(),
+        )
+        if command_class is not None:
+            self._pending[command_class] = command
         try:
-            async with session.get(f"http://{self._host}{endpoint}") as resp:
+            self._queue.put_nowait(command)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(command), self._queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                _LOGGER.warning(
+                    "Command queue for %s is full, dropping %s",
+                    self._host,
+                    redact_endpoint(endpoint),
+                )
+                if self._pending.get(command_class) is command:
+                    del self._pending[command_class]
+                command.future.set_result(default)
+                return default
+        self._submitted += 1
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._async_process_queue())
+        if command_class is None:
+            return await command.future
+        # Coalesced callers share this future, so one of them giving up
+        # must not cancel the command for the others.
+        return await asyncio.shield(command.future)
+
+    async def _async_process_queue(self) -> None:
+        """Execute queued commands one at a time until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            command = self._queue.get_nowait()
+            if command.command_class is not None:
+                # Hold the command briefly so a burst of updates collapses
+                # into the newest value before it reaches the wire.
+                delay = command.enqueued_at + self._coalesce_window - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._pending.pop(command.command_class, None)
+                if command.superseded:
+                    _LOGGER.debug(
+                        "Sending %s after dropping %d superseded values",
+                        redact_endpoint(command.endpoint),
+                        command.superseded,
+                    )
+            if command.future.cancelled():
+                continue
+            try:
+                result = await command.handler()
+            except asyncio.CancelledError:
+                command.future.cancel()
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                if not command.future.done():
+                    command.future.set_exception(err)
+            else:
+                if not command.future.done():
+                    command.future.set_result(result)
+            finally:
+                self._completed += 1
+
+    async def async_close(self) -> None:
+        """Stop the worker, cancel every queued command and close the pool.
+
+        A closed API refuses any further request.
+        """
+        self._closed = True
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        if self._probe is not None:
+            self._probe.cancel()
+            self._probe = None
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        self._pending.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+        if self._owns_session and self._websession is not None:
+            await self._websession.close()
+            self._websession = None
+            self._owns_session = False
+
+    async def _async_attempt(
+        self, endpoint: str, response_type: str, budget: float
+    ) -> KarotzResult:
+        """Perform a single GET request and classify its outcome."""
+        timeout = aiohttp.ClientTimeout(
+            total=min(endpoint_timeout(endpoint).total, budget)
+        )
+        try:
+            async with self.session.get(
+                f"http://{self._host}{endpoint}", timeout=timeout
+            ) as resp:
+                if resp.status != 200:
+                    return KarotzResult(
+                        False, status=resp.status, error=KarotzErrorKind.HTTP
+                    )
+                if response_type == RESPONSE_NONE:
+                    return KarotzResult(True, status=resp.status)
                 content_type = resp.headers.get("Content-Type", "")
-                if resp.status == 200:
-                    if "application/json" in content_type:
-                        return await resp.json()
-                    text = await resp.text()
-                    try:
-                        return json.loads(text)
-                    except json.JSONDecodeError:
-                        _LOGGER.error("Failed to parse JSON from %s: %s", endpoint, text[:200])
-                        return None
-                _LOGGER.error("Failed to fetch %s: %s", endpoint, resp.status)
-                return None
-        except Exception as err:
-            _LOGGER.error("Error fetching %s: %s", endpoint, err)
-            return None
+                if response_type == RESPONSE_IMAGE:
+                    data = await resp.read()
+                    if sniff_image_type(data[:8], content_type):
+                        return KarotzResult(True, status=resp.status, data=data)
+                    _LOGGER.error(
+                        "Snapshot API returned non-image content: %r", data[:100]
+                    )
+                    return KarotzResult(
+                        False, status=resp.status, error=KarotzErrorKind.PARSE
+                    )
+                # JSONDecodeError and UnicodeDecodeError are both ValueErrors.
+                try:
+                    if response_type == RESPONSE_TEXT:
+                        data = await resp.text()
+                    elif "application/json" in content_type:
+                        data = await resp.json()
+                    else:
+                        data = json.loads(await resp.text())
+                except ValueError as err:
+                    _LOGGER.error(
+                        "Failed to parse response from %s: %s",
+                        redact_endpoint(endpoint),
+                        err,
+                    )
+                    return KarotzResult(
+                        False, status=resp.status, error=KarotzErrorKind.PARSE
+                    )
+                return KarotzResult(True, status=resp.status, data=data)
+        except asyncio.TimeoutError:
+            return KarotzResult(False, error=KarotzErrorKind.TIMEOUT)
+        except aiohttp.ClientError as err:
+            _LOGGER.debug(
+                "Connection error on %s: %s", redact_endpoint(endpoint), err
+            )
+            return KarotzResult(False, error=KarotzErrorKind.CONNECTION)
+
+    async def _async_request(
+        self,
+        endpoint: str,
+        response_type: str = RESPONSE_NONE,
+        command_class: str | None = None,
+    ) -> KarotzResult:
+        """Run a request, retrying transient failures of idempotent endpoints.
+
+        Retries use full-jitter exponential backoff and never run past the
+        request deadline. Non-idempotent endpoints (TTS, sounds, moods) are
+        attempted exactly once so a slow device never plays them twice.
+        Only state-changing commands, those with a command class, are
+        reported to activity listeners.
+        """
+        loop = asyncio.get_running_loop()
+        if self._closed:
+            return KarotzResult(False, error=KarotzErrorKind.UNAVAILABLE)
+        if self._breaker.state is BreakerState.OPEN:
+            # Commands queued before the breaker opened are failed here
+            # without touching the network.
+            self._fast_failed += 1
+            return KarotzResult(False, error=KarotzErrorKind.UNAVAILABLE)
+        started = loop.time()
+        deadline = started + max(
+            DEFAULT_REQUEST_DEADLINE, endpoint_timeout(endpoint).total
+        )
+        max_attempts = RETRY_MAX_ATTEMPTS if is_idempotent(endpoint) else 1
+        attempts = 0
+        while True:
+            attempts += 1
+            result = await self._async_attempt(
+                endpoint, response_type, deadline - loop.time()
+            )
+            if result.ok or result.error not in TRANSIENT_ERRORS:
+                break
+            if attempts >= max_attempts:
+                break
+            delay = random.uniform(
+                0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempts - 1))
+            )
+            if loop.time() + delay >= deadline:
+                break
+            _LOGGER.debug(
+                "Retrying %s in %.2fs after %s (attempt %d)",
+                redact_endpoint(endpoint),
+                delay,
+                result.error,
+                attempts,
+            )
+            await asyncio.sleep(delay)
+
+        result.attempts = attempts
+        result.latency = loop.time() - started
+        if result.error in TRANSIENT_ERRORS:
+            self._breaker.record_failure(loop.time())
+        else:
+            self._breaker.record_success()
+        if not result.ok:
+            _LOGGER.error(
+                "Request %s failed after %d attempt(s): %s %s",
+                redact_endpoint(endpoint),
+                attempts,
+                result.error,
+                result.status or "",
+            )
+        self._last_result = result
+        if result.ok and command_class is not None:
+            for listener in list(self._activity_listeners):
+                listener()
+        return result
+
+    async def async_request(
+        self,
+        endpoint: str,
+        response_type: str = RESPONSE_NONE,
+        command_class: str | None = None,
+    ) -> KarotzResult:
+        """Queue a request for the device and return its typed result."""
+        if self._closed:
+            return KarotzResult(False, error=KarotzErrorKind.UNAVAILABLE)
+        if self._breaker.state is not BreakerState.CLOSED and not await self._async_probe():
+            self._fast_failed += 1
+            return KarotzResult(False, error=KarotzErrorKind.UNAVAILABLE)
+        return await self._async_submit(
+            endpoint,
+            lambda: self._async_request(endpoint, response_type, command_class),
+            default=KarotzResult(False, error=KarotzErrorKind.REJECTED),
+            command_class=command_class,
+        )
+
+    async def _async_probe(self) -> bool:
+        """Probe an open breaker and return True once the device is back.
+
+        Concurrent callers share a single probe request.
+        """
+        if self._probe is None or self._probe.done():
+            if not self._breaker.probe_due(asyncio.get_running_loop().time()):
+                return self._breaker.state is BreakerState.CLOSED
+            self._breaker.begin_probe()
+            self._probe = asyncio.get_running_loop().create_task(
+                self._async_submit(
+                    BREAKER_PROBE_ENDPOINT,
+                    lambda: self._async_request(BREAKER_PROBE_ENDPOINT, RESPONSE_JSON),
+                )
+            )
+        await asyncio.shield(self._probe)
+        return self._breaker.state is BreakerState.CLOSED
+
+    async def _async_get(
+        self, endpoint: str, response_type: str = RESPONSE_JSON
+    ) -> Any:
+        """Perform GET request to Open Karotz.
+
+        Concurrent reads of the same endpoint and parameters share a single
+        in-flight request, so duplicate reads never reach the device.
+        """
+        key = (endpoint, response_type)
+        task = self._inflight.get(key)
+        if task is None:
+            self._read_misses += 1
+            task = asyncio.get_running_loop().create_task(
+                self.async_request(endpoint, response_type)
+            )
+            self._inflight[key] = task
+
+            def _async_done(_: asyncio.Task[KarotzResult]) -> None:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+            task.add_done_callback(_async_done)
+        else:
+            self._read_hits += 1
+        result = await asyncio.shield(task)
+        return result.data if result.ok else None
+
+    def set_command_observer(
+        self, observer: Callable[[str, str, KarotzResult], None] | None
+    ) -> None:
+        """Report the outcome of every state-setting command to ``observer``."""
+        self._command_observer = observer
+
+    async def _async_command(
+        self, endpoint: str, command_class: str | None = None
+    ) -> bool:
+        """Send a command to Open Karotz."""
+        result = await self.async_request(endpoint, command_class=command_class)
+        if command_class is not None and self._command_observer is not None:
+            self._command_observer(command_class, endpoint, result)
+        return result.ok
 
     async def get_free_space(self) -> dict | None:
         """Get storage space information."""
@@ -50,186 +678,208 @@ class OpenKarotzAPI:
 
     async def set_led_color(self, color: str) -> bool:
         """Set LED color."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/leds?color={color}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting LED color: %s", err)
-            return False
+        return await self._async_command(
+            f"/cgi-bin/leds?color={color}", COMMAND_CLASS_LED
+        )
 
     async def set_ear_position(self, left: int, right: int) -> bool:
         """Set ear position."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears?left={left}&right={right}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting ear position: %s", err)
-            return False
+        return await self._async_command(
+            f"/cgi-bin/ears?left={left}&right={right}", COMMAND_CLASS_EARS
+        )
 
     async def reset_ears(self) -> bool:
         """Reset ears to default position."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears_reset") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error resetting ears: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/ears_reset", COMMAND_CLASS_EARS)
 
     async def random_ears(self) -> bool:
         """Set ears to random position."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears_random") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting random ears: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/ears_random", COMMAND_CLASS_EARS)
 
     async def play_sound(self, sound_id: str) -> bool:
         """Play local sound."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/sound?id={sound_id}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error playing sound: %s", err)
-            return False
+        return await self._async_command(f"/cgi-bin/sound?id={sound_id}")
+
+    def set_url_rewriter(self, rewriter: Callable[[str], str] | None) -> None:
+        """Rewrite sound URLs, e.g. to a local proxy, before playing them."""
+        self._url_rewriter = rewriter
 
-    async def play_sound_url(self, url: str) -> bool:
-        """Play sound from URL."""
-        session = self._websession or async_get_clientsession(None)
-        import urllib.parse
+    def set_sound_router(self, router: Callable[[str], str | None] | None) -> None:
+        """Play sound URLs for which ``router`` returns a local id by that id."""
+        self._sound_router = router
+
+    async def play_sound_url(self, url: str, proxy: bool = True) -> bool:
+        """Play sound from URL.
+
+        Streams such as radios should pass ``proxy=False`` so they are
+        played from their source.
+        """
+        if proxy and self._sound_router is not None and (
+            sound_id := self._sound_router(url)
+        ):
+            return await self.play_sound(sound_id)
+        if proxy and self._url_rewriter is not None:
+            url = self._url_rewriter(url)
         encoded_url = urllib.parse.quote(url)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/sound?url={encoded_url}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error playing URL: %s", err)
-            return False
+        return await self._async_command(f"/cgi-bin/sound?url={encoded_url}")
 
     async def play_tts(self, text: str, voice: str = "5") -> bool:
         """Play text-to-speech."""
-        session = self._websession or async_get_clientsession(None)
-        import urllib.parse
         encoded_text = urllib.parse.quote(text)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/tts?text={encoded_text}&voice={voice}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error playing TTS: %s", err)
-            return False
+        return await self._async_command(f"/cgi-bin/tts?text={encoded_text}&voice={voice}")
 
     async def play_mood(self, mood_id: int) -> bool:
         """Play mood."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/apps/moods?id={mood_id}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error playing mood: %s", err)
-            return False
+        return await self._async_command(
+            f"/cgi-bin/apps/moods?id={mood_id}", COMMAND_CLASS_MOOD
+        )
 
     async def play_random_mood(self) -> bool:
         """Play random mood."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/apps/moods") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error playing random mood: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/apps/moods", COMMAND_CLASS_MOOD)
 
     async def capture_snapshot(self) -> bytes | None:
         """Capture snapshot."""
-        session = self._websession or async_get_clientsession(None)
+        result = await self.async_request(SNAPSHOT_ENDPOINT, RESPONSE_IMAGE)
+        return result.data if result.ok else None
+
+    async def stream_snapshot(
+        self,
+        on_chunk: Callable[[bytes], None],
+        chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+    ) -> bool:
+        """Capture a snapshot and hand its body to ``on_chunk`` as it arrives.
+
+        Only the first chunk is inspected to make sure the device sent an
+        image. The capture waits its turn in the command queue like any
+        other request, so it never overlaps a command on the device, but
+        it is not retried. Returns True once the whole image arrived.
+        """
+        if self._closed:
+            return False
+        if self._breaker.state is not BreakerState.CLOSED and not await self._async_probe():
+            self._fast_failed += 1
+            return False
+        return await self._async_submit(
+            SNAPSHOT_ENDPOINT,
+            lambda: self._async_stream_snapshot(on_chunk, chunk_size),
+            default=False,
+        )
+
+    async def _async_stream_snapshot(
+        self, on_chunk: Callable[[bytes], None], chunk_size: int
+    ) -> bool:
+        """Pipe a snapshot body to ``on_chunk``; runs in the command queue."""
+        loop = asyncio.get_running_loop()
         try:
-            async with session.get(f"http://{self._host}/cgi-bin/snapshot?silent=1") as resp:
-                if resp.status == 200:
-                    content_type = resp.headers.get("Content-Type", "")
-                    if "image" in content_type:
-                        return await resp.read()
-                    text = await resp.text()
-                    try:
-                        json_data = json.loads(text)
-                        _LOGGER.error("Snapshot API returned JSON instead of image: %s", json_data)
-                        return None
-                    except json.JSONDecodeError:
-                        _LOGGER.error("Snapshot API returned non-image content: %s", text[:100])
-                        return None
-                _LOGGER.error("Failed to capture snapshot: %s", resp.status)
-                return None
-        except Exception as err:
-            _LOGGER.error("Error capturing snapshot: %s", err)
-            return None
+            async with self.session.get(
+                f"http://{self._host}{SNAPSHOT_ENDPOINT}",
+                timeout=endpoint_timeout(SNAPSHOT_ENDPOINT),
+            ) as resp:
+                if resp.status != 200:
+                    _LOGGER.error("Snapshot stream failed: HTTP %s", resp.status)
+                    return False
+                first = True
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    if first:
+                        first = False
+                        if not sniff_image_type(
+                            chunk[:8], resp.headers.get("Content-Type", "")
+                        ):
+                            _LOGGER.error(
+                                "Snapshot API returned non-image content: %r",
+                                chunk[:100],
+                            )
+                            return False
+                    on_chunk(chunk)
+        except asyncio.TimeoutError:
+            self._breaker.record_failure(loop.time())
+            return False
+        except aiohttp.ClientError as err:
+            _LOGGER.debug("Connection error while streaming snapshot: %s", err)
+            self._breaker.record_failure(loop.time())
+            return False
+        self._breaker.record_success()
+        return not first
 
     async def sleep(self) -> bool:
         """Put Karotz to sleep."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/sleep") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error sleeping: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/sleep", COMMAND_CLASS_POWER)
 
     async def wake_up(self) -> bool:
         """Wake up Karotz."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/wake_up") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error waking up: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/wake_up", COMMAND_CLASS_POWER)
+
+    async def get_snapshot_list(self) -> str | None:
+        """Get the raw list of snapshots stored on the device."""
+        return await self._async_get("/cgi-bin/snapshot_list", RESPONSE_TEXT)
+
+    async def download_snapshot(self, name: str) -> bytes | None:
+        """Download a snapshot stored on the device."""
+        result = await self.async_request(
+            f"{SNAPSHOT_FILE_PATH}{urllib.parse.quote(name)}", RESPONSE_IMAGE
+        )
+        return result.data if result.ok else None
+
+    async def snapshot_ftp(
+        self, server: str, user: str, password: str, remote_dir: str
+    ) -> bool:
+        """Take a snapshot and have the device upload it over FTP."""
+        query = urllib.parse.urlencode(
+            {
+                "server": server,
+                "user": user,
+                "password": password,
+                "remote_dir": remote_dir,
+            }
+        )
+        return await self._async_command(f"/cgi-bin/snapshot_ftp?{query}")
+
+    async def clear_snapshots(self) -> bool:
+        """Delete all snapshots stored on the device."""
+        return await self._async_command("/cgi-bin/clear_snapshots")
 
     async def clear_cache(self) -> bool:
         """Clear cache."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/clear_cache") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error clearing cache: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/clear_cache")
 
     async def get_rfid_list(self) -> dict | None:
         """Get RFID list."""
         return await self._async_get("/cgi-bin/rfid_list")
 
+    async def get_sound_list(self) -> str | None:
+        """Get the raw list of local sounds."""
+        return await self._async_get("/cgi-bin/sound_list", RESPONSE_TEXT)
+
+    async def get_voice_list(self) -> str | None:
+        """Get the raw list of TTS voices."""
+        return await self._async_get("/cgi-bin/voice_list", RESPONSE_TEXT)
+
+    async def get_moods_list(self) -> str | None:
+        """Get the raw list of moods."""
+        return await self._async_get("/cgi-bin/moods_list", RESPONSE_TEXT)
+
+    async def get_radio_list(self) -> str | None:
+        """Get the raw list of radio stations."""
+        return await self._async_get("/cgi-bin/radio_list", RESPONSE_TEXT)
+
     async def stop(self) -> bool:
         """Stop playback."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/stop") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error stopping: %s", err)
-            return False
+        return await self._async_command("/cgi-bin/stop")
 
     async def set_volume(self, volume: float) -> bool:
         """Set volume level."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            # Volume is 0.0-1.0, convert to 0-100 for Karotz
-            volume_percent = int(volume * 100)
-            async with session.get(f"http://{self._host}/cgi-bin/volume?level={volume_percent}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting volume: %s", err)
-            return False
+        # Volume is 0.0-1.0, convert to 0-100 for Karotz
+        volume_percent = int(volume * 100)
+        return await self._async_command(
+            f"/cgi-bin/volume?level={volume_percent}", COMMAND_CLASS_VOLUME
+        )
 
     async def set_mood(self, mood_id: int) -> bool:
         """Set mood."""
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/apps/moods?id={mood_id}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting mood: %s", err)
-            return False
+        return await self._async_command(
+            f"/cgi-bin/apps/moods?id={mood_id}", COMMAND_CLASS_MOOD
+        )
 
     async def set_ear_position_single(self, position: int) -> bool:
         """Set ear position using a single position value (0-100)."""
@@ -239,11 +889,11 @@ class OpenKarotzAPI:
 
     async def set_ear_rotation(self, left: int, right: int) -> bool:
         """Set ear rotation (1-5) for left and right ears independently.
-        
+
         Args:
             left: Left ear rotation (1-5)
             right: Right ear rotation (1-5)
-            
+
         Returns:
             True if successful, False otherwise
         """
@@ -253,20 +903,16 @@ class OpenKarotzAPI:
         if not (1 <= right <= 5):
             _LOGGER.error("Right ear rotation must be between 1-5, got %d", right)
             return False
-        session = self._websession or async_get_clientsession(None)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears?left={left}&right={right}") as resp:
-                return resp.status == 200
-        except Exception as err:
-            _LOGGER.error("Error setting ear rotation: %s", err)
-            return False
+        return await self._async_command(
+            f"/cgi-bin/ears?left={left}&right={right}", COMMAND_CLASS_EARS
+        )
 
     async def set_ear_rotation_together(self, rotation: int) -> bool:
         """Set both ears to the same rotation (1-5).
-        
+
         Args:
             rotation: Both ears rotation (1-5)
-            
+
         Returns:
             True if successful, False otherwise
         """
@@ -277,7 +923,7 @@ class OpenKarotzAPI:
 
     async def get_ear_position(self) -> dict | None:
         """Get current ear position.
-        
+
         Returns:
             Dict with left and right position values, or None on error
         """
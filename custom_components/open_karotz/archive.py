@@ -0,0 +1,376 @@
+"""On-disk snapshot archive for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util.file import write_utf8_file_atomic
+
+from .api import OpenKarotzAPI
+from .catalog import parse_catalog
+from .const import (
+    ARCHIVE_INDEX_FILE,
+    ARCHIVE_MAX_AGE,
+    ARCHIVE_MAX_BYTES,
+    DEFAULT_POST_TRIGGER_FRAMES,
+    POST_TRIGGER_INTERVAL,
+    PRE_TRIGGER_MAX_BYTES,
+)
+from .snapshot import OpenKarotzSnapshotCache
+from .timelapse import ProgressCallback, write_timelapse
+
+_LOGGER = logging.getLogger(__name__)
+
+_DIGITS = re.compile(r"\d+")
+
+
+def snapshot_timestamp(name: str) -> float | None:
+    """Return the capture time encoded in a device snapshot name.
+
+    Names carry either an epoch in seconds or milliseconds, or a
+    ``YYYY_MM_DD_HH_MM_SS`` style date in the local time of the device.
+    Returns None when the name holds neither.
+    """
+    groups = _DIGITS.findall(os.path.basename(name))
+    digits = "".join(groups)
+    if len(groups) == 1 and len(digits) in (10, 13):
+        return int(digits) / (1000 if len(digits) == 13 else 1)
+    if len(digits) < 14:
+        return None
+    try:
+        moment = datetime.strptime(digits[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return moment.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE).timestamp()
+
+
+@dataclass
+class ArchiveEntry:
+    """A snapshot stored in the archive."""
+
+    timestamp: float
+    hash: str
+    file: str
+    size: int
+
+
+class OpenKarotzSnapshotArchive:
+    """Keep snapshots of one device in a bounded on-disk ring buffer.
+
+    Frames are stored once per content hash and evicted oldest first when
+    they exceed the maximum age or the archive exceeds its byte budget.
+    An index file maps timestamps to files so lookups never scan the
+    directory. Syncing pulls new snapshots from the device and clears the
+    device storage once every listed snapshot is safely archived.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: OpenKarotzAPI,
+        path: str,
+        max_age: float = ARCHIVE_MAX_AGE,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+    ) -> None:
+        """Initialize the archive."""
+        self.hass = hass
+        self._api = api
+        self.path = path
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._entries: list[ArchiveEntry] = []
+        self._by_timestamp: dict[float, ArchiveEntry] = {}
+        self._by_hash: dict[str, ArchiveEntry] = {}
+        self._size = 0
+        # Device snapshots already archived but not yet cleared on the device.
+        self._synced: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._timelapse: asyncio.Future[int] | None = None
+
+    @property
+    def entries(self) -> list[ArchiveEntry]:
+        """Return the archived snapshots, oldest first."""
+        return list(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return archive counters."""
+        return {"snapshots": len(self._entries), "bytes": self._size}
+
+    def get(self, timestamp: float) -> ArchiveEntry | None:
+        """Return the snapshot taken at ``timestamp``."""
+        return self._by_timestamp.get(timestamp)
+
+    def closest(self, timestamp: float) -> ArchiveEntry | None:
+        """Return the latest snapshot taken at or before ``timestamp``."""
+        index = bisect.bisect_right(self._entries, timestamp, key=lambda e: e.timestamp)
+        return self._entries[index - 1] if index else None
+
+    def file_path(self, entry: ArchiveEntry) -> str:
+        """Return the absolute path of an archived snapshot."""
+        return os.path.join(self.path, entry.file)
+
+    def between(self, start: float, end: float) -> list[ArchiveEntry]:
+        """Return the snapshots taken from ``start`` to ``end``, oldest first."""
+        return self._entries[
+            bisect.bisect_left(self._entries, start, key=lambda e: e.timestamp) : (
+                bisect.bisect_right(self._entries, end, key=lambda e: e.timestamp)
+            )
+        ]
+
+    async def async_build_timelapse(
+        self,
+        path: str,
+        start: float,
+        end: float,
+        fps: float,
+        progress: ProgressCallback | None = None,
+    ) -> int:
+        """Write the snapshots between two timestamps into an AVI timelapse.
+
+        Frames are streamed from disk in the executor, so the event loop and
+        the camera stay responsive and memory use does not depend on the
+        number of frames. Only one timelapse is built at a time. Returns the
+        number of frames written. ``progress`` is called from the executor.
+        """
+        if self._timelapse is not None:
+            raise RuntimeError("A timelapse is already being built")
+        files = [self.file_path(entry) for entry in self.between(start, end)]
+        self._timelapse = self.hass.async_add_executor_job(
+            write_timelapse, files, path, fps, progress, len(files)
+        )
+        try:
+            return await self._timelapse
+        finally:
+            self._timelapse = None
+
+    async def async_load(self) -> None:
+        """Load the index, dropping entries whose file is gone."""
+        entries, synced = await self.hass.async_add_executor_job(self._load_index)
+        for entry in entries:
+            self._index(entry)
+        self._synced = synced
+
+    def _load_index(self) -> tuple[list[ArchiveEntry], set[str]]:
+        """Read the index file; runs in the executor."""
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with open(
+                os.path.join(self.path, ARCHIVE_INDEX_FILE), encoding="utf-8"
+            ) as index_file:
+                data = json.load(index_file)
+        except FileNotFoundError:
+            return [], set()
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Rebuilding unreadable snapshot index: %s", err)
+            return [], set()
+        entries = [
+            ArchiveEntry(**entry)
+            for entry in data.get("entries", [])
+            if os.path.exists(os.path.join(self.path, entry["file"]))
+        ]
+        return sorted(entries, key=lambda e: e.timestamp), set(data.get("synced", []))
+
+    def _save_index(self, data: str) -> None:
+        """Write the index file atomically; runs in the executor."""
+        write_utf8_file_atomic(os.path.join(self.path, ARCHIVE_INDEX_FILE), data)
+
+    async def async_save_index(self) -> None:
+        """Persist the index."""
+        data = json.dumps(
+            {
+                "entries": [asdict(entry) for entry in self._entries],
+                "synced": sorted(self._synced),
+            }
+        )
+        await self.hass.async_add_executor_job(self._save_index, data)
+
+    def _index(self, entry: ArchiveEntry) -> None:
+        """Add an entry to the in-memory index."""
+        bisect.insort(self._entries, entry, key=lambda e: e.timestamp)
+        self._by_timestamp[entry.timestamp] = entry
+        self._by_hash[entry.hash] = entry
+        self._size += entry.size
+
+    def _unindex(self, entry: ArchiveEntry) -> None:
+        """Remove an entry from the in-memory index."""
+        self._entries.remove(entry)
+        del self._by_timestamp[entry.timestamp]
+        del self._by_hash[entry.hash]
+        self._size -= entry.size
+
+    def _write(self, file: str, image: bytes) -> None:
+        """Write a snapshot file; runs in the executor."""
+        with open(os.path.join(self.path, file), "wb") as image_file:
+            image_file.write(image)
+
+    def _remove(self, files: list[str]) -> None:
+        """Delete snapshot files; runs in the executor."""
+        for file in files:
+            try:
+                os.remove(os.path.join(self.path, file))
+            except FileNotFoundError:
+                pass
+
+    async def async_add(
+        self, image: bytes, timestamp: float | None = None, save: bool = True
+    ) -> ArchiveEntry | None:
+        """Archive a snapshot and return its entry.
+
+        Returns None without writing anything if an identical snapshot is
+        already archived.
+        """
+        digest = hashlib.sha256(image).hexdigest()
+        if digest in self._by_hash:
+            return None
+        if timestamp is None:
+            timestamp = dt_util.utcnow().timestamp()
+        timestamp = round(timestamp, 3)
+        while timestamp in self._by_timestamp:
+            timestamp = round(timestamp + 0.001, 3)
+        entry = ArchiveEntry(
+            timestamp, digest, f"{int(timestamp * 1000)}_{digest[:16]}.jpg", len(image)
+        )
+        # Index first so concurrent adds of the same frame dedupe.
+        self._index(entry)
+        try:
+            await self.hass.async_add_executor_job(self._write, entry.file, image)
+        except OSError:
+            self._unindex(entry)
+            raise
+        await self._async_evict()
+        if save:
+            await self.async_save_index()
+        return entry
+
+    async def _async_evict(self) -> None:
+        """Drop the oldest snapshots beyond the age and size bounds."""
+        cutoff = dt_util.utcnow().timestamp() - self._max_age
+        evicted: list[str] = []
+        while self._entries and (
+            self._entries[0].timestamp < cutoff or self._size > self._max_bytes
+        ):
+            entry = self._entries[0]
+            self._unindex(entry)
+            evicted.append(entry.file)
+        if evicted:
+            await self.hass.async_add_executor_job(self._remove, evicted)
+
+    async def async_sync(self) -> int:
+        """Archive new device snapshots and return how many were stored."""
+        async with self._lock:
+            text = await self._api.get_snapshot_list()
+            if text is None:
+                return 0
+            names = list(parse_catalog(text))
+            self._synced &= set(names)
+            await self._async_evict()
+            stored = 0
+            verified = True
+            for name in names:
+                if name in self._synced:
+                    continue
+                image = await self._api.download_snapshot(name)
+                if image is None:
+                    verified = False
+                    continue
+                entry = await self.async_add(
+                    image, snapshot_timestamp(name), save=False
+                )
+                if entry is not None:
+                    stored += 1
+                self._synced.add(name)
+            await self.async_save_index()
+
+            # Only free device storage once everything it holds is archived;
+            # snapshots taken during the sync are picked up by the next one.
+            if not names or not verified:
+                return stored
+            text = await self._api.get_snapshot_list()
+            if text is None or not set(parse_catalog(text)) <= self._synced:
+                return stored
+            if await self._api.clear_snapshots():
+                self._synced.clear()
+                await self.async_save_index()
+            return stored
+
+
+class OpenKarotzPreTriggerBuffer:
+    """Keep the last few snapshots of one device in memory.
+
+    The camera feeds the buffer at a low rate so that, when an event
+    fires, the frames from just before it can be written to the archive
+    immediately, followed by a short burst of fresh captures. The buffer
+    is bounded both in frames and in bytes.
+    """
+
+    def __init__(
+        self,
+        snapshots: OpenKarotzSnapshotCache,
+        max_frames: int,
+        max_bytes: int = PRE_TRIGGER_MAX_BYTES,
+    ) -> None:
+        """Initialize the buffer."""
+        self._snapshots = snapshots
+        self.max_frames = max_frames
+        self._max_bytes = max_bytes
+        self._frames: deque[tuple[float, bytes]] = deque()
+        self._size = 0
+        self._last_captured_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the buffer keeps any frames."""
+        return self.max_frames > 0
+
+    @property
+    def frames(self) -> list[tuple[float, bytes]]:
+        """Return the buffered frames, oldest first."""
+        return list(self._frames)
+
+    def push(self, timestamp: float, image: bytes) -> None:
+        """Add a frame, dropping the oldest ones beyond the bounds."""
+        self._frames.append((timestamp, image))
+        self._size += len(image)
+        while self._frames and (
+            len(self._frames) > self.max_frames or self._size > self._max_bytes
+        ):
+            self._size -= len(self._frames.popleft()[1])
+
+    async def async_capture(self) -> None:
+        """Buffer the current snapshot unless it is already buffered."""
+        image = await self._snapshots.async_get()
+        if image is None or self._snapshots.captured_at == self._last_captured_at:
+            return
+        self._last_captured_at = self._snapshots.captured_at
+        self.push(dt_util.utcnow().timestamp(), image)
+
+    async def async_flush(
+        self,
+        archive: OpenKarotzSnapshotArchive,
+        post_frames: int = DEFAULT_POST_TRIGGER_FRAMES,
+        interval: float = POST_TRIGGER_INTERVAL,
+    ) -> list[ArchiveEntry]:
+        """Archive the buffered frames followed by a burst of new captures."""
+        entries: list[ArchiveEntry] = []
+        for timestamp, image in self.frames:
+            if entry := await archive.async_add(image, timestamp, save=False):
+                entries.append(entry)
+        for index in range(post_frames):
+            if index:
+                await asyncio.sleep(interval)
+            image = await self._snapshots.async_get(max_age=0)
+            if image is not None and (entry := await archive.async_add(image, save=False)):
+                entries.append(entry)
+        await archive.async_save_index()
+        return entries
@@ -0,0 +1,439 @@
+"""Audio channel scheduler for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import partial
+import heapq
+import itertools
+import logging
+import re
+import urllib.parse
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .api import OpenKarotzAPI
+from .const import (
+    AUDIO_MAX_WAIT,
+    AUDIO_PRIORITIES,
+    AUDIO_PRIORITY_LOW,
+    AUDIO_PRIORITY_NORMAL,
+    AUDIO_PRIORITY_URGENT,
+    NOTIFY_MAX_LATENCY,
+    NOTIFY_WINDOW,
+    TTS_CHARS_PER_SECOND,
+    TTS_FIRST_CHUNK_LENGTH,
+    TTS_MAX_CHUNK_LENGTH,
+    TTS_SYNTHESIS_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,])\s+")
+
+
+def estimate_tts_duration(text: str) -> float:
+    """Return the estimated playback time of a TTS message in seconds."""
+    return TTS_SYNTHESIS_DELAY + len(text) / TTS_CHARS_PER_SECOND
+
+
+def _encoded_length(text: str) -> int:
+    """Return the length of ``text`` once URL-encoded."""
+    return len(urllib.parse.quote(text))
+
+
+def _split_piece(piece: str, limit: int) -> list[str]:
+    """Split a piece longer than ``limit`` at clauses, then words."""
+    for pattern in (_CLAUSE_END, re.compile(r"\s+")):
+        parts = pattern.split(piece)
+        if len(parts) > 1:
+            return [part for part in parts if part]
+    # A single word: cut it at the limit without splitting an escape.
+    cut = len(piece)
+    while cut > 1 and _encoded_length(piece[:cut]) > limit:
+        cut -= 1
+    return [piece[:cut], piece[cut:]] if cut < len(piece) else [piece]
+
+
+def split_tts_text(
+    text: str,
+    max_length: int = TTS_MAX_CHUNK_LENGTH,
+    first_length: int = TTS_FIRST_CHUNK_LENGTH,
+) -> list[str]:
+    """Split a message into chunks that each fit in one TTS request.
+
+    Chunks end at sentence boundaries where possible; longer sentences
+    are split at commas, then between words. Lengths are measured after
+    URL encoding, and the first chunk uses the smaller ``first_length``.
+    """
+    pending = [piece for piece in _SENTENCE_END.split(text.strip()) if piece]
+    chunks: list[str] = []
+    current = ""
+    while pending:
+        piece = pending.pop(0)
+        limit = first_length if not chunks else max_length
+        candidate = f"{current} {piece}" if current else piece
+        if _encoded_length(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+            pending.insert(0, piece)
+            continue
+        parts = _split_piece(piece, limit)
+        if parts == [piece]:
+            chunks.append(piece)
+            continue
+        pending[:0] = parts
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass(order=True)
+class AudioItem:
+    """An item waiting for the speaker."""
+
+    sort_key: tuple[int, int]
+    play: Callable[[], Awaitable[bool]] = field(compare=False)
+    title: str = field(compare=False)
+    priority: str = field(compare=False)
+    # Seconds of playback, or None for streams that play until replaced.
+    duration: float | None = field(compare=False)
+    deadline: float | None = field(compare=False)
+    future: asyncio.Future[bool] = field(compare=False)
+    # Part of the same message that must have played first.
+    previous: AudioItem | None = field(default=None, compare=False)
+
+
+def _accepted(item: AudioItem) -> bool:
+    """Return True if the device accepted an item."""
+    future = item.future
+    return (
+        future.done()
+        and not future.cancelled()
+        and future.exception() is None
+        and future.result()
+    )
+
+
+class OpenKarotzAudioScheduler:
+    """Share the single speaker of one device between all audio sources.
+
+    TTS, sounds, URL streams and moods are queued by priority and played
+    one after another, each for its estimated duration. An urgent item
+    stops whatever lower priority item is playing, streams without a
+    known duration give way to the next queued item, and low priority
+    items that waited past their deadline are dropped.
+    """
+
+    def __init__(self, api: OpenKarotzAPI) -> None:
+        """Initialize the scheduler."""
+        self._api = api
+        self._queue: list[AudioItem] = []
+        self._sequence = itertools.count()
+        self._current: AudioItem | None = None
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._listeners: list[Callable[[], None]] = []
+        self._played = 0
+        self._preempted = 0
+        self._expired = 0
+
+    @property
+    def current(self) -> AudioItem | None:
+        """Return the item assumed to be playing."""
+        return self._current
+
+    @property
+    def queue_length(self) -> int:
+        """Return the number of items waiting for the speaker."""
+        return len(self._queue)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return scheduler counters."""
+        return {
+            "queue_length": len(self._queue),
+            "played": self._played,
+            "preempted": self._preempted,
+            "expired": self._expired,
+        }
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever the playing item or the queue changes."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def async_play(
+        self,
+        play: Callable[[], Awaitable[bool]],
+        title: str,
+        duration: float | None,
+        priority: str = AUDIO_PRIORITY_NORMAL,
+    ) -> bool:
+        """Queue an item and return whether the device accepted it.
+
+        Returns False if the item was dropped before it could play.
+        """
+        return await self._async_enqueue([(play, duration)], title, priority)
+
+    async def async_play_tts(
+        self, text: str, voice: str, priority: str = AUDIO_PRIORITY_NORMAL
+    ) -> bool:
+        """Queue a message as a pipeline of short TTS requests.
+
+        Each chunk is only given its speaking time, so the next request is
+        sent while the device still speaks and its synthesis overlaps the
+        end of the previous chunk. Returns once the first chunk played.
+        """
+        chunks = split_tts_text(text)
+        parts: list[tuple[Callable[[], Awaitable[bool]], float | None]] = [
+            (
+                partial(self._api.play_tts, chunk, voice),
+                estimate_tts_duration(chunk) - TTS_SYNTHESIS_DELAY,
+            )
+            for chunk in chunks
+        ]
+        if parts:
+            parts[-1] = (parts[-1][0], estimate_tts_duration(chunks[-1]))
+        return await self._async_enqueue(parts, text, priority)
+
+    async def _async_enqueue(
+        self,
+        parts: list[tuple[Callable[[], Awaitable[bool]], float | None]],
+        title: str,
+        priority: str,
+    ) -> bool:
+        """Queue the parts of one message and wait for the first to play."""
+        if not parts:
+            return False
+        loop = asyncio.get_running_loop()
+        max_wait = AUDIO_MAX_WAIT.get(priority)
+        previous: AudioItem | None = None
+        items: list[AudioItem] = []
+        for play, duration in parts:
+            # Only the first part can go stale, the rest follow it.
+            item = AudioItem(
+                (-AUDIO_PRIORITIES[priority], next(self._sequence)),
+                play,
+                title,
+                priority,
+                duration,
+                None if max_wait is None or previous else loop.time() + max_wait,
+                loop.create_future(),
+                previous,
+            )
+            heapq.heappush(self._queue, item)
+            items.append(item)
+            previous = item
+        if self._should_yield(items[0]):
+            self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._async_run())
+        self._async_notify()
+        return await asyncio.shield(items[0].future)
+
+    def _should_yield(self, item: AudioItem) -> bool:
+        """Return True if the playing item must make way for ``item``."""
+        current = self._current
+        return current is not None and (
+            current.duration is None
+            or (
+                item.priority == AUDIO_PRIORITY_URGENT
+                and AUDIO_PRIORITIES[current.priority] < AUDIO_PRIORITIES[item.priority]
+            )
+        )
+
+    async def async_stop(self) -> bool:
+        """Stop the playing item and drop everything queued."""
+        while self._queue:
+            self._finish(heapq.heappop(self._queue), False)
+        self._current = None
+        self._wakeup.set()
+        self._async_notify()
+        return await self._api.stop()
+
+    async def _async_run(self) -> None:
+        """Play queued items until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            if item.future.done():
+                continue
+            if item.previous is not None and not _accepted(item.previous):
+                self._finish(item, False)
+                continue
+            if item.deadline is not None and loop.time() > item.deadline:
+                self._expired += 1
+                _LOGGER.debug("Dropping stale audio item %s", item.title)
+                self._finish(item, False)
+                continue
+
+            if self._current is not None:
+                # Something is still audible and has to make way.
+                self._preempted += 1
+                self._current = None
+                await self._api.stop()
+            self._wakeup.clear()
+            try:
+                accepted = await item.play()
+            except Exception as err:  # pylint: disable=broad-except
+                item.future.set_exception(err)
+                continue
+            self._finish(item, accepted)
+            if not accepted:
+                self._current = None
+                self._async_notify()
+                continue
+            self._played += 1
+            self._current = item
+            self._async_notify()
+
+            if item.duration is None:
+                # A stream keeps playing until something replaces it.
+                if not self._queue:
+                    return
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), item.duration)
+            except asyncio.TimeoutError:
+                self._current = None
+                self._async_notify()
+        if self._current is not None and self._current.duration is not None:
+            self._current = None
+            self._async_notify()
+
+    def _finish(self, item: AudioItem, result: bool) -> None:
+        """Resolve the future of an item."""
+        if not item.future.done():
+            item.future.set_result(result)
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+    async def async_close(self) -> None:
+        """Stop the worker and drop every queued item."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while self._queue:
+            heapq.heappop(self._queue).future.cancel()
+        self._current = None
+
+
+class OpenKarotzAnnouncementBuffer:
+    """Merge bursts of notifications into single TTS announcements.
+
+    Messages are held for a short window which restarts with every new
+    message, bounded by a maximum latency from the first one. Repeated
+    messages are spoken once and the batch plays with the highest
+    priority it contains. Urgent messages flush the batch right away, as
+    does a message for a different voice.
+    """
+
+    def __init__(
+        self,
+        audio: OpenKarotzAudioScheduler,
+        window: float = NOTIFY_WINDOW,
+        max_latency: float = NOTIFY_MAX_LATENCY,
+    ) -> None:
+        """Initialize the buffer."""
+        self._audio = audio
+        self._window = window
+        self._max_latency = max_latency
+        self._messages: dict[str, str] = {}
+        self._voice: str | None = None
+        self._priority = AUDIO_PRIORITY_LOW
+        self._first_at = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._received = 0
+        self._deduplicated = 0
+        self._announcements = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return buffer counters."""
+        return {
+            "received": self._received,
+            "deduplicated": self._deduplicated,
+            "announcements": self._announcements,
+        }
+
+    @callback
+    def async_add(
+        self, message: str, voice: str, priority: str = AUDIO_PRIORITY_NORMAL
+    ) -> None:
+        """Buffer a message for the next announcement."""
+        message = " ".join(message.split())
+        if not message:
+            return
+        if self._messages and voice != self._voice:
+            self._async_flush()
+        loop = asyncio.get_running_loop()
+        self._received += 1
+        key = message.casefold().rstrip(".!?;: ")
+        if key in self._messages:
+            self._deduplicated += 1
+        else:
+            if not self._messages:
+                self._first_at = loop.time()
+            self._messages[key] = message
+        self._voice = voice
+        if AUDIO_PRIORITIES[priority] > AUDIO_PRIORITIES[self._priority]:
+            self._priority = priority
+
+        if self._timer is not None:
+            self._timer.cancel()
+        if priority == AUDIO_PRIORITY_URGENT:
+            self._async_flush()
+            return
+        delay = min(self._window, self._first_at + self._max_latency - loop.time())
+        self._timer = loop.call_later(max(delay, 0), self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Speak the buffered messages as one announcement."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._messages:
+            return
+        text = " ".join(
+            message if message[-1] in ".!?;:" else f"{message}."
+            for message in self._messages.values()
+        )
+        task = asyncio.get_running_loop().create_task(
+            self._async_announce(text, self._voice or "", self._priority)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._messages = {}
+        self._priority = AUDIO_PRIORITY_LOW
+        self._announcements += 1
+
+    async def _async_announce(self, text: str, voice: str, priority: str) -> None:
+        """Queue an announcement on the speaker."""
+        try:
+            if not await self._audio.async_play_tts(text, voice, priority):
+                _LOGGER.warning("Announcement was not played: %s", text[:100])
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error playing announcement")
+
+    async def async_close(self) -> None:
+        """Drop buffered messages and cancel pending announcements."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._messages = {}
+        for task in list(self._tasks):
+            task.cancel()
@@ -1,15 +1,19 @@
-"""Binary sensor platform for Open Karotz RFID."""
+"""Binary sensor platform for Open Karotz RFID and motion."""
 from __future__ import annotations
 
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import BASE_URL, DOMAIN
+from .api import OpenKarotzAPI
+from .const import BASE_URL, DATA_RFID, DOMAIN
+from .coordinator import OpenKarotzCoordinator
+from .entity import OpenKarotzEntity
+from .motion import OpenKarotzMotionDetector
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,45 +24,30 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz binary sensor entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzRfidSensor(host, entry.entry_id)])
+    data = entry.runtime_data
+    async_add_entities(
+        [
+            OpenKarotzRfidSensor(data.coordinator, entry.entry_id),
+            OpenKarotzMotionSensor(data.api, data.motion, entry.entry_id),
+        ]
+    )
 
 
-class OpenKarotzRfidSensor(BinarySensorEntity):
+class OpenKarotzRfidSensor(OpenKarotzEntity, CoordinatorEntity, BinarySensorEntity):
     """Representation of the Open Karotz RFID sensor."""
 
     _attr_name = "Open Karotz RFID"
     _attr_device_class = BinarySensorDeviceClass.PRESENCE
     _attr_translation_key = "rfid"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(self, coordinator: OpenKarotzCoordinator, entry_id: str) -> None:
         """Initialize the RFID sensor."""
-        self._host = host
+        super().__init__(coordinator)
+        self._api = coordinator.api
         self._attr_unique_id = f"{entry_id}_rfid"
         self._is_on = False
         self._tag_id = None
 
-    async def _async_get_rfid_list(self) -> dict | None:
-        """Get RFID list from Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-        import json
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/rfid_list") as resp:
-                if resp.status == 200:
-                    text = await resp.text()
-                    try:
-                        return json.loads(text)
-                    except json.JSONDecodeError:
-                        _LOGGER.error("Failed to parse JSON from rfid_list: %s", text)
-                        return {"rfids": []}
-                _LOGGER.error("Failed to get RFID list: %s", resp.status)
-                return None
-        except Exception as err:
-            _LOGGER.error("Error getting RFID list: %s", err)
-            return None
-
     @property
     def is_on(self) -> bool:
         """Return True if entity is on."""
@@ -69,12 +58,49 @@ class OpenKarotzRfidSensor(BinarySensorEntity):
         """Return the state attributes."""
         return {"tag_id": self._tag_id}
 
-    async def async_update(self) -> None:
-        """Update the entity status."""
-        data = await self._async_get_rfid_list()
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        data = (self.coordinator.data or {}).get(DATA_RFID)
         if data and "rfids" in data and len(data["rfids"]) > 0:
             self._is_on = True
             self._tag_id = data["rfids"][0].get("tag")
         else:
             self._is_on = False
             self._tag_id = None
+        super()._handle_coordinator_update()
+
+
+class OpenKarotzMotionSensor(OpenKarotzEntity, BinarySensorEntity):
+    """Representation of the Open Karotz camera motion sensor."""
+
+    _attr_name = "Open Karotz Motion"
+    _attr_device_class = BinarySensorDeviceClass.MOTION
+    _attr_translation_key = "motion"
+    _attr_should_poll = False
+
+    def __init__(
+        self, api: OpenKarotzAPI, motion: OpenKarotzMotionDetector, entry_id: str
+    ) -> None:
+        """Initialize the motion sensor."""
+        self._api = api
+        self._motion = motion
+        self._attr_unique_id = f"{entry_id}_motion"
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._motion.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def is_on(self) -> bool:
+        """Return True while motion is detected."""
+        return self._motion.motion
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return the state attributes."""
+        return {
+            "detection_enabled": self._motion.enabled,
+            "score": round(self._motion.score, 2),
+        }
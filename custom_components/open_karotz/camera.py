@@ -1,18 +1,32 @@
 """Camera platform for Open Karotz snapshot."""
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta
 import logging
 
+from aiohttp import web
 from homeassistant.components.camera import Camera
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-from .const import BASE_URL, DOMAIN
+from homeassistant.helpers.event import async_track_time_interval
+
+from .api import OpenKarotzAPI
+from .archive import OpenKarotzPreTriggerBuffer
+from .const import BASE_URL, DOMAIN, PRE_TRIGGER_INTERVAL, STREAM_KEEPALIVE_FRAMES
+from .entity import OpenKarotzEntity
+from .motion import OpenKarotzMotionDetector
+from .snapshot import (
+    OpenKarotzSnapshotCache,
+    OpenKarotzSnapshotStream,
+    OpenKarotzThumbnailCache,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+MJPEG_BOUNDARY = "frameboundary"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -20,67 +34,135 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz camera entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzCamera(host, entry.entry_id)])
-
-
-class OpenKarotzCamera(Camera):
+    data = entry.runtime_data
+    async_add_entities(
+        [
+            OpenKarotzCamera(
+                data.api,
+                data.snapshots,
+                OpenKarotzThumbnailCache(hass),
+                data.motion,
+                data.pre_trigger,
+                entry.entry_id,
+            )
+        ]
+    )
+
+
+class OpenKarotzCamera(OpenKarotzEntity, Camera):
     """Representation of the Open Karotz camera."""
 
     _attr_name = "Open Karotz Camera"
     _attr_translation_key = "camera"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(
+        self,
+        api: OpenKarotzAPI,
+        snapshots: OpenKarotzSnapshotCache,
+        thumbnails: OpenKarotzThumbnailCache,
+        motion: OpenKarotzMotionDetector,
+        pre_trigger: OpenKarotzPreTriggerBuffer,
+        entry_id: str,
+    ) -> None:
         """Initialize the camera."""
         super().__init__()
-        self._host = host
+        self._api = api
+        self._snapshots = snapshots
+        self._thumbnails = thumbnails
+        self._motion = motion
+        self._pre_trigger = pre_trigger
+        self._stream = OpenKarotzSnapshotStream(snapshots)
         self._attr_unique_id = f"{entry_id}_camera"
-        self._last_image = None
 
-    async def _async_capture_snapshot(self) -> bytes | None:
-        """Capture a snapshot from Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-        import json
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/snapshot?silent=1") as resp:
-                if resp.status == 200:
-                    content_type = resp.headers.get("content-type", "")
-                    if "image" in content_type:
-                        return await resp.read()
-                    text = await resp.text()
-                    try:
-                        json_data = json.loads(text)
-                        _LOGGER.error("Snapshot API returned JSON instead of image: %s", json_data)
-                        return None
-                    except json.JSONDecodeError:
-                        _LOGGER.error("Snapshot API returned non-image content: %s", text[:100])
-                        return None
-                _LOGGER.error("Failed to capture snapshot: %s", resp.status)
-                return None
-        except Exception as err:
-            _LOGGER.error("Error capturing snapshot: %s", err)
-            return None
+    @property
+    def frame_interval(self) -> float:
+        """Return the interval between frames of the MJPEG stream."""
+        return self._stream.interval
 
     def camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
         """Return the current image."""
-        return self._last_image
+        return self._snapshots.image
 
     async def async_camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
         """Return the current image."""
-        self._last_image = await self._async_capture_snapshot()
-        return self._last_image
+        image = await self._snapshots.async_get()
+        if image is None or width is None or height is None:
+            return image
+        return await self._thumbnails.async_get(image, width, height)
+
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse | None:
+        """Serve the shared snapshot stream as MJPEG.
+
+        While no frames arrive (device offline, breaker open) the last
+        frame is repeated now and then, so a viewer that went away shows up
+        as a failed write and stops holding the producer.
+        """
+        response = web.StreamResponse()
+        response.content_type = f"multipart/x-mixed-replace;boundary={MJPEG_BOUNDARY}"
+        await response.prepare(request)
+
+        queue = self._stream.subscribe()
+        frame: bytes | None = None
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        queue.get(), self._stream.interval * STREAM_KEEPALIVE_FRAMES
+                    )
+                except asyncio.TimeoutError:
+                    frame = frame or self._snapshots.image
+                    if frame is None:
+                        await response.write(b"\r\n")
+                        continue
+                else:
+                    if frame is None:
+                        break
+                await response.write(
+                    b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                    % (MJPEG_BOUNDARY.encode(), len(frame))
+                    + frame
+                    + b"\r\n"
+                )
+        except ConnectionResetError:
+            _LOGGER.debug("MJPEG viewer disconnected")
+        finally:
+            self._stream.unsubscribe(queue)
+        return response
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop the stream producer."""
+        await self._stream.async_close()
+        await super().async_will_remove_from_hass()
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._motion.async_add_listener(self.async_write_ha_state))
+        if self._pre_trigger.enabled:
+            self.async_on_remove(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_buffer_snapshot,
+                    timedelta(seconds=PRE_TRIGGER_INTERVAL),
+                    name=f"{DOMAIN} pre-trigger buffer",
+                )
+            )
+
+    async def _async_buffer_snapshot(self, _now: datetime) -> None:
+        """Keep the pre-trigger buffer filled."""
+        await self._pre_trigger.async_capture()
 
     async def async_enable_motion_detection(self) -> None:
         """Enable motion detection."""
-        pass
+        self._motion.async_enable()
 
     async def async_disable_motion_detection(self) -> None:
         """Disable motion detection."""
-        pass
+        self._motion.async_disable()
 
     @property
     def motion_detection_enabled(self) -> bool:
         """Return the motion detection status."""
-        return False
+        return self._motion.enabled
@@ -0,0 +1,222 @@
+"""Catalog cache for the sound, voice, mood and radio lists of Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import copy
+import hashlib
+import json
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.service import async_set_service_schema
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import OpenKarotzAPI
+from .const import (
+    CATALOG_MOODS,
+    CATALOG_RADIOS,
+    CATALOG_SAVE_DELAY,
+    CATALOG_SOUNDS,
+    CATALOG_STORAGE_KEY,
+    CATALOG_STORAGE_VERSION,
+    CATALOG_TTL,
+    CATALOG_VOICES,
+    DOMAIN,
+    MOOD_IDS,
+    SOUND_LIST,
+    TTS_VOICES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Built-in lists, used until the device catalog has been fetched once.
+CATALOG_DEFAULTS: dict[str, dict[str, str]] = {
+    CATALOG_SOUNDS: {sound: sound for sound in SOUND_LIST},
+    CATALOG_VOICES: dict(TTS_VOICES),
+    CATALOG_MOODS: {mood: mood for mood in MOOD_IDS},
+    CATALOG_RADIOS: {},
+}
+
+# (service, field, catalog) triples whose selector follows a catalog.
+CATALOG_SELECTORS = (
+    ("play_sound", "sound_id", CATALOG_SOUNDS),
+    ("tts", "voice", CATALOG_VOICES),
+    ("set_mood", "mood_id", CATALOG_MOODS),
+)
+
+_ID_KEYS = ("id", "url", "name")
+_LABEL_KEYS = ("name", "title", "label", "url")
+
+
+def _parse_item(item: Any) -> tuple[str, str] | None:
+    """Return the id and label of one catalog item."""
+    if isinstance(item, dict):
+        item_id = next((str(item[key]) for key in _ID_KEYS if item.get(key)), None)
+        if item_id is None:
+            return None
+        label = next((str(item[key]) for key in _LABEL_KEYS if item.get(key)), item_id)
+        return item_id, label
+    if isinstance(item, (str, int)) and str(item).strip():
+        return str(item).strip(), str(item).strip()
+    return None
+
+
+def parse_catalog(text: str) -> dict[str, str]:
+    """Parse a catalog listing into an ordered mapping of id to label.
+
+    The device answers either with JSON (a list, an object wrapping one, or
+    an id to label mapping) or with plain text: one ``id[,label]`` per line,
+    or a single comma-separated line of ids.
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = None
+
+    if isinstance(data, dict):
+        wrapped = next((value for value in data.values() if isinstance(value, list)), None)
+        if wrapped is None:
+            return {str(key): str(value) for key, value in data.items()}
+        data = wrapped
+
+    if isinstance(data, list):
+        items = (_parse_item(item) for item in data)
+        return dict(item for item in items if item is not None)
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) == 1:
+        return {item: item for item in (part.strip() for part in lines[0].split(",")) if item}
+    catalog: dict[str, str] = {}
+    for line in lines:
+        item_id, _, label = line.partition(",")
+        catalog[item_id.strip()] = label.strip() or item_id.strip()
+    return catalog
+
+
+class OpenKarotzCatalog:
+    """Cache the catalogs of one device in memory and on disk.
+
+    Catalogs are fetched lazily, parsed once and persisted with their fetch
+    time and a hash of the raw listing, so restarts serve them from the
+    store until the TTL expires. A refetch whose hash is unchanged only
+    renews the TTL.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: OpenKarotzAPI,
+        entry_id: str,
+        ttl: float = CATALOG_TTL,
+    ) -> None:
+        """Initialize the catalog cache."""
+        self.hass = hass
+        self._ttl = ttl
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, CATALOG_STORAGE_VERSION, f"{CATALOG_STORAGE_KEY}.{entry_id}"
+        )
+        self._fetchers: dict[str, Callable[[], Awaitable[str | None]]] = {
+            CATALOG_SOUNDS: api.get_sound_list,
+            CATALOG_VOICES: api.get_voice_list,
+            CATALOG_MOODS: api.get_moods_list,
+            CATALOG_RADIOS: api.get_radio_list,
+        }
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._refreshing: dict[str, asyncio.Task[bool]] = {}
+        self._listeners: list[Callable[[str], None]] = []
+
+    async def async_load(self) -> None:
+        """Load persisted catalogs."""
+        if data := await self._store.async_load():
+            self._entries = data
+
+    def get(self, kind: str) -> dict[str, str]:
+        """Return a catalog as an id to label mapping."""
+        if entry := self._entries.get(kind):
+            return entry["items"]
+        return CATALOG_DEFAULTS[kind]
+
+    def is_stale(self, kind: str, max_age: float | None = None) -> bool:
+        """Return True if a catalog is missing or older than the TTL or ``max_age``."""
+        entry = self._entries.get(kind)
+        if max_age is None:
+            max_age = self._ttl
+        return entry is None or dt_util.utcnow().timestamp() - entry["fetched_at"] >= max_age
+
+    @callback
+    def async_add_listener(self, listener: Callable[[str], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` with the catalog kind whenever a catalog changes."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def async_ensure_fresh(
+        self, kinds: list[str] | None = None, max_age: float | None = None
+    ) -> None:
+        """Refresh every stale catalog, or only ``kinds``, in the background."""
+        for kind in kinds or self._fetchers:
+            if self.is_stale(kind, max_age) and kind not in self._refreshing:
+                task = self.hass.async_create_background_task(
+                    self.async_refresh(kind), f"{DOMAIN} catalog {kind}"
+                )
+                self._refreshing[kind] = task
+                task.add_done_callback(lambda _, kind=kind: self._refreshing.pop(kind, None))
+
+    async def async_refresh(self, kind: str) -> bool:
+        """Fetch a catalog from the device and return True if it changed."""
+        text = await self._fetchers[kind]()
+        if text is None:
+            return False
+
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        now = dt_util.utcnow().timestamp()
+        entry = self._entries.get(kind)
+        changed = entry is None or entry["hash"] != digest
+        if changed:
+            items = parse_catalog(text)
+            if not items:
+                _LOGGER.warning("Ignoring empty %s catalog", kind)
+                return False
+            self._entries[kind] = {"hash": digest, "fetched_at": now, "items": items}
+        else:
+            entry["fetched_at"] = now
+        self._store.async_delay_save(lambda: self._entries, CATALOG_SAVE_DELAY)
+
+        if changed:
+            for listener in list(self._listeners):
+                listener(kind)
+        return changed
+
+    async def async_shutdown(self) -> None:
+        """Cancel running catalog refreshes."""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+
+
+@callback
+def async_update_service_selectors(
+    hass: HomeAssistant,
+    services: dict[str, Any] | None,
+    catalog: OpenKarotzCatalog,
+) -> None:
+    """Point the service selectors from services.yaml at the cached catalogs."""
+    if not services:
+        return
+    for service, field, kind in CATALOG_SELECTORS:
+        if field not in (services.get(service) or {}).get("fields", {}):
+            continue
+        description = copy.deepcopy(services[service])
+        description["fields"][field]["selector"] = {
+            "select": {
+                "options": [
+                    {"value": item_id, "label": label}
+                    for item_id, label in catalog.get(kind).items()
+                ],
+                "mode": "dropdown",
+            }
+        }
+        async_set_service_schema(hass, DOMAIN, service, description)
@@ -7,11 +7,31 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_ARCHIVE_SNAPSHOTS,
+    CONF_COALESCE_WINDOW,
+    CONF_FTP_BIND,
+    CONF_FTP_PORT,
+    CONF_FTP_RECEIVER,
+    CONF_OFFLINE_JOURNAL,
+    CONF_MOTION_REGION,
+    CONF_MOTION_THRESHOLD,
+    CONF_PRE_TRIGGER_FRAMES,
+    CONF_SNAPSHOT_MAX_AGE,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_MOTION_REGION,
+    DEFAULT_MOTION_THRESHOLD,
+    DEFAULT_PRE_TRIGGER_FRAMES,
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    DOMAIN,
+    FTP_DEFAULT_BIND,
+    FTP_DEFAULT_PORT,
+)
+from .motion import validate_region
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +58,14 @@ class OpenKarotzConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OpenKarotzOptionsFlow:
+        """Get the options flow for this handler."""
+        return OpenKarotzOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -66,5 +94,77 @@ class OpenKarotzConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OpenKarotzOptionsFlow(config_entries.OptionsFlow):
+    """Handle Open Karotz options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(
+                            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                    vol.Optional(
+                        CONF_SNAPSHOT_MAX_AGE,
+                        default=options.get(
+                            CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=300)),
+                    vol.Optional(
+                        CONF_MOTION_THRESHOLD,
+                        default=options.get(
+                            CONF_MOTION_THRESHOLD, DEFAULT_MOTION_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_MOTION_REGION,
+                        default=options.get(CONF_MOTION_REGION, DEFAULT_MOTION_REGION),
+                    ): vol.All(str, validate_region),
+                    vol.Optional(
+                        CONF_ARCHIVE_SNAPSHOTS,
+                        default=options.get(CONF_ARCHIVE_SNAPSHOTS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_PRE_TRIGGER_FRAMES,
+                        default=options.get(
+                            CONF_PRE_TRIGGER_FRAMES, DEFAULT_PRE_TRIGGER_FRAMES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=20)),
+                    vol.Optional(
+                        CONF_FTP_RECEIVER,
+                        default=options.get(CONF_FTP_RECEIVER, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_FTP_BIND,
+                        default=options.get(CONF_FTP_BIND, FTP_DEFAULT_BIND),
+                    ): str,
+                    vol.Optional(
+                        CONF_FTP_PORT,
+                        default=options.get(CONF_FTP_PORT, FTP_DEFAULT_PORT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                    vol.Optional(
+                        CONF_OFFLINE_JOURNAL,
+                        default=options.get(CONF_OFFLINE_JOURNAL, False),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class InvalidHost(HomeAssistantError):
     """Error to indicate there is an invalid hostname."""
\ No newline at end of file
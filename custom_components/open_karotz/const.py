@@ -5,6 +5,180 @@ DOMAIN = "open_karotz"
 # API Base URL
 BASE_URL = "http://192.168.1.70"
 
+# Command Queue
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_QUEUE_TIMEOUT = 10.0
+
+# Connection Pool
+CONNECTION_LIMIT_PER_HOST = 2
+CONNECTION_KEEPALIVE_TIMEOUT = 30.0
+CONNECTION_DNS_CACHE_TTL = 300
+DEFAULT_REQUEST_TIMEOUT = 5.0
+ENDPOINT_TIMEOUTS = {
+    "/cgi-bin/snapshot": 20.0,
+    "/cgi-bin/tts": 15.0,
+    "/cgi-bin/sound": 10.0,
+    "/cgi-bin/sound_list": 10.0,
+    "/cgi-bin/voice_list": 10.0,
+    "/cgi-bin/moods_list": 10.0,
+    "/cgi-bin/radio_list": 10.0,
+}
+
+# Retries
+IDEMPOTENT_ENDPOINTS = {
+    "/cgi-bin/leds",
+    "/cgi-bin/ears",
+    "/cgi-bin/ears_reset",
+    "/cgi-bin/volume",
+    "/cgi-bin/get_free_space",
+    "/cgi-bin/rfid_list",
+    "/cgi-bin/sound_list",
+    "/cgi-bin/voice_list",
+    "/cgi-bin/moods_list",
+    "/cgi-bin/radio_list",
+    "/cgi-bin/snapshot_list",
+}
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BACKOFF_BASE = 0.25
+RETRY_BACKOFF_MAX = 2.0
+DEFAULT_REQUEST_DEADLINE = 15.0
+
+# Circuit Breaker
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RECOVERY_TIMEOUT = 15.0
+BREAKER_MAX_RECOVERY_TIMEOUT = 300.0
+BREAKER_PROBE_ENDPOINT = "/cgi-bin/get_free_space"
+
+# Command Coalescing
+COMMAND_CLASS_LED = "led"
+COMMAND_CLASS_EARS = "ears"
+COMMAND_CLASS_VOLUME = "volume"
+COMMAND_CLASS_MOOD = "mood"
+COMMAND_CLASS_POWER = "power"
+DEFAULT_COALESCE_WINDOW = 0.2
+
+# Audio Scheduling
+AUDIO_PRIORITY_LOW = "low"
+AUDIO_PRIORITY_NORMAL = "normal"
+AUDIO_PRIORITY_URGENT = "urgent"
+AUDIO_PRIORITIES = {AUDIO_PRIORITY_LOW: 0, AUDIO_PRIORITY_NORMAL: 1, AUDIO_PRIORITY_URGENT: 2}
+# Seconds an item may wait before it is dropped; urgent items never expire.
+AUDIO_MAX_WAIT = {AUDIO_PRIORITY_LOW: 30.0, AUDIO_PRIORITY_NORMAL: 120.0}
+TTS_CHARS_PER_SECOND = 14.0
+TTS_SYNTHESIS_DELAY = 1.5
+# Longest URL-encoded text sent in one TTS request; the first chunk is kept
+# short so speech starts quickly whatever the message length.
+TTS_MAX_CHUNK_LENGTH = 400
+TTS_FIRST_CHUNK_LENGTH = 120
+
+# Notifications
+# Messages arriving within the window are spoken as one announcement, but
+# none waits longer than the max latency.
+NOTIFY_WINDOW = 2.0
+NOTIFY_MAX_LATENCY = 8.0
+DATA_HASS_CONFIG = "open_karotz_hass_config"
+DATA_NOTIFY = "open_karotz_notify"
+
+# Media Proxy
+MEDIA_CACHE_DIR = "open_karotz_media"
+MEDIA_CACHE_MAX_BYTES = 100 * 1024 * 1024
+MEDIA_MAX_FILE_BYTES = 20 * 1024 * 1024
+MEDIA_CHUNK_SIZE = 65536
+MEDIA_DOWNLOAD_TIMEOUT = 60
+MEDIA_TOKEN_MAX = 256
+MEDIA_SAVE_DELAY = 10
+MEDIA_STORAGE_VERSION = 1
+MEDIA_STORAGE_KEY = "open_karotz.media"
+MEDIA_VIEW_URL = "/api/open_karotz/media/{filename}"
+DATA_MEDIA_CACHE = "open_karotz_media_cache"
+
+# Sound Staging
+STAGING_MIN_PLAYS = 3
+STAGING_MAX_TRACKED = 200
+STAGING_MAX_BYTES = 20 * 1024 * 1024
+# No clip is staged once the device storage is this full.
+STAGING_MAX_USED_PERCENT = 90
+STAGING_SAVE_DELAY = 30
+# While clips wait to be copied, the device sound list is refetched this
+# often so staged copies are picked up without waiting for the catalog TTL.
+STAGING_CATALOG_MAX_AGE = 300
+STAGING_STORAGE_VERSION = 1
+STAGING_STORAGE_KEY = "open_karotz.staging"
+SOUND_DEFAULT_DURATION = 3.0
+SOUND_URL_DEFAULT_DURATION = 10.0
+MOOD_DEFAULT_DURATION = 8.0
+
+# Offline Journal
+JOURNAL_SAVE_DELAY = 1
+JOURNAL_STORAGE_VERSION = 1
+JOURNAL_STORAGE_KEY = "open_karotz.journal"
+
+# Polling
+DEFAULT_SCAN_INTERVAL = 30
+POLL_BURST_INTERVAL = 0.5
+POLL_BURST_DURATION = 10.0
+POLL_DECAY_FACTOR = 2.0
+STORAGE_SCAN_INTERVAL = 300
+POLL_MAX_CONCURRENT = 4
+DATA_SCHEDULER = "open_karotz_scheduler"
+DATA_STORAGE = "storage"
+DATA_RFID = "rfid"
+DATA_EARS = "ears"
+
+# Catalogs
+CATALOG_SOUNDS = "sounds"
+CATALOG_VOICES = "voices"
+CATALOG_MOODS = "moods"
+CATALOG_RADIOS = "radios"
+CATALOG_TTL = 86400
+CATALOG_SAVE_DELAY = 10
+CATALOG_STORAGE_VERSION = 1
+CATALOG_STORAGE_KEY = "open_karotz.catalog"
+DATA_SERVICES = "open_karotz_services"
+
+# Snapshots
+DEFAULT_SNAPSHOT_MAX_AGE = 5.0
+SNAPSHOT_MAX_BYTES = 1024 * 1024
+SNAPSHOT_CHUNK_SIZE = 16384
+SNAPSHOT_ENDPOINT = "/cgi-bin/snapshot?silent=1"
+SNAPSHOT_VIEW_URL = "/api/open_karotz/snapshot/{entry_id}"
+STREAM_TARGET_FPS = 2.0
+STREAM_LATENCY_SMOOTHING = 0.3
+# Without a frame for this many intervals the last frame is sent again,
+# so viewers that went away are noticed while the device is silent.
+STREAM_KEEPALIVE_FRAMES = 10
+THUMBNAIL_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Motion Detection
+MOTION_INTERVAL = 2.0
+MOTION_FRAME_SIZE = (64, 48)
+MOTION_PIXEL_DELTA = 25
+DEFAULT_MOTION_THRESHOLD = 2.0
+DEFAULT_MOTION_REGION = "0,0,1,1"
+EVENT_MOTION = "open_karotz_motion"
+
+# Snapshot Archive
+SNAPSHOT_FILE_PATH = "/snapshots/"
+ARCHIVE_DIR = "open_karotz_snapshots"
+ARCHIVE_INDEX_FILE = "index.json"
+ARCHIVE_SYNC_INTERVAL = 600
+ARCHIVE_MAX_AGE = 7 * 86400
+ARCHIVE_MAX_BYTES = 200 * 1024 * 1024
+PRE_TRIGGER_INTERVAL = 5.0
+PRE_TRIGGER_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_PRE_TRIGGER_FRAMES = 0
+DEFAULT_POST_TRIGGER_FRAMES = 3
+POST_TRIGGER_INTERVAL = 1.0
+EVENT_SNAPSHOTS_FLUSHED = "open_karotz_snapshots_flushed"
+
+# Timelapse
+TIMELAPSE_DIR = "open_karotz_timelapses"
+DEFAULT_TIMELAPSE_HOURS = 24
+DEFAULT_TIMELAPSE_FPS = 10
+TIMELAPSE_PROGRESS_STEP = 10
+EVENT_TIMELAPSE_PROGRESS = "open_karotz_timelapse_progress"
+EVENT_TIMELAPSE_DONE = "open_karotz_timelapse_done"
+
 # Storage
 STORAGE_KAROTZ = "karotz_percent_used_space"
 STORAGE_USB = "usb_percent_used_space"
@@ -73,10 +247,26 @@ SQUEEZEBOX_STOP = "stop"
 
 # FTP Upload
 FTP_DEFAULT_PORT = 21
+FTP_DEFAULT_BIND = "0.0.0.0"
+FTP_REMOTE_DIR = "/"
+FTP_DATA_TIMEOUT = 10.0
+FTP_UPLOAD_TIMEOUT = 15.0
+FTP_MAX_UPLOAD_BYTES = 4 * 1024 * 1024
+DATA_FTP = "open_karotz_ftp"
 
 # Configuration
 CONF_HOST = "host"
 CONF_NAME = "name"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_SNAPSHOT_MAX_AGE = "snapshot_max_age"
+CONF_MOTION_THRESHOLD = "motion_threshold"
+CONF_MOTION_REGION = "motion_region"
+CONF_ARCHIVE_SNAPSHOTS = "archive_snapshots"
+CONF_PRE_TRIGGER_FRAMES = "pre_trigger_frames"
+CONF_FTP_RECEIVER = "ftp_receiver"
+CONF_FTP_BIND = "ftp_bind"
+CONF_FTP_PORT = "ftp_port"
+CONF_OFFLINE_JOURNAL = "offline_journal"
 
 # Default Values
 DEFAULT_NAME = "Open Karotz"
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""Data update coordinator for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import OpenKarotzAPI
+from .const import (
+    DATA_EARS,
+    DATA_RFID,
+    DATA_STORAGE,
+    DEFAULT_SCAN_INTERVAL,
+    POLL_BURST_DURATION,
+    POLL_BURST_INTERVAL,
+    POLL_DECAY_FACTOR,
+    STORAGE_SCAN_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from . import OpenKarotzPollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OpenKarotzCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Poll storage, RFID and ear state of one device in a single cycle.
+
+    The poll rate adapts to activity: a command or a detected RFID/ear
+    change switches to sub-second polling for a short burst, after which
+    the interval decays back to the idle rate. Storage usage changes
+    slowly and is refreshed on its own, much longer cadence.
+
+    With a scheduler, polls are aligned to this device's phase slot and
+    share the integration-wide concurrency cap with all other devices.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: OpenKarotzAPI,
+        scheduler: OpenKarotzPollScheduler | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        # Polling is driven by our own timer, which unlike the built-in
+        # one supports sub-second intervals.
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"Open Karotz {api.host}",
+            update_interval=None,
+        )
+        self.api = api
+        self.poll_interval: float = DEFAULT_SCAN_INTERVAL
+        self._burst_until = 0.0
+        self._next_storage_poll = 0.0
+        self._unsub_poll: CALLBACK_TYPE | None = None
+        self._unsub_activity: CALLBACK_TYPE | None = api.async_add_activity_listener(
+            self.async_note_activity
+        )
+        self._scheduler = scheduler
+        self._unsub_scheduler: CALLBACK_TYPE | None = None
+        if scheduler is not None:
+            self._unsub_scheduler = scheduler.async_register(self)
+
+    @callback
+    def async_note_activity(self) -> None:
+        """Switch to burst polling after a command or a detected change."""
+        self._burst_until = self.hass.loop.time() + POLL_BURST_DURATION
+        if self.poll_interval > POLL_BURST_INTERVAL:
+            self.poll_interval = POLL_BURST_INTERVAL
+            if self._unsub_poll is not None:
+                self.async_schedule_poll()
+
+    @callback
+    def async_schedule_poll(self) -> None:
+        """Arm the poll timer with the current interval."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+        delay = self.poll_interval
+        if self._scheduler is not None:
+            delay = self._scheduler.delay(self, delay)
+        self._unsub_poll = async_call_later(self.hass, delay, self._async_handle_poll)
+
+    async def _async_handle_poll(self, _now: datetime) -> None:
+        """Run a scheduled poll and arm the next one."""
+        self._unsub_poll = None
+        if self._scheduler is not None:
+            await self._scheduler.async_run(self.async_refresh)
+        else:
+            await self.async_refresh()
+        if self.hass.loop.time() >= self._burst_until:
+            self.poll_interval = min(
+                self.poll_interval * POLL_DECAY_FACTOR, DEFAULT_SCAN_INTERVAL
+            )
+        self.async_schedule_poll()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the poll timer and listeners."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._unsub_activity is not None:
+            self._unsub_activity()
+            self._unsub_activity = None
+        if self._unsub_scheduler is not None:
+            self._unsub_scheduler()
+            self._unsub_scheduler = None
+        await super().async_shutdown()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from Open Karotz."""
+        previous = self.data or {}
+        now = self.hass.loop.time()
+        poll_storage = now >= self._next_storage_poll or DATA_STORAGE not in previous
+
+        requests = [self.api.get_rfid_list(), self.api.get_ear_position()]
+        if poll_storage:
+            requests.append(self.api.get_free_space())
+        rfid, ears, *storage = await asyncio.gather(*requests)
+
+        if not self.api.available:
+            raise UpdateFailed(f"Open Karotz at {self.api.host} is unreachable")
+
+        if poll_storage:
+            self._next_storage_poll = now + STORAGE_SCAN_INTERVAL
+            storage = storage[0]
+        else:
+            storage = previous.get(DATA_STORAGE)
+
+        if previous and (
+            rfid != previous.get(DATA_RFID) or ears != previous.get(DATA_EARS)
+        ):
+            self.async_note_activity()
+
+        return {DATA_STORAGE: storage, DATA_RFID: rfid, DATA_EARS: ears}
@@ -5,11 +5,22 @@ import logging
 
 from homeassistant.components.cover import CoverEntity, CoverEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-from .const import BASE_URL, DOMAIN, EAR_DOWN, EAR_HORIZONTAL, EAR_MAX, EAR_MIN, EAR_UP
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    BASE_URL,
+    DATA_EARS,
+    DOMAIN,
+    EAR_DOWN,
+    EAR_HORIZONTAL,
+    EAR_MAX,
+    EAR_MIN,
+    EAR_UP,
+)
+from .coordinator import OpenKarotzCoordinator
+from .entity import OpenKarotzEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,11 +31,10 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz cover entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzEars(host, entry.entry_id)])
+    async_add_entities([OpenKarotzEars(entry.runtime_data.coordinator, entry.entry_id)])
 
 
-class OpenKarotzEars(CoverEntity):
+class OpenKarotzEars(OpenKarotzEntity, CoordinatorEntity, CoverEntity):
     """Representation of the Open Karotz ears."""
 
     _attr_name = "Open Karotz Ears"
@@ -36,57 +46,37 @@ class OpenKarotzEars(CoverEntity):
     )
     _attr_translation_key = "ears"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(self, coordinator: OpenKarotzCoordinator, entry_id: str) -> None:
         """Initialize the ears."""
-        self._host = host
+        super().__init__(coordinator)
+        self._api = coordinator.api
         self._attr_unique_id = f"{entry_id}_ears"
         self._left_position = EAR_HORIZONTAL
         self._right_position = EAR_HORIZONTAL
 
     async def _async_send_command(self, left: int, right: int) -> bool:
         """Send command to Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears?left={left}&right={right}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to set ear position: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error sending command: %s", err)
-            return False
+        return await self._api.set_ear_position(left, right)
 
     async def _async_send_reset(self) -> bool:
         """Send reset command to Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears_reset") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to reset ears: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error sending command: %s", err)
-            return False
+        return await self._api.reset_ears()
 
     async def _async_send_random(self) -> bool:
         """Send random command to Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/ears_random") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to set random ear position: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error sending command: %s", err)
-            return False
+        return await self._api.random_ears()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        ears = (self.coordinator.data or {}).get(DATA_EARS)
+        if ears:
+            try:
+                self._left_position = int(ears["left"])
+                self._right_position = int(ears["right"])
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Unexpected ear position data: %s", ears)
+        super()._handle_coordinator_update()
 
     @property
     def is_closed(self) -> bool | None:
@@ -0,0 +1,55 @@
+"""Diagnostics support for Open Karotz."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .catalog import CATALOG_DEFAULTS
+from .const import DATA_MEDIA_CACHE
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = entry.runtime_data
+    api = data.api
+    last_result = None
+    if api.last_result is not None:
+        last_result = asdict(api.last_result)
+        last_result.pop("data")
+    return {
+        "host": api.host,
+        "options": dict(entry.options),
+        "command_queue": api.stats,
+        "last_request": last_result,
+        "coordinator": {
+            "last_update_success": data.coordinator.last_update_success,
+            "poll_interval": data.coordinator.poll_interval,
+            "data": data.coordinator.data,
+        },
+        "snapshots": data.snapshots.stats,
+        "archive": data.archive.stats,
+        "audio": data.audio.stats,
+        "announcements": data.announcements.stats,
+        "staging": {**data.staging.stats, "candidates": data.staging.candidates},
+        "journal": data.journal.stats if data.journal else None,
+        "media_cache": (
+            cache.stats if (cache := hass.data.get(DATA_MEDIA_CACHE)) else None
+        ),
+        "motion": {
+            "enabled": data.motion.enabled,
+            "motion": data.motion.motion,
+            "score": data.motion.score,
+        },
+        "catalogs": {
+            kind: {
+                "items": len(data.catalog.get(kind)),
+                "stale": data.catalog.is_stale(kind),
+            }
+            for kind in CATALOG_DEFAULTS
+        },
+    }
@@ -0,0 +1,22 @@
+"""Base entity for Open Karotz."""
+from __future__ import annotations
+
+from homeassistant.helpers.entity import Entity
+
+from .api import OpenKarotzAPI
+
+
+class OpenKarotzEntity(Entity):
+    """Entity whose availability follows the device circuit breaker."""
+
+    _api: OpenKarotzAPI
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return super().available and self._api.available
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._api.async_add_listener(self.async_write_ha_state))
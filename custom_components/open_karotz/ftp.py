@@ -0,0 +1,276 @@
+"""Embedded FTP receiver for snapshots pushed by Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import posixpath
+import secrets
+
+from .const import FTP_DATA_TIMEOUT, FTP_MAX_UPLOAD_BYTES
+
+_LOGGER = logging.getLogger(__name__)
+
+UploadCallback = Callable[[str, bytes], Awaitable[None]]
+
+
+def _parse_port(argument: str) -> tuple[str, int]:
+    """Return the address of a PORT argument, raising ValueError if malformed."""
+    parts = [int(part) for part in argument.split(",")]
+    if len(parts) != 6 or not all(0 <= part <= 255 for part in parts):
+        raise ValueError(argument)
+    return ".".join(map(str, parts[:4])), parts[4] * 256 + parts[5]
+
+
+class _FtpSession:
+    """State of one FTP control connection."""
+
+    def __init__(self) -> None:
+        """Initialize the session."""
+        self.user: str | None = None
+        self.account: str | None = None
+        self.cwd = "/"
+        self.data_server: asyncio.AbstractServer | None = None
+        self.data_connection: asyncio.Future[
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] | None = None
+        self.active_address: tuple[str, int] | None = None
+
+    def close_data(self) -> None:
+        """Close a pending passive listener."""
+        if self.data_server is not None:
+            self.data_server.close()
+            self.data_server = None
+        if self.data_connection is not None and not self.data_connection.done():
+            self.data_connection.cancel()
+        self.data_connection = None
+        self.active_address = None
+
+
+class OpenKarotzFtpReceiver:
+    """Minimal FTP server accepting snapshot uploads from devices.
+
+    Only what a device needs to upload a file is implemented: login,
+    directory navigation, passive or active data connections and STOR.
+    Each device logs in with its own account, so uploads are routed to
+    the callback of the device that made them. Nothing is written to disk
+    by the receiver itself and uploads are bounded in size.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        max_bytes: int = FTP_MAX_UPLOAD_BYTES,
+    ) -> None:
+        """Initialize the receiver."""
+        self._host = host
+        self._port = port
+        self._max_bytes = max_bytes
+        self._server: asyncio.AbstractServer | None = None
+        self._accounts: dict[str, tuple[str, UploadCallback]] = {}
+        self._uploads = 0
+
+    @property
+    def port(self) -> int:
+        """Return the port the receiver listens on."""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self._port
+
+    @property
+    def accounts(self) -> int:
+        """Return the number of registered accounts."""
+        return len(self._accounts)
+
+    @property
+    def uploads(self) -> int:
+        """Return the number of accepted uploads."""
+        return self._uploads
+
+    def add_account(self, user: str, callback: UploadCallback) -> str:
+        """Register an account and return its generated password."""
+        password = secrets.token_hex(16)
+        self._accounts[user] = (password, callback)
+        return password
+
+    def remove_account(self, user: str) -> None:
+        """Remove an account."""
+        self._accounts.pop(user, None)
+
+    async def async_start(self) -> None:
+        """Start listening for control connections."""
+        if self._server is None:
+            self._server = await asyncio.start_server(
+                self._async_handle_control, self._host, self._port
+            )
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _async_handle_control(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one control connection."""
+        session = _FtpSession()
+
+        async def reply(code: int, message: str) -> None:
+            writer.write(f"{code} {message}\r\n".encode())
+            await writer.drain()
+
+        try:
+            await reply(220, "Open Karotz receiver ready")
+            while line := await reader.readline():
+                command, _, argument = line.decode(errors="replace").strip().partition(" ")
+                command = command.upper()
+                if command == "QUIT":
+                    await reply(221, "Bye")
+                    break
+                await self._async_dispatch(session, writer, reply, command, argument)
+        except (ConnectionError, asyncio.IncompleteReadError) as err:
+            _LOGGER.debug("FTP control connection lost: %s", err)
+        finally:
+            session.close_data()
+            writer.close()
+
+    async def _async_dispatch(
+        self,
+        session: _FtpSession,
+        writer: asyncio.StreamWriter,
+        reply: Callable[[int, str], Awaitable[None]],
+        command: str,
+        argument: str,
+    ) -> None:
+        """Handle a single FTP command."""
+        if command == "USER":
+            session.user, session.account = argument, None
+            await reply(331, "Password required")
+        elif command == "PASS":
+            account = self._accounts.get(session.user or "")
+            if account is not None and secrets.compare_digest(account[0], argument):
+                session.account = session.user
+                await reply(230, "Logged in")
+            else:
+                await reply(530, "Login incorrect")
+        elif command in ("SYST", "FEAT", "NOOP", "OPTS"):
+            await reply(
+                {"SYST": 215, "FEAT": 211, "NOOP": 200, "OPTS": 200}[command],
+                "UNIX Type: L8" if command == "SYST" else "OK",
+            )
+        elif session.account is None:
+            await reply(530, "Not logged in")
+        elif command == "TYPE":
+            await reply(200, "Type set")
+        elif command == "PWD":
+            await reply(257, f'"{session.cwd}"')
+        elif command == "CWD":
+            session.cwd = posixpath.normpath(posixpath.join(session.cwd, argument))
+            await reply(250, "Directory changed")
+        elif command == "MKD":
+            await reply(257, f'"{argument}" created')
+        elif command in ("PASV", "EPSV"):
+            await self._async_open_passive(session, writer, reply, command)
+        elif command == "PORT":
+            try:
+                address = _parse_port(argument)
+            except ValueError:
+                await reply(501, "Invalid PORT argument")
+                return
+            session.close_data()
+            session.active_address = address
+            await reply(200, "PORT command successful")
+        elif command == "STOR":
+            await self._async_store(session, reply, argument)
+        else:
+            await reply(502, "Command not implemented")
+
+    async def _async_open_passive(
+        self,
+        session: _FtpSession,
+        writer: asyncio.StreamWriter,
+        reply: Callable[[int, str], Awaitable[None]],
+        command: str,
+    ) -> None:
+        """Open a passive data listener."""
+        session.close_data()
+        connection: asyncio.Future[
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] = asyncio.get_running_loop().create_future()
+
+        async def _async_accept(
+            data_reader: asyncio.StreamReader, data_writer: asyncio.StreamWriter
+        ) -> None:
+            if connection.done():
+                data_writer.close()
+            else:
+                connection.set_result((data_reader, data_writer))
+
+        address = writer.get_extra_info("sockname")[0]
+        session.data_server = await asyncio.start_server(_async_accept, address, 0)
+        session.data_connection = connection
+        port = session.data_server.sockets[0].getsockname()[1]
+        if command == "EPSV":
+            await reply(229, f"Entering Extended Passive Mode (|||{port}|)")
+        else:
+            host = address.replace(".", ",")
+            await reply(227, f"Entering Passive Mode ({host},{port >> 8},{port & 0xFF})")
+
+    async def _async_store(
+        self,
+        session: _FtpSession,
+        reply: Callable[[int, str], Awaitable[None]],
+        argument: str,
+    ) -> None:
+        """Receive an upload over the data connection."""
+        if session.data_connection is None and session.active_address is None:
+            await reply(425, "Use PASV or PORT first")
+            return
+        await reply(150, "Ok to send data")
+        try:
+            if session.active_address is not None:
+                data_reader, data_writer = await asyncio.wait_for(
+                    asyncio.open_connection(*session.active_address), FTP_DATA_TIMEOUT
+                )
+            else:
+                data_reader, data_writer = await asyncio.wait_for(
+                    session.data_connection, FTP_DATA_TIMEOUT
+                )
+        except (asyncio.TimeoutError, OSError):
+            session.close_data()
+            await reply(425, "Can't open data connection")
+            return
+
+        chunks: list[bytes] = []
+        size = 0
+        try:
+            while chunk := await asyncio.wait_for(
+                data_reader.read(65536), FTP_DATA_TIMEOUT
+            ):
+                size += len(chunk)
+                if size > self._max_bytes:
+                    break
+                chunks.append(chunk)
+        except asyncio.TimeoutError:
+            await reply(426, "Data connection timed out")
+            return
+        finally:
+            data_writer.close()
+            session.close_data()
+
+        if size > self._max_bytes:
+            await reply(552, "Upload too large")
+            return
+
+        name = posixpath.basename(posixpath.join(session.cwd, argument))
+        await reply(226, "Transfer complete")
+        if (account := self._accounts.get(session.account)) is None:
+            return
+        self._uploads += 1
+        try:
+            await account[1](name, b"".join(chunks))
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error handling FTP upload %s", name)
@@ -0,0 +1,146 @@
+"""Offline command journal for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import KarotzErrorKind, KarotzResult, OpenKarotzAPI
+from .const import (
+    DOMAIN,
+    JOURNAL_SAVE_DELAY,
+    JOURNAL_STORAGE_KEY,
+    JOURNAL_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Failures meaning the device never got the command.
+OFFLINE_ERRORS = {
+    KarotzErrorKind.TIMEOUT,
+    KarotzErrorKind.CONNECTION,
+    KarotzErrorKind.UNAVAILABLE,
+}
+
+
+class OpenKarotzCommandJournal:
+    """Keep state-setting commands a device missed and replay them later.
+
+    Only the last command of each class (LED, ears, volume, mood, power)
+    is kept, since it describes the desired final state, and classes are
+    replayed in the order they were last set. The journal is persisted,
+    so commands survive a restart. A command the device accepts live
+    supersedes the journaled one of its class.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: OpenKarotzAPI, entry_id: str) -> None:
+        """Initialize the journal."""
+        self.hass = hass
+        self._api = api
+        self._entry_id = entry_id
+        self._store: Store[dict[str, str]] = Store(
+            hass, JOURNAL_STORAGE_VERSION, f"{JOURNAL_STORAGE_KEY}.{entry_id}"
+        )
+        self._entries: dict[str, str] = {}
+        self._replay: asyncio.Task[int] | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+        self._recorded = 0
+        self._replayed = 0
+
+    @property
+    def entries(self) -> dict[str, str]:
+        """Return the pending commands by class, oldest first."""
+        return dict(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return journal counters."""
+        return {
+            "pending": len(self._entries),
+            "recorded": self._recorded,
+            "replayed": self._replayed,
+        }
+
+    async def async_load(self) -> None:
+        """Load the journal and follow the device availability."""
+        if data := await self._store.async_load():
+            self._entries = data
+        self._api.set_command_observer(self.observe)
+        self._unsub = self._api.async_add_listener(self._async_availability_changed)
+
+    def observe(self, command_class: str, endpoint: str, result: KarotzResult) -> None:
+        """Journal a command the device missed, or clear a delivered class."""
+        if result.ok:
+            if self._entries.pop(command_class, None) is not None:
+                self._save()
+            return
+        if result.error not in OFFLINE_ERRORS:
+            return
+        if self._entries.get(command_class) == endpoint:
+            return
+        # Re-insert so classes replay in the order they were last set.
+        self._entries.pop(command_class, None)
+        self._entries[command_class] = endpoint
+        self._recorded += 1
+        self._save()
+
+    def _save(self) -> None:
+        """Persist the journal."""
+        self._store.async_delay_save(lambda: self._entries, JOURNAL_SAVE_DELAY)
+
+    @callback
+    def _async_availability_changed(self) -> None:
+        """Replay the journal once the device is back."""
+        if self._api.available:
+            self.async_schedule_replay()
+
+    @callback
+    def async_schedule_replay(self) -> None:
+        """Replay pending commands in the background."""
+        if self._entries and (self._replay is None or self._replay.done()):
+            self._replay = self.hass.async_create_background_task(
+                self.async_replay(), f"{DOMAIN} journal replay {self._entry_id}"
+            )
+            self._replay.add_done_callback(self._async_replay_done)
+
+    @callback
+    def _async_replay_done(self, task: asyncio.Task[int]) -> None:
+        """Forget a finished replay."""
+        if self._replay is task:
+            self._replay = None
+
+    async def async_replay(self) -> int:
+        """Send the pending commands in order and return how many succeeded.
+
+        Stops at the first failure; the rest stays journaled. Classes with
+        a live command waiting in the queue are skipped, so a stale value
+        never replaces a newer one.
+        """
+        sent = 0
+        for command_class, endpoint in list(self._entries.items()):
+            if self._entries.get(command_class) != endpoint:
+                continue
+            if self._api.has_pending(command_class):
+                continue
+            result = await self._api.async_request(endpoint, command_class=command_class)
+            if not result.ok:
+                _LOGGER.debug("Journal replay stopped at %s: %s", endpoint, result.error)
+                break
+            if self._entries.get(command_class) == endpoint:
+                del self._entries[command_class]
+            sent += 1
+        self._replayed += sent
+        self._save()
+        return sent
+
+    async def async_close(self) -> None:
+        """Stop following the device and cancel a running replay."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._api.set_command_observer(None)
+        if self._replay is not None:
+            self._replay.cancel()
+            self._replay = None
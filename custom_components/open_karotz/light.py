@@ -5,11 +5,13 @@ import logging
 
 from homeassistant.components.light import ColorMode, LightEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import BASE_URL, DOMAIN, LED_COLORS
+from .coordinator import OpenKarotzCoordinator
+from .entity import OpenKarotzEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,11 +22,10 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz light entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzLed(host, entry.entry_id)])
+    async_add_entities([OpenKarotzLed(entry.runtime_data.coordinator, entry.entry_id)])
 
 
-class OpenKarotzLed(LightEntity):
+class OpenKarotzLed(OpenKarotzEntity, CoordinatorEntity, LightEntity):
     """Representation of the Open Karotz LED."""
 
     _attr_name = "Open Karotz LED"
@@ -32,34 +33,17 @@ class OpenKarotzLed(LightEntity):
     _attr_supported_color_modes = {ColorMode.RGB}
     _attr_translation_key = "led"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(self, coordinator: OpenKarotzCoordinator, entry_id: str) -> None:
         """Initialize the LED."""
-        self._host = host
+        super().__init__(coordinator)
+        self._api = coordinator.api
         self._attr_unique_id = f"{entry_id}_led"
         self._attr_is_on = False
         self._rgb_color = (0, 0, 0)
 
     async def _async_send_command(self, color: str) -> bool:
         """Send command to Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/leds?color={color}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to set LED color: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error sending command: %s", err)
-            return False
-
-    async def async_update(self) -> None:
-        """Update the entity status."""
-        if self._rgb_color != (0, 0, 0):
-            self._attr_is_on = True
-        else:
-            self._attr_is_on = False
+        return await self._api.set_led_color(color)
 
     @property
     def rgb_color(self) -> tuple[int, int, int] | None:
@@ -79,9 +63,4 @@ class OpenKarotzLed(LightEntity):
         """Turn off the LED."""
         self._rgb_color = (0, 0, 0)
         self._attr_is_on = False
-        await self._async_send_command("000000")
-
-    async def async_added_to_hass(self) -> None:
-        """Run when entity about to be added to hass."""
-        await super().async_added_to_hass()
-        self.async_schedule_update_ha_state(force_refresh=True)
\ No newline at end of file
+        await self._async_send_command("000000")
\ No newline at end of file
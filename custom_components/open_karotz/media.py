@@ -0,0 +1,371 @@
+"""Local media proxy cache for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+import hashlib
+import logging
+import os
+import posixpath
+import secrets
+from typing import Any
+import urllib.parse
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.network import NoURLAvailableError, get_url
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    MEDIA_CACHE_MAX_BYTES,
+    MEDIA_CHUNK_SIZE,
+    MEDIA_DOWNLOAD_TIMEOUT,
+    MEDIA_MAX_FILE_BYTES,
+    MEDIA_SAVE_DELAY,
+    MEDIA_STORAGE_KEY,
+    MEDIA_STORAGE_VERSION,
+    MEDIA_TOKEN_MAX,
+    MEDIA_VIEW_URL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MediaTooLarge(Exception):
+    """Raised when a download exceeds the file size bound."""
+
+
+class MediaStream:
+    """Relay a download in progress to the request that started it.
+
+    Chunks are handed over as they are written to the cache. A reader
+    that goes away is detached and the download carries on into the
+    cache; a download failing midway simply ends the stream.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the stream."""
+        self.content_type = "application/octet-stream"
+        self._started: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._chunks: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._closed = False
+
+    def start(self, content_type: str) -> None:
+        """Mark the remote response as accepted."""
+        self.content_type = content_type
+        if not self._started.done():
+            self._started.set_result(None)
+
+    def feed(self, chunk: bytes | None) -> None:
+        """Hand a chunk, or None at the end, to the reader."""
+        if not self._closed:
+            self._chunks.put_nowait(chunk)
+
+    def fail(self, err: BaseException) -> None:
+        """Fail the stream before it started, or end it early."""
+        if self._started.done():
+            self.feed(None)
+        elif isinstance(err, asyncio.CancelledError):
+            self._started.cancel()
+        else:
+            self._started.set_exception(err)
+
+    async def async_wait_started(self) -> None:
+        """Wait for the remote response, raising if the download failed."""
+        await self._started
+
+    def close(self) -> None:
+        """Detach the reader and drop buffered chunks."""
+        self._closed = True
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield chunks until the download ends."""
+        while (chunk := await self._chunks.get()) is not None:
+            yield chunk
+
+
+def _content_length(resp: aiohttp.ClientResponse) -> int:
+    """Return the announced body size of a response, or 0 if unknown."""
+    try:
+        return int(resp.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def url_key(url: str) -> str:
+    """Return the cache key of a URL."""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+class OpenKarotzMediaCache:
+    """Proxy remote sounds for the devices and keep them on disk.
+
+    Devices are pointed at a local view instead of the remote URL. The
+    first request downloads the file once, chunk by chunk, and stores it
+    under its content hash, so URLs serving the same file share it. The
+    cache is shared by all devices and evicts the least recently played
+    URLs beyond its byte budget. View URLs carry an unguessable token
+    since the devices cannot authenticate.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        max_bytes: int = MEDIA_CACHE_MAX_BYTES,
+        max_file_bytes: int = MEDIA_MAX_FILE_BYTES,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.path = path
+        self._max_bytes = max_bytes
+        self._max_file_bytes = max_file_bytes
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, MEDIA_STORAGE_VERSION, MEDIA_STORAGE_KEY
+        )
+        # URL key to entry, least recently used first.
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        self._size = 0
+        self._tokens: OrderedDict[str, str] = OrderedDict()
+        self._downloads: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._pinned: dict[str, set[str]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return cache counters."""
+        return {
+            "entries": len(self._entries),
+            "files": len(self._refs),
+            "bytes": self._size,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def file_path(self, digest: str) -> str:
+        """Return the path of a cached file."""
+        return os.path.join(self.path, digest)
+
+    async def async_load(self) -> None:
+        """Load the index, dropping entries whose file is gone."""
+        data = await self._store.async_load() or {}
+        existing = await self.hass.async_add_executor_job(self._list_files)
+        for key, entry in data.items():
+            if entry["hash"] in existing:
+                self._add_entry(key, entry)
+
+    def _list_files(self) -> set[str]:
+        """Return the cached file names; runs in the executor."""
+        os.makedirs(self.path, exist_ok=True)
+        return set(os.listdir(self.path))
+
+    def _add_entry(self, key: str, entry: dict[str, Any]) -> None:
+        """Index an entry, counting its file once."""
+        self._entries[key] = entry
+        if self._refs.get(entry["hash"], 0) == 0:
+            self._size += entry["size"]
+        self._refs[entry["hash"]] = self._refs.get(entry["hash"], 0) + 1
+
+    def _save(self) -> None:
+        """Persist the index."""
+        self._store.async_delay_save(lambda: dict(self._entries), MEDIA_SAVE_DELAY)
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        """Return the cache entry of a URL and mark it as recently used."""
+        key = url_key(url)
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, url: str) -> dict[str, Any] | None:
+        """Return the cache entry of a URL without touching its recency."""
+        return self._entries.get(url_key(url))
+
+    def set_pinned(self, owner: str, urls: list[str]) -> None:
+        """Keep the files of ``urls`` out of eviction on behalf of ``owner``."""
+        if urls:
+            self._pinned[owner] = {url_key(url) for url in urls}
+        else:
+            self._pinned.pop(owner, None)
+
+    def token_url(self, token: str) -> str | None:
+        """Return the remote URL a token was issued for."""
+        return self._tokens.get(token)
+
+    def local_url(self, url: str) -> str:
+        """Return the proxy URL devices should play instead of ``url``.
+
+        Falls back to ``url`` when Home Assistant has no local URL.
+        """
+        try:
+            base = get_url(self.hass, allow_external=False, allow_cloud=False)
+        except NoURLAvailableError:
+            return url
+        token = next((t for t, u in self._tokens.items() if u == url), None)
+        if token is None:
+            token = secrets.token_urlsafe(16)
+        self._tokens[token] = url
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > MEDIA_TOKEN_MAX:
+            self._tokens.popitem(last=False)
+        extension = posixpath.splitext(urllib.parse.urlsplit(url).path)[1]
+        return base + MEDIA_VIEW_URL.format(filename=f"{token}{extension}")
+
+    async def async_fetch(self, url: str) -> dict[str, Any]:
+        """Return the cache entry of a URL, downloading it if needed.
+
+        Concurrent requests for the same URL share a single download.
+        """
+        if (entry := self.get(url)) is not None:
+            self._hits += 1
+            return entry
+        key = url_key(url)
+        if (task := self._downloads.get(key)) is None:
+            task = self._start_download(key, url)
+        else:
+            self._hits += 1
+        return await asyncio.shield(task)
+
+    async def async_open(self, url: str) -> dict[str, Any] | MediaStream:
+        """Return the cache entry of a URL, or a stream of it on a miss.
+
+        The request that misses gets the body relayed chunk by chunk while
+        it is written to the cache; requests joining a running download
+        wait for the finished entry. Raises like ``async_fetch`` when the
+        download fails before the first byte.
+        """
+        key = url_key(url)
+        if self.peek(url) is not None or key in self._downloads:
+            return await self.async_fetch(url)
+        stream = MediaStream()
+        self._start_download(key, url, stream)
+        try:
+            await stream.async_wait_started()
+        except BaseException:
+            stream.close()
+            raise
+        return stream
+
+    def _start_download(
+        self, key: str, url: str, stream: MediaStream | None = None
+    ) -> asyncio.Task[dict[str, Any]]:
+        """Start downloading a URL in the background."""
+        self._misses += 1
+        task = self.hass.async_create_task(self._async_download(key, url, stream))
+        self._downloads[key] = task
+
+        def _async_done(done: asyncio.Task[dict[str, Any]]) -> None:
+            self._downloads.pop(key, None)
+            if not done.cancelled():
+                # Streamed downloads may have nobody awaiting them.
+                done.exception()
+
+        task.add_done_callback(_async_done)
+        return task
+
+    async def _async_download(
+        self, key: str, url: str, stream: MediaStream | None = None
+    ) -> dict[str, Any]:
+        """Download a URL into the cache, relaying it to ``stream`` if given."""
+        partial_path = os.path.join(self.path, f"{key}.part")
+        digest = hashlib.sha256()
+        size = 0
+        session = async_get_clientsession(self.hass)
+        handle = await self.hass.async_add_executor_job(open, partial_path, "wb")
+        try:
+            async with session.get(
+                url, timeout=aiohttp.ClientTimeout(total=MEDIA_DOWNLOAD_TIMEOUT)
+            ) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get("Content-Type", "application/octet-stream")
+                if _content_length(resp) > self._max_file_bytes:
+                    raise MediaTooLarge(url)
+                if stream is not None:
+                    stream.start(content_type)
+                oversized = False
+                async for chunk in resp.content.iter_chunked(MEDIA_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self._max_file_bytes:
+                        if stream is None:
+                            raise MediaTooLarge(url)
+                        # The device already gets this body, so keep relaying
+                        # it but stop caching.
+                        oversized = True
+                    if not oversized:
+                        digest.update(chunk)
+                        await self.hass.async_add_executor_job(handle.write, chunk)
+                    if stream is not None:
+                        stream.feed(chunk)
+                if oversized:
+                    raise MediaTooLarge(url)
+        except BaseException as err:
+            if stream is not None:
+                stream.fail(err)
+            await self.hass.async_add_executor_job(self._discard, handle, partial_path)
+            raise
+        entry = {
+            "url": url,
+            "hash": digest.hexdigest(),
+            "size": size,
+            "content_type": content_type,
+        }
+        await self.hass.async_add_executor_job(
+            self._commit, handle, partial_path, self.file_path(entry["hash"])
+        )
+        self._add_entry(key, entry)
+        if stream is not None:
+            stream.feed(None)
+        await self._async_evict()
+        self._save()
+        return entry
+
+    @staticmethod
+    def _discard(handle: Any, partial_path: str) -> None:
+        """Drop a failed download; runs in the executor."""
+        handle.close()
+        os.remove(partial_path)
+
+    @staticmethod
+    def _commit(handle: Any, partial_path: str, path: str) -> None:
+        """Move a finished download in place; runs in the executor."""
+        handle.close()
+        os.replace(partial_path, path)
+
+    async def _async_evict(self) -> None:
+        """Drop the least recently used unpinned URLs beyond the byte budget."""
+        pinned = set().union(*self._pinned.values())
+        evicted: list[str] = []
+        for key in list(self._entries):
+            if self._size <= self._max_bytes or len(self._entries) <= 1:
+                break
+            if key in pinned:
+                continue
+            entry = self._entries.pop(key)
+            self._refs[entry["hash"]] -= 1
+            if not self._refs[entry["hash"]]:
+                del self._refs[entry["hash"]]
+                self._size -= entry["size"]
+                evicted.append(self.file_path(entry["hash"]))
+        if evicted:
+            await self.hass.async_add_executor_job(self._remove, evicted)
+
+    @staticmethod
+    def _remove(paths: list[str]) -> None:
+        """Delete cached files; runs in the executor."""
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def async_close(self) -> None:
+        """Cancel running downloads, ending any stream relaying them."""
+        for task in list(self._downloads.values()):
+            task.cancel()
@@ -1,20 +1,35 @@
 """Media player platform for Open Karotz."""
 from __future__ import annotations
 
+from functools import partial
 import logging
+from typing import Any
 
 from homeassistant.components.media_player import (
+    ATTR_MEDIA_EXTRA,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
     MediaPlayerState,
     MediaType,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import BASE_URL, DOMAIN, SOUND_LIST
+from .api import OpenKarotzAPI
+from .audio import OpenKarotzAudioScheduler
+from .catalog import OpenKarotzCatalog
+from .const import (
+    AUDIO_PRIORITIES,
+    AUDIO_PRIORITY_NORMAL,
+    BASE_URL,
+    CATALOG_RADIOS,
+    CATALOG_SOUNDS,
+    DOMAIN,
+    SOUND_DEFAULT_DURATION,
+    SOUND_URL_DEFAULT_DURATION,
+)
+from .entity import OpenKarotzEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,89 +40,84 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz media player entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzMediaPlayer(host, entry.entry_id)])
+    data = entry.runtime_data
+    async_add_entities(
+        [OpenKarotzMediaPlayer(data.api, data.catalog, data.audio, entry.entry_id)]
+    )
 
 
-class OpenKarotzMediaPlayer(MediaPlayerEntity):
+class OpenKarotzMediaPlayer(OpenKarotzEntity, MediaPlayerEntity):
     """Representation of the Open Karotz media player."""
 
     _attr_name = "Open Karotz"
     _attr_media_content_type = MediaType.MUSIC
     _attr_supported_features = (
         MediaPlayerEntityFeature.PLAY_MEDIA
-        | MediaPlayerEntityFeature.PLAY
         | MediaPlayerEntityFeature.STOP
         | MediaPlayerEntityFeature.VOLUME_SET
     )
     _attr_translation_key = "media_player"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(
+        self,
+        api: OpenKarotzAPI,
+        catalog: OpenKarotzCatalog,
+        audio: OpenKarotzAudioScheduler,
+        entry_id: str,
+    ) -> None:
         """Initialize the media player."""
-        self._host = host
+        self._api = api
+        self._catalog = catalog
+        self._audio = audio
         self._attr_unique_id = f"{entry_id}_media_player"
-        self._state = MediaPlayerState.IDLE
         self._volume = 0.5
-        self._title = None
         self._source = None
 
-    async def _async_send_command(self, endpoint: str) -> bool:
-        """Send command to Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}{endpoint}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to send command: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error sending command: %s", err)
-            return False
-
-    async def _async_play_local(self, sound_id: str) -> bool:
+    async def _async_play_local(
+        self, sound_id: str, title: str, duration: float, priority: str
+    ) -> bool:
         """Play local sound."""
-        return await self._async_send_command(f"/cgi-bin/sound?id={sound_id}")
-
-    async def _async_play_url(self, url: str) -> bool:
+        return await self._audio.async_play(
+            partial(self._api.play_sound, sound_id), title, duration, priority
+        )
+
+    async def _async_play_url(
+        self,
+        url: str,
+        title: str,
+        duration: float | None,
+        priority: str,
+        proxy: bool = True,
+    ) -> bool:
         """Play sound from URL."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/sound?url={url}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to play URL: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error playing URL: %s", err)
-            return False
+        return await self._audio.async_play(
+            partial(self._api.play_sound_url, url, proxy), title, duration, priority
+        )
 
     async def _async_tts(self, text: str, voice: str = "1") -> bool:
         """Play text-to-speech."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/tts?text={text}&voice={voice}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to play TTS: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error playing TTS: %s", err)
-            return False
+        return await self._audio.async_play_tts(text, voice)
 
     async def _async_stop(self) -> bool:
-        """Stop playback."""
-        return await self._async_send_command("/cgi-bin/stop")
+        """Stop playback and drop queued audio."""
+        return await self._audio.async_stop()
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the audio scheduler."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._audio.async_add_listener(self.async_write_ha_state))
 
     @property
     def state(self) -> MediaPlayerState | None:
         """Return the state of the media player."""
-        return self._state
+        if self._audio.current is not None:
+            return MediaPlayerState.PLAYING
+        return MediaPlayerState.IDLE
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the number of queued audio items."""
+        return {"queue_length": self._audio.queue_length}
 
     @property
     def volume_level(self) -> float | None:
@@ -117,37 +127,56 @@ class OpenKarotzMediaPlayer(MediaPlayerEntity):
     @property
     def media_title(self) -> str | None:
         """Return the media title."""
-        return self._title
+        if (current := self._audio.current) is not None:
+            return current.title
+        return None
 
     async def async_update(self) -> None:
         """Update the entity status."""
         pass
 
-    async def async_media_play(self) -> None:
-        """Play media."""
-        self._state = MediaPlayerState.PLAYING
-        self.async_write_ha_state()
-
     async def async_media_stop(self) -> None:
         """Stop media."""
         await self._async_stop()
-        self._state = MediaPlayerState.IDLE
-        self.async_write_ha_state()
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level."""
         self._volume = volume
+        await self._api.set_volume(volume)
 
     async def async_play_media(
         self, media_type: str | None, media_id: str | None, **kwargs
     ) -> None:
-        """Play media."""
+        """Play media.
+
+        A ``duration`` in seconds and a ``priority`` can be passed in the
+        extra data; radios play until something else is queued.
+        """
         if media_type == MediaType.MUSIC and media_id:
-            if media_id in SOUND_LIST:
-                await self._async_play_local(media_id)
-                self._title = f"Sound {media_id}"
-                self._state = MediaPlayerState.PLAYING
-                self.async_write_ha_state()
+            extra = kwargs.get(ATTR_MEDIA_EXTRA) or {}
+            priority = extra.get("priority", AUDIO_PRIORITY_NORMAL)
+            if priority not in AUDIO_PRIORITIES:
+                priority = AUDIO_PRIORITY_NORMAL
+            sounds = self._catalog.get(CATALOG_SOUNDS)
+            radios = self._catalog.get(CATALOG_RADIOS)
+            if media_id in sounds:
+                await self._async_play_local(
+                    media_id,
+                    f"Sound {sounds[media_id]}",
+                    float(extra.get("duration", SOUND_DEFAULT_DURATION)),
+                    priority,
+                )
+            elif media_id in radios:
+                await self._async_play_url(
+                    media_id, radios[media_id], None, priority, proxy=False
+                )
+            elif media_id.startswith(("http://", "https://")):
+                await self._async_play_url(
+                    media_id,
+                    media_id,
+                    float(extra.get("duration", SOUND_URL_DEFAULT_DURATION)),
+                    priority,
+                )
             else:
                 _LOGGER.warning("Invalid sound ID: %s", media_id)
 
@@ -0,0 +1,31 @@
+"""Runtime data models for Open Karotz."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .api import OpenKarotzAPI
+from .archive import OpenKarotzPreTriggerBuffer, OpenKarotzSnapshotArchive
+from .audio import OpenKarotzAnnouncementBuffer, OpenKarotzAudioScheduler
+from .catalog import OpenKarotzCatalog
+from .coordinator import OpenKarotzCoordinator
+from .journal import OpenKarotzCommandJournal
+from .motion import OpenKarotzMotionDetector
+from .snapshot import OpenKarotzSnapshotCache
+from .staging import OpenKarotzSoundStager
+
+
+@dataclass
+class OpenKarotzData:
+    """Objects shared by the platforms of one config entry."""
+
+    api: OpenKarotzAPI
+    coordinator: OpenKarotzCoordinator
+    catalog: OpenKarotzCatalog
+    snapshots: OpenKarotzSnapshotCache
+    motion: OpenKarotzMotionDetector
+    archive: OpenKarotzSnapshotArchive
+    pre_trigger: OpenKarotzPreTriggerBuffer
+    audio: OpenKarotzAudioScheduler
+    announcements: OpenKarotzAnnouncementBuffer
+    staging: OpenKarotzSoundStager
+    journal: OpenKarotzCommandJournal | None = None
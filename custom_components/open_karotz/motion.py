@@ -0,0 +1,173 @@
+"""Snapshot based motion detection for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import io
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DEFAULT_MOTION_REGION,
+    DEFAULT_MOTION_THRESHOLD,
+    DOMAIN,
+    EVENT_MOTION,
+    MOTION_FRAME_SIZE,
+    MOTION_INTERVAL,
+    MOTION_PIXEL_DELTA,
+)
+from .snapshot import OpenKarotzSnapshotCache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_region(region: str) -> tuple[float, float, float, float]:
+    """Parse a ``left,top,right,bottom`` region given in frame fractions."""
+    left, top, right, bottom = (float(part) for part in region.split(","))
+    if not 0 <= left < right <= 1 or not 0 <= top < bottom <= 1:
+        raise ValueError(f"Invalid motion region: {region}")
+    return left, top, right, bottom
+
+
+def validate_region(region: str) -> str:
+    """Validate a motion region option."""
+    parse_region(region)
+    return region
+
+
+def _process_frame(
+    image: bytes, previous: Any, region: tuple[float, float, float, float]
+) -> tuple[Any, float]:
+    """Return the downscaled frame and the changed share of the region.
+
+    Runs in the executor. Only the small grayscale frame is kept between
+    calls, so memory stays fixed regardless of the snapshot size.
+    """
+    # Optional heavy dependencies, only needed once motion detection is on.
+    # pylint: disable-next=import-outside-toplevel
+    import numpy as np
+    # pylint: disable-next=import-outside-toplevel
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image)) as frame:
+        # Let the JPEG decoder downscale while decoding.
+        frame.draft("L", MOTION_FRAME_SIZE)
+        gray = np.asarray(
+            frame.convert("L").resize(MOTION_FRAME_SIZE), dtype=np.int16
+        )
+    if previous is None:
+        return gray, 0.0
+
+    width, height = MOTION_FRAME_SIZE
+    left, top, right, bottom = region
+    rows = slice(int(top * height), max(int(bottom * height), int(top * height) + 1))
+    cols = slice(int(left * width), max(int(right * width), int(left * width) + 1))
+    changed = np.abs(gray[rows, cols] - previous[rows, cols]) > MOTION_PIXEL_DELTA
+    return gray, float(changed.mean() * 100)
+
+
+class OpenKarotzMotionDetector:
+    """Detect motion by diffing consecutive snapshots of one device.
+
+    While enabled, a snapshot is taken from the shared cache every motion
+    interval, downscaled to grayscale and compared with the previous one
+    in the executor. Motion is reported when the share of changed pixels
+    inside the region reaches the threshold; every change of the motion
+    state fires an event.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        snapshots: OpenKarotzSnapshotCache,
+        entry_id: str,
+        threshold: float = DEFAULT_MOTION_THRESHOLD,
+        region: str = DEFAULT_MOTION_REGION,
+    ) -> None:
+        """Initialize the detector."""
+        self.hass = hass
+        self._snapshots = snapshots
+        self._entry_id = entry_id
+        self._threshold = threshold
+        self._region = parse_region(region)
+        self._task: asyncio.Task | None = None
+        self._previous: Any = None
+        self._last_captured_at: float | None = None
+        self._listeners: list[Callable[[], None]] = []
+        self.motion = False
+        self.score = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True while motion detection runs."""
+        return self._task is not None
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever the motion or enabled state changes."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def async_enable(self) -> None:
+        """Start motion detection."""
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN} motion {self._entry_id}"
+            )
+            self._async_notify()
+
+    @callback
+    def async_disable(self) -> None:
+        """Stop motion detection and forget the reference frame."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._previous = None
+        self._last_captured_at = None
+        self.score = 0.0
+        if self.motion:
+            self._async_set_motion(False)
+        self._async_notify()
+
+    async def _async_run(self) -> None:
+        """Compare snapshots until cancelled."""
+        while True:
+            image = await self._snapshots.async_get(max_age=MOTION_INTERVAL)
+            # Skip frames that were already compared.
+            if image is not None and self._snapshots.captured_at != self._last_captured_at:
+                self._last_captured_at = self._snapshots.captured_at
+                await self._async_process(image)
+            await asyncio.sleep(MOTION_INTERVAL)
+
+    async def _async_process(self, image: bytes) -> None:
+        """Diff one snapshot against the previous one."""
+        try:
+            self._previous, score = await self.hass.async_add_executor_job(
+                _process_frame, image, self._previous, self._region
+            )
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("Skipping undecodable snapshot: %s", err)
+            return
+        self.score = score
+        if (score >= self._threshold) != self.motion:
+            self._async_set_motion(not self.motion)
+
+    @callback
+    def _async_set_motion(self, motion: bool) -> None:
+        """Publish a change of the motion state."""
+        self.motion = motion
+        self.hass.bus.async_fire(
+            EVENT_MOTION,
+            {"entry_id": self._entry_id, "motion": motion, "score": self.score},
+        )
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify listeners."""
+        for listener in list(self._listeners):
+            listener()
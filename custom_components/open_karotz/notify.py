@@ -0,0 +1,63 @@
+"""Notify platform for Open Karotz."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.notify import (
+    ATTR_DATA,
+    ATTR_TITLE,
+    BaseNotificationService,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+
+from .const import AUDIO_PRIORITIES, AUDIO_PRIORITY_NORMAL, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_VOICE = "5"
+
+
+async def async_get_service(
+    hass: HomeAssistant,
+    config: ConfigType,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> OpenKarotzNotificationService | None:
+    """Return the notification service of a discovered device."""
+    if discovery_info is None:
+        return None
+    return OpenKarotzNotificationService(hass, discovery_info["entry_id"])
+
+
+class OpenKarotzNotificationService(BaseNotificationService):
+    """Speak notifications on an Open Karotz.
+
+    Messages go through the announcement buffer of the device, so bursts
+    from several automations are spoken as one utterance. ``voice`` and
+    ``priority`` can be passed in the notification data. The service
+    outlives reloads of its entry, so the buffer is looked up on every
+    message and messages are dropped while the entry is not loaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the service."""
+        self.hass = hass
+        self._entry_id = entry_id
+
+    async def async_send_message(self, message: str = "", **kwargs: Any) -> None:
+        """Buffer a message for the next announcement."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self._entry_id)
+        if entry_data is None:
+            _LOGGER.debug("Dropping notification, %s is not loaded", self._entry_id)
+            return
+        data = kwargs.get(ATTR_DATA) or {}
+        priority = data.get("priority", AUDIO_PRIORITY_NORMAL)
+        if priority not in AUDIO_PRIORITIES:
+            _LOGGER.warning("Invalid priority %s, using normal", priority)
+            priority = AUDIO_PRIORITY_NORMAL
+        if title := kwargs.get(ATTR_TITLE):
+            message = f"{title}: {message}"
+        entry_data.announcements.async_add(
+            message, str(data.get("voice", DEFAULT_VOICE)), priority
+        )
@@ -1,15 +1,19 @@
 """Select platform for Open Karotz mood control."""
 from __future__ import annotations
 
+from functools import partial
 import logging
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import BASE_URL, DOMAIN, MOOD_IDS
+from .api import OpenKarotzAPI
+from .audio import OpenKarotzAudioScheduler
+from .catalog import OpenKarotzCatalog
+from .const import BASE_URL, CATALOG_MOODS, DOMAIN, MOOD_DEFAULT_DURATION
+from .entity import OpenKarotzEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,52 +24,61 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz select entities."""
-    host = entry.data[CONF_HOST]
-    async_add_entities([OpenKarotzMood(host, entry.entry_id)])
+    data = entry.runtime_data
+    async_add_entities(
+        [OpenKarotzMood(data.api, data.catalog, data.audio, entry.entry_id)]
+    )
 
 
-class OpenKarotzMood(SelectEntity):
+class OpenKarotzMood(OpenKarotzEntity, SelectEntity):
     """Representation of the Open Karotz mood select."""
 
     _attr_name = "Open Karotz Mood"
-    _attr_options = MOOD_IDS
     _attr_translation_key = "mood"
 
-    def __init__(self, host: str, entry_id: str) -> None:
+    def __init__(
+        self,
+        api: OpenKarotzAPI,
+        catalog: OpenKarotzCatalog,
+        audio: OpenKarotzAudioScheduler,
+        entry_id: str,
+    ) -> None:
         """Initialize the mood select."""
-        self._host = host
+        self._api = api
+        self._catalog = catalog
+        self._audio = audio
         self._attr_unique_id = f"{entry_id}_mood"
-        self._current_mood = MOOD_IDS[0]
+        self._current_mood = self.options[0] if self.options else None
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._catalog.async_add_listener(self._async_catalog_updated))
+
+    @callback
+    def _async_catalog_updated(self, kind: str) -> None:
+        """Write state when the mood catalog changed."""
+        if kind == CATALOG_MOODS:
+            self.async_write_ha_state()
+
+    @property
+    def options(self) -> list[str]:
+        """Return the moods known to the device."""
+        return list(self._catalog.get(CATALOG_MOODS))
 
     async def _async_play_mood(self, mood_id: str) -> bool:
         """Play mood on Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/apps/moods?id={mood_id}") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to play mood: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error playing mood: %s", err)
-            return False
+        return await self._audio.async_play(
+            partial(self._api.play_mood, mood_id),
+            f"Mood {mood_id}",
+            MOOD_DEFAULT_DURATION,
+        )
 
     async def _async_play_random_mood(self) -> bool:
         """Play random mood on Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self._host}/cgi-bin/apps/moods") as resp:
-                if resp.status == 200:
-                    return True
-                _LOGGER.error("Failed to play random mood: %s", resp.status)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error playing random mood: %s", err)
-            return False
+        return await self._audio.async_play(
+            self._api.play_random_mood, "Random mood", MOOD_DEFAULT_DURATION
+        )
 
     @property
     def current_option(self) -> str | None:
@@ -74,7 +87,7 @@ class OpenKarotzMood(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Select a mood."""
-        if option in MOOD_IDS:
+        if option in self._catalog.get(CATALOG_MOODS):
             self._current_mood = option
             await self._async_play_mood(option)
 
@@ -2,18 +2,19 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, PERCENTAGE
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, STORAGE_KAROTZ, STORAGE_USB
+from .const import DATA_STORAGE, DOMAIN, STORAGE_KAROTZ, STORAGE_USB
+from .coordinator import OpenKarotzCoordinator
+from .entity import OpenKarotzEntity
+from .staging import OpenKarotzSoundStager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,56 +25,19 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Open Karotz sensor entities."""
-    host = entry.data[CONF_HOST]
-    coordinator = OpenKarotzCoordinator(hass, host)
-
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = entry.runtime_data.coordinator
 
     async_add_entities(
         [
             KarotzStorageSensor(coordinator, entry),
             UsbStorageSensor(coordinator, entry),
+            PollIntervalSensor(coordinator, entry),
+            StagingCandidatesSensor(coordinator, entry, entry.runtime_data.staging),
         ]
     )
 
 
-class OpenKarotzCoordinator(DataUpdateCoordinator):
-    """Class to manage data updates for Open Karotz."""
-
-    def __init__(self, hass: HomeAssistant, host: str) -> None:
-        """Initialize the coordinator."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="Open Karotz",
-            update_method=self._async_update_data,
-            update_interval=None,
-        )
-        self.host = host
-
-    async def _async_update_data(self):
-        """Fetch data from Open Karotz."""
-        from homeassistant.helpers.aiohttp_client import async_get_clientsession
-        import json
-
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(f"http://{self.host}/cgi-bin/get_free_space") as resp:
-                if resp.status == 200:
-                    text = await resp.text()
-                    try:
-                        return json.loads(text)
-                    except json.JSONDecodeError:
-                        _LOGGER.error("Failed to parse JSON from get_free_space: %s", text)
-                        return None
-                _LOGGER.error("Failed to fetch free space: %s", resp.status)
-                return None
-        except Exception as err:
-            _LOGGER.error("Error fetching data: %s", err)
-            return None
-
-
-class KarotzStorageSensor(CoordinatorEntity, SensorEntity):
+class KarotzStorageSensor(OpenKarotzEntity, CoordinatorEntity, SensorEntity):
     """Representation of the Karotz storage sensor."""
 
     _attr_translation_key = "karotz_storage"
@@ -82,15 +46,17 @@ class KarotzStorageSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator: OpenKarotzCoordinator, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
+        self._api = coordinator.api
         self._attr_name = "Karotz Storage"
         self._attr_unique_id = f"{entry.entry_id}_{STORAGE_KAROTZ}"
 
     @property
     def native_value(self) -> str | None:
         """Return the native value of the sensor."""
-        if self.coordinator.data is None:
+        storage = (self.coordinator.data or {}).get(DATA_STORAGE)
+        if storage is None:
             return None
-        return self.coordinator.data.get("karotz", {}).get("percent_used_space")
+        return storage.get("karotz", {}).get("percent_used_space")
 
     @property
     def icon(self) -> str:
@@ -98,7 +64,7 @@ class KarotzStorageSensor(CoordinatorEntity, SensorEntity):
         return "mdi:memory"
 
 
-class UsbStorageSensor(CoordinatorEntity, SensorEntity):
+class UsbStorageSensor(OpenKarotzEntity, CoordinatorEntity, SensorEntity):
     """Representation of the USB storage sensor."""
 
     _attr_translation_key = "usb_storage"
@@ -107,15 +73,17 @@ class UsbStorageSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator: OpenKarotzCoordinator, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
+        self._api = coordinator.api
         self._attr_name = "USB Storage"
         self._attr_unique_id = f"{entry.entry_id}_{STORAGE_USB}"
 
     @property
     def native_value(self) -> str | None:
         """Return the native value of the sensor."""
-        if self.coordinator.data is None:
+        storage = (self.coordinator.data or {}).get(DATA_STORAGE)
+        if storage is None:
             return None
-        return self.coordinator.data.get("usb", {}).get("percent_used_space")
+        return storage.get("usb", {}).get("percent_used_space")
 
     @property
     def icon(self) -> str:
@@ -125,6 +93,72 @@ class UsbStorageSensor(CoordinatorEntity, SensorEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        if self.coordinator.data is None:
+        storage = (self.coordinator.data or {}).get(DATA_STORAGE)
+        if not super().available or storage is None:
             return False
-        return self.coordinator.data.get("usb", {}).get("percent_used_space", -1) >= 0
+        return storage.get("usb", {}).get("percent_used_space", -1) >= 0
+
+
+class PollIntervalSensor(OpenKarotzEntity, CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor reporting the current adaptive poll interval."""
+
+    _attr_translation_key = "poll_interval"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: OpenKarotzCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._attr_name = "Poll Interval"
+        self._attr_unique_id = f"{entry.entry_id}_poll_interval"
+
+    @property
+    def native_value(self) -> float:
+        """Return the native value of the sensor."""
+        return self.coordinator.poll_interval
+
+    @property
+    def icon(self) -> str:
+        """Return the icon."""
+        return "mdi:timer-sync-outline"
+
+
+class StagingCandidatesSensor(OpenKarotzEntity, CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor listing the sounds waiting to be copied to the device.
+
+    The state is the number of candidates; the ``candidates`` attribute
+    names the cached file of each one and the name to copy it under.
+    """
+
+    _attr_translation_key = "staging_candidates"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: OpenKarotzCoordinator,
+        entry: ConfigEntry,
+        staging: OpenKarotzSoundStager,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._staging = staging
+        self._attr_name = "Staging Candidates"
+        self._attr_unique_id = f"{entry.entry_id}_staging_candidates"
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of candidates."""
+        return len(self._staging.candidates)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the candidates."""
+        return {"candidates": self._staging.candidates}
+
+    @property
+    def icon(self) -> str:
+        """Return the icon."""
+        return "mdi:folder-music-outline"
@@ -0,0 +1,339 @@
+"""Snapshot cache and stream for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+import hashlib
+import logging
+
+from homeassistant.core import HomeAssistant
+
+from .api import OpenKarotzAPI
+from .const import (
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    FTP_UPLOAD_TIMEOUT,
+    SNAPSHOT_MAX_BYTES,
+    STREAM_LATENCY_SMOOTHING,
+    STREAM_TARGET_FPS,
+    THUMBNAIL_CACHE_MAX_BYTES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _scale_image(image: bytes, width: int, height: int) -> bytes:
+    """Downscale a JPEG snapshot; runs in the executor."""
+    # The camera component pulls in the stream stack, so import it lazily.
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.camera import Image
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.camera.img_util import scale_jpeg_camera_image
+
+    return scale_jpeg_camera_image(Image("image/jpeg", image), width, height)
+
+
+class OpenKarotzSnapshotCache:
+    """Serve recent snapshots of one device from memory.
+
+    A capture takes seconds on the device, so every consumer (camera
+    thumbnails, streams, the snapshot view) goes through this cache:
+    snapshots younger than the max age are reused and concurrent requests
+    share a single in-flight capture. Images above the size bound are
+    returned but not retained.
+
+    With a push trigger, a capture only asks the device to upload a
+    snapshot and waits for it to arrive through ``push``, falling back to
+    an HTTP capture when no upload shows up in time.
+    """
+
+    def __init__(
+        self,
+        api: OpenKarotzAPI,
+        max_age: float = DEFAULT_SNAPSHOT_MAX_AGE,
+        max_bytes: int = SNAPSHOT_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache."""
+        self._api = api
+        self.max_age = max_age
+        self._max_bytes = max_bytes
+        self._image: bytes | None = None
+        self._captured_at = 0.0
+        self._capture: asyncio.Task[bytes | None] | None = None
+        self._push_trigger: Callable[[], Awaitable[bool]] | None = None
+        self._push_waiter: asyncio.Future[bytes] | None = None
+        self._hits = 0
+        self._captures = 0
+
+    @property
+    def image(self) -> bytes | None:
+        """Return the most recent cached snapshot."""
+        return self._image
+
+    @property
+    def captured_at(self) -> float:
+        """Return the loop time of the most recent cached snapshot."""
+        return self._captured_at
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return cache counters."""
+        return {"hits": self._hits, "captures": self._captures}
+
+    def peek(self, max_age: float | None = None) -> bytes | None:
+        """Return the cached snapshot if it is fresh, without capturing."""
+        if max_age is None:
+            max_age = self.max_age
+        if (
+            self._image is not None
+            and asyncio.get_running_loop().time() - self._captured_at < max_age
+        ):
+            self._hits += 1
+            return self._image
+        return None
+
+    async def async_get(self, max_age: float | None = None) -> bytes | None:
+        """Return a snapshot no older than ``max_age`` seconds."""
+        loop = asyncio.get_running_loop()
+        if max_age is None:
+            max_age = self.max_age
+        if self._image is not None and loop.time() - self._captured_at < max_age:
+            self._hits += 1
+            return self._image
+        if self._capture is None or self._capture.done():
+            self._capture = loop.create_task(self._async_capture())
+        else:
+            self._hits += 1
+        return await asyncio.shield(self._capture)
+
+    async def async_stream(self) -> AsyncIterator[bytes]:
+        """Yield a snapshot chunk by chunk.
+
+        A fresh snapshot is yielded whole and a request joining a running
+        capture waits for its image. Otherwise the capture is streamed from
+        the device, relayed as it arrives and cached once complete.
+        """
+        if (image := self.peek()) is not None:
+            yield image
+            return
+        if self._capture is not None and not self._capture.done():
+            self._hits += 1
+            if (image := await asyncio.shield(self._capture)) is not None:
+                yield image
+            return
+        relay: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._capture = asyncio.get_running_loop().create_task(
+            self._async_capture_stream(relay)
+        )
+        while (chunk := await relay.get()) is not None:
+            yield chunk
+
+    def set_push_trigger(self, trigger: Callable[[], Awaitable[bool]] | None) -> None:
+        """Capture by triggering a device upload instead of an HTTP pull."""
+        self._push_trigger = trigger
+
+    def push(self, image: bytes) -> None:
+        """Store a snapshot pushed by the device."""
+        self._store(image)
+        if self._push_waiter is not None and not self._push_waiter.done():
+            self._push_waiter.set_result(image)
+
+    def _store(self, image: bytes) -> None:
+        """Keep a snapshot if it fits the buffer."""
+        if len(image) > self._max_bytes:
+            _LOGGER.debug(
+                "Not caching %d byte snapshot from %s", len(image), self._api.host
+            )
+            return
+        self._image = image
+        self._captured_at = asyncio.get_running_loop().time()
+
+    async def _async_capture(self) -> bytes | None:
+        """Capture a snapshot and keep it if it fits the buffer."""
+        self._captures += 1
+        if self._push_trigger is not None and (image := await self._async_capture_push()):
+            return image
+        image = await self._api.capture_snapshot()
+        if image is not None:
+            self._store(image)
+        return image
+
+    async def _async_capture_stream(
+        self, relay: asyncio.Queue[bytes | None]
+    ) -> bytes | None:
+        """Stream a capture to ``relay`` and keep the complete image."""
+        self._captures += 1
+        chunks: list[bytes] = []
+
+        def _on_chunk(chunk: bytes) -> None:
+            chunks.append(chunk)
+            relay.put_nowait(chunk)
+
+        try:
+            complete = await self._api.stream_snapshot(_on_chunk)
+        finally:
+            relay.put_nowait(None)
+        if not complete:
+            return None
+        image = b"".join(chunks)
+        self._store(image)
+        return image
+
+    async def _async_capture_push(self) -> bytes | None:
+        """Trigger a device upload and wait for it to be pushed."""
+        assert self._push_trigger is not None
+        self._push_waiter = asyncio.get_running_loop().create_future()
+        try:
+            if not await self._push_trigger():
+                return None
+            return await asyncio.wait_for(self._push_waiter, FTP_UPLOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            _LOGGER.debug("No snapshot upload from %s, pulling instead", self._api.host)
+            return None
+        finally:
+            self._push_waiter = None
+
+    async def async_close(self) -> None:
+        """Cancel a running capture and drop the cached image."""
+        if self._capture is not None:
+            self._capture.cancel()
+            self._capture = None
+        self._image = None
+
+
+class OpenKarotzSnapshotStream:
+    """Fan snapshots of one device out to any number of stream viewers.
+
+    A single producer polls the snapshot cache and hands every frame to
+    all subscribers. It only runs while someone is watching and slows
+    down below the target frame rate when captures take longer than a
+    frame interval. Slow viewers only ever get the latest frame. Closing
+    the stream hands every viewer None so it can end its response.
+    """
+
+    def __init__(
+        self, snapshots: OpenKarotzSnapshotCache, target_fps: float = STREAM_TARGET_FPS
+    ) -> None:
+        """Initialize the stream."""
+        self._snapshots = snapshots
+        self._target_interval = 1 / target_fps
+        self._latency = 0.0
+        self._subscribers: list[asyncio.Queue[bytes | None]] = []
+        self._producer: asyncio.Task | None = None
+
+    @property
+    def interval(self) -> float:
+        """Return the current frame interval in seconds."""
+        return max(self._target_interval, self._latency)
+
+    @property
+    def subscribers(self) -> int:
+        """Return the number of connected viewers."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue[bytes | None]:
+        """Add a viewer and start the producer if needed."""
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=1)
+        self._subscribers.append(queue)
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.get_running_loop().create_task(
+                self._async_produce()
+            )
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[bytes | None]) -> None:
+        """Remove a viewer and stop the producer once nobody watches."""
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+        if not self._subscribers and self._producer is not None:
+            self._producer.cancel()
+            self._producer = None
+
+    async def _async_produce(self) -> None:
+        """Poll snapshots and fan them out until cancelled."""
+        loop = asyncio.get_running_loop()
+        while self._subscribers:
+            started = loop.time()
+            frame = await self._snapshots.async_get(max_age=self.interval)
+            latency = loop.time() - started
+            self._latency += STREAM_LATENCY_SMOOTHING * (latency - self._latency)
+            if frame is not None:
+                for queue in self._subscribers:
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait(frame)
+            await asyncio.sleep(max(0.0, self.interval - latency))
+
+    async def async_close(self) -> None:
+        """Stop the producer and end every viewer's stream."""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self._subscribers.clear()
+        if self._producer is not None:
+            self._producer.cancel()
+            self._producer = None
+
+
+class OpenKarotzThumbnailCache:
+    """Cache downscaled snapshots for dashboard tiles.
+
+    Entries are keyed by image hash and requested size, so repeated tile
+    renders of the same frame are memory hits. Scaling runs in the
+    executor and the least recently used entries are evicted once the
+    total size exceeds the byte budget.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+        self._size = 0
+        self._scaling: dict[tuple[str, int, int], asyncio.Task[bytes]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return cache counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    async def async_get(self, image: bytes, width: int, height: int) -> bytes:
+        """Return ``image`` scaled to fit ``width`` x ``height``."""
+        key = (hashlib.sha1(image).hexdigest(), width, height)
+        if (scaled := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return scaled
+        if (task := self._scaling.get(key)) is None:
+            self._misses += 1
+            task = self.hass.async_create_task(self._async_scale(key, image))
+            self._scaling[key] = task
+        else:
+            self._hits += 1
+        return await asyncio.shield(task)
+
+    async def _async_scale(self, key: tuple[str, int, int], image: bytes) -> bytes:
+        """Scale an image in the executor and store the result."""
+        try:
+            scaled = await self.hass.async_add_executor_job(
+                _scale_image, image, key[1], key[2]
+            )
+        finally:
+            del self._scaling[key]
+        if len(scaled) <= self._max_bytes:
+            self._entries[key] = scaled
+            self._size += len(scaled)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return scaled
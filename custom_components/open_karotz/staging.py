@@ -0,0 +1,185 @@
+"""Usage based sound staging for Open Karotz."""
+from __future__ import annotations
+
+import logging
+import posixpath
+from typing import Any
+import urllib.parse
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .catalog import OpenKarotzCatalog
+from .const import (
+    CATALOG_SOUNDS,
+    DATA_STORAGE,
+    STAGING_CATALOG_MAX_AGE,
+    STAGING_MAX_BYTES,
+    STAGING_MAX_TRACKED,
+    STAGING_MAX_USED_PERCENT,
+    STAGING_MIN_PLAYS,
+    STAGING_SAVE_DELAY,
+    STAGING_STORAGE_KEY,
+    STAGING_STORAGE_VERSION,
+)
+from .coordinator import OpenKarotzCoordinator
+from .media import OpenKarotzMediaCache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def staged_name(url: str, digest: str) -> str:
+    """Return the file name a clip is staged under on the device."""
+    extension = posixpath.splitext(urllib.parse.urlsplit(url).path)[1]
+    return f"{digest[:16]}{extension}"
+
+
+class OpenKarotzSoundStager:
+    """Serve frequently played URL sounds from the device storage.
+
+    Plays of proxied URLs are counted (least frequently used URLs are
+    forgotten first). The hottest clips that fit a budget, which shrinks
+    as the device storage fills up, are pinned in the media cache and
+    listed as staging candidates named after their content hash. Once a
+    sound with that name shows up in the device sound list, later plays
+    are sent as ``/cgi-bin/sound?id=`` instead of a URL.
+
+    The device API has no upload endpoint, so copying the candidates onto
+    the device is left to the user; everything else happens here. While
+    candidates are outstanding, the sound list is refetched on the poll
+    cadence (at most every few minutes) to notice copies quickly.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        media: OpenKarotzMediaCache,
+        catalog: OpenKarotzCatalog,
+        coordinator: OpenKarotzCoordinator,
+        max_bytes: int = STAGING_MAX_BYTES,
+    ) -> None:
+        """Initialize the stager."""
+        self._entry_id = entry_id
+        self._media = media
+        self._catalog = catalog
+        self._coordinator = coordinator
+        self._max_bytes = max_bytes
+        self._store: Store[dict[str, int]] = Store(
+            hass, STAGING_STORAGE_VERSION, f"{STAGING_STORAGE_KEY}.{entry_id}"
+        )
+        self._plays: dict[str, int] = {}
+        self._hot: list[str] = []
+        self._routed = 0
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Load persisted play counts and start watching for staged copies."""
+        if data := await self._store.async_load():
+            self._plays = data
+            self._update_hot()
+        self._unsub_coordinator = self._coordinator.async_add_listener(
+            self._async_check_staged
+        )
+
+    @callback
+    def _async_check_staged(self) -> None:
+        """Refetch the sound list while candidates wait to be copied."""
+        if self.candidates:
+            self._catalog.async_ensure_fresh([CATALOG_SOUNDS], STAGING_CATALOG_MAX_AGE)
+
+    @property
+    def budget(self) -> int:
+        """Return the staging budget in bytes.
+
+        The budget shrinks linearly with the used share of the device
+        storage and is zero once it passes the limit.
+        """
+        storage = (self._coordinator.data or {}).get(DATA_STORAGE) or {}
+        try:
+            used = float(storage.get("karotz", {}).get("percent_used_space"))
+        except (TypeError, ValueError):
+            return self._max_bytes
+        free_share = max(0.0, STAGING_MAX_USED_PERCENT - used) / STAGING_MAX_USED_PERCENT
+        return int(self._max_bytes * free_share)
+
+    @property
+    def candidates(self) -> list[dict[str, Any]]:
+        """Return the hot clips that are not on the device yet."""
+        sounds = self._catalog.get(CATALOG_SOUNDS)
+        candidates = []
+        for url in self._hot:
+            if (entry := self._media.peek(url)) is None:
+                continue
+            if self._local_id(url, entry["hash"], sounds) is None:
+                candidates.append(
+                    {
+                        "url": url,
+                        "name": staged_name(url, entry["hash"]),
+                        "file": self._media.file_path(entry["hash"]),
+                        "size": entry["size"],
+                        "plays": self._plays[url],
+                    }
+                )
+        return candidates
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return staging counters."""
+        return {
+            "tracked": len(self._plays),
+            "hot": len(self._hot),
+            "budget": self.budget,
+            "routed": self._routed,
+        }
+
+    def route(self, url: str) -> str | None:
+        """Count a play of ``url`` and return its local sound id, if staged."""
+        self._plays[url] = self._plays.get(url, 0) + 1
+        if len(self._plays) > STAGING_MAX_TRACKED:
+            coldest = min(
+                (candidate for candidate in self._plays if candidate != url),
+                key=self._plays.__getitem__,
+            )
+            del self._plays[coldest]
+        self._update_hot()
+        self._store.async_delay_save(lambda: self._plays, STAGING_SAVE_DELAY)
+
+        if (entry := self._media.peek(url)) is None:
+            return None
+        sound_id = self._local_id(url, entry["hash"], self._catalog.get(CATALOG_SOUNDS))
+        if sound_id is not None:
+            self._routed += 1
+        return sound_id
+
+    @staticmethod
+    def _local_id(url: str, digest: str, sounds: dict[str, str]) -> str | None:
+        """Return the id of the staged copy of a clip in the device sound list."""
+        name = staged_name(url, digest)
+        for sound_id in (name, posixpath.splitext(name)[0]):
+            if sound_id in sounds:
+                return sound_id
+        return None
+
+    def _update_hot(self) -> None:
+        """Pick the most played clips that fit the budget and pin them."""
+        budget = self.budget
+        hot: list[str] = []
+        for url in sorted(self._plays, key=self._plays.__getitem__, reverse=True):
+            if self._plays[url] < STAGING_MIN_PLAYS:
+                break
+            if (entry := self._media.peek(url)) is None or entry["size"] > budget:
+                continue
+            budget -= entry["size"]
+            hot.append(url)
+        if hot != self._hot:
+            _LOGGER.debug("Sounds to stage on the device: %s", hot)
+        self._hot = hot
+        self._media.set_pinned(self._entry_id, hot)
+
+    def async_close(self) -> None:
+        """Stop watching for staged copies and release the pinned clips."""
+        if self._unsub_coordinator is not None:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+        self._media.set_pinned(self._entry_id, [])
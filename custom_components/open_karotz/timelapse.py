@@ -0,0 +1,140 @@
+"""Timelapse writer for archived Open Karotz snapshots."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+import os
+import struct
+import tempfile
+
+_LOGGER = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+_AVIF_HASINDEX = 0x10
+_AVIIF_KEYFRAME = 0x10
+
+# Offsets of the fields patched once the frame count is known.
+_RIFF_SIZE = 4
+_AVIH_TOTAL_FRAMES = 48
+_STRH_LENGTH = 140
+_MOVI_SIZE = 216
+_MOVI_START = 220
+
+
+def _jpeg_size(image_file: str) -> tuple[int, int]:
+    """Return the dimensions of a JPEG without decoding it."""
+    # pylint: disable-next=import-outside-toplevel
+    from PIL import Image
+
+    with Image.open(image_file) as image:
+        return image.size
+
+
+class MjpegAviWriter:
+    """Write JPEG frames into a Motion JPEG AVI file one at a time.
+
+    Frames are copied straight into the ``movi`` list and the index is
+    spooled to a temporary file, so memory use does not grow with the
+    number of frames. The headers are patched with the final frame count
+    when the writer is closed.
+    """
+
+    def __init__(self, path: str, width: int, height: int, fps: float) -> None:
+        """Open the file and write the headers."""
+        self.frames = 0
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+        self._index = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        avih = struct.pack(
+            "<14I",
+            int(1_000_000 / fps), 0, 0, _AVIF_HASINDEX, 0, 0, 1, 0, width, height,
+            0, 0, 0, 0,
+        )
+        strh = struct.pack(
+            "<4s4sIHHIIIIIIII4h",
+            b"vids", b"MJPG", 0, 0, 0, 0, 1000, int(fps * 1000), 0, 0, 0,
+            0xFFFFFFFF, 0, 0, 0, width, height,
+        )
+        strf = struct.pack(
+            "<IiiHH4sIiiII", 40, width, height, 1, 24, b"MJPG", width * height * 3,
+            0, 0, 0, 0,
+        )
+        strl = b"strl" + self._chunk(b"strh", strh) + self._chunk(b"strf", strf)
+        hdrl = b"hdrl" + self._chunk(b"avih", avih) + self._chunk(b"LIST", strl)
+        self._file.write(b"RIFF\0\0\0\0AVI " + self._chunk(b"LIST", hdrl))
+        self._file.write(b"LIST\0\0\0\0movi")
+
+    @staticmethod
+    def _chunk(fourcc: bytes, data: bytes) -> bytes:
+        """Return a RIFF chunk."""
+        return fourcc + struct.pack("<I", len(data)) + data
+
+    def add_frame(self, image: bytes) -> None:
+        """Append a JPEG frame."""
+        offset = self._file.tell() - _MOVI_START
+        self._file.write(b"00dc" + struct.pack("<I", len(image)) + image)
+        if len(image) % 2:
+            self._file.write(b"\0")
+        self._index.write(struct.pack("<4sIII", b"00dc", _AVIIF_KEYFRAME, offset, len(image)))
+        self.frames += 1
+
+    def close(self) -> None:
+        """Write the index, patch the headers and close the file."""
+        try:
+            movi_end = self._file.tell()
+            self._file.write(b"idx1" + struct.pack("<I", self._index.tell()))
+            self._index.seek(0)
+            while block := self._index.read(65536):
+                self._file.write(block)
+            end = self._file.tell()
+            for offset, value in (
+                (_RIFF_SIZE, end - 8),
+                (_AVIH_TOTAL_FRAMES, self.frames),
+                (_STRH_LENGTH, self.frames),
+                (_MOVI_SIZE, movi_end - _MOVI_SIZE - 4),
+            ):
+                self._file.seek(offset)
+                self._file.write(struct.pack("<I", value))
+        finally:
+            self._index.close()
+            self._file.close()
+
+
+def write_timelapse(
+    files: Iterable[str],
+    path: str,
+    fps: float,
+    progress: ProgressCallback | None = None,
+    total: int = 0,
+) -> int:
+    """Write snapshot files into a timelapse and return the frame count.
+
+    Runs in the executor. Frames are read one at a time; files that
+    disappeared in the meantime are skipped. Nothing is written when no
+    frame could be read.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    writer: MjpegAviWriter | None = None
+    partial_path = f"{path}.part"
+    try:
+        for done, image_file in enumerate(files, 1):
+            try:
+                if writer is None:
+                    width, height = _jpeg_size(image_file)
+                    writer = MjpegAviWriter(partial_path, width, height, fps)
+                with open(image_file, "rb") as frame:
+                    writer.add_frame(frame.read())
+            except FileNotFoundError:
+                _LOGGER.debug("Skipping evicted snapshot %s", image_file)
+            if progress is not None:
+                progress(done, total)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(partial_path)
+        raise
+    if writer is None:
+        return 0
+    writer.close()
+    os.replace(partial_path, path)
+    return writer.frames
@@ -0,0 +1,100 @@
+"""HTTP views for Open Karotz."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiohttp
+from aiohttp import hdrs, web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .api import sniff_image_type
+from .const import (
+    DATA_MEDIA_CACHE,
+    DOMAIN,
+    MEDIA_CHUNK_SIZE,
+    MEDIA_VIEW_URL,
+    SNAPSHOT_VIEW_URL,
+)
+from .media import MediaStream, MediaTooLarge, OpenKarotzMediaCache
+from .models import OpenKarotzData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OpenKarotzSnapshotView(HomeAssistantView):
+    """Serve full resolution snapshots of a device.
+
+    Snapshots come from the snapshot cache, so concurrent viewers share
+    one capture. A new capture is piped to the client chunk by chunk as
+    it arrives; only the first chunk is sniffed to pick the content type.
+    """
+
+    url = SNAPSHOT_VIEW_URL
+    name = "api:open_karotz:snapshot"
+    requires_auth = True
+
+    async def get(self, request: web.Request, entry_id: str) -> web.StreamResponse:
+        """Return a snapshot of a device."""
+        data: OpenKarotzData | None = (
+            request.app[KEY_HASS].data.get(DOMAIN, {}).get(entry_id)
+        )
+        if data is None:
+            raise web.HTTPNotFound()
+
+        response: web.StreamResponse | None = None
+        async for chunk in data.snapshots.async_stream():
+            if response is None:
+                response = web.StreamResponse()
+                response.content_type = sniff_image_type(chunk[:8]) or "image/jpeg"
+                await response.prepare(request)
+            await response.write(chunk)
+        if response is None:
+            raise web.HTTPBadGateway()
+        await response.write_eof()
+        return response
+
+
+class OpenKarotzMediaView(HomeAssistantView):
+    """Serve proxied sounds to the devices from the local media cache.
+
+    The devices cannot authenticate, so files are addressed by the
+    unguessable token issued when the URL was rewritten. Cached files are
+    served from disk with range support; on a miss the remote body is
+    relayed while it is written to the cache. If a file cannot be cached
+    the device is redirected to the remote URL.
+    """
+
+    url = MEDIA_VIEW_URL
+    name = "api:open_karotz:media"
+    requires_auth = False
+
+    async def get(self, request: web.Request, filename: str) -> web.StreamResponse:
+        """Return a cached sound."""
+        cache: OpenKarotzMediaCache | None = request.app[KEY_HASS].data.get(
+            DATA_MEDIA_CACHE
+        )
+        token = filename.partition(".")[0]
+        if cache is None or (url := cache.token_url(token)) is None:
+            raise web.HTTPNotFound()
+        try:
+            entry = await cache.async_open(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, MediaTooLarge, OSError) as err:
+            _LOGGER.debug("Not caching %s: %s", url, err)
+            raise web.HTTPFound(url) from err
+        if isinstance(entry, MediaStream):
+            response = web.StreamResponse()
+            response.content_type = entry.content_type
+            try:
+                await response.prepare(request)
+                async for chunk in entry:
+                    await response.write(chunk)
+            finally:
+                entry.close()
+            await response.write_eof()
+            return response
+        return web.FileResponse(
+            cache.file_path(entry["hash"]),
+            chunk_size=MEDIA_CHUNK_SIZE,
+            headers={hdrs.CONTENT_TYPE: entry["content_type"]},
+        )
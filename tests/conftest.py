@@ -1,8 +1,26 @@
 """Test fixtures for Open Karotz."""
+from unittest.mock import MagicMock, create_autospec
+
 import pytest
 
+from custom_components.open_karotz.api import OpenKarotzAPI
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_bypass():
     """Enable bypass for all tests."""
-    pass
\ No newline at end of file
+    pass
+
+@pytest.fixture
+def api():
+    """Create an API stand-in with awaitable commands."""
+    return create_autospec(OpenKarotzAPI, instance=True)
+
+
+@pytest.fixture
+def coordinator(api):
+    """Create a coordinator stand-in bound to the API stand-in."""
+    coordinator = MagicMock()
+    coordinator.api = api
+    coordinator.data = {}
+    return coordinator
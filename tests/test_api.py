@@ -1,8 +1,21 @@
 """Tests for Open Karotz API."""
+import asyncio
+import json
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
-from custom_components.open_karotz.api import OpenKarotzAPI
+from custom_components.open_karotz.api import (
+    RESPONSE_JSON,
+    RESPONSE_TEXT,
+    KarotzErrorKind,
+    OpenKarotzAPI,
+    endpoint_timeout,
+    is_idempotent,
+    redact_endpoint,
+    sniff_image_type,
+)
+from custom_components.open_karotz.const import COMMAND_CLASS_LED
 
 
 class AsyncContextManagerMock(MagicMock):
@@ -78,6 +91,45 @@ async def test_set_led_color_success(api):
     assert result is True
 
 
+@pytest.mark.asyncio
+async def test_undecodable_body_is_parse_error(api):
+    """Test malformed JSON and text bodies are reported as parse errors."""
+    mock_resp = api._websession.get.return_value.__aenter__.return_value
+    mock_resp.json.side_effect = json.JSONDecodeError("bad", "{", 0)
+
+    result = await api.async_request("/cgi-bin/get_free_space", RESPONSE_JSON)
+    assert result.error is KarotzErrorKind.PARSE
+
+    mock_resp.text.side_effect = UnicodeDecodeError("utf-8", b"\xff", 0, 1, "bad")
+    result = await api.async_request("/cgi-bin/sounds_list", RESPONSE_TEXT)
+    assert result.error is KarotzErrorKind.PARSE
+
+
+@pytest.mark.asyncio
+async def test_has_pending_command_class(api):
+    """Test queued classed commands are reported until they are sent."""
+    task = asyncio.create_task(api.set_led_color("FF0000"))
+    await asyncio.sleep(0)
+
+    assert api.has_pending(COMMAND_CLASS_LED)
+    await task
+    assert not api.has_pending(COMMAND_CLASS_LED)
+
+
+@pytest.mark.asyncio
+async def test_activity_only_for_state_commands(api):
+    """Test housekeeping requests do not count as device activity."""
+    listener = MagicMock()
+    api.async_add_activity_listener(listener)
+
+    await api.clear_snapshots()
+    await api.stop()
+    listener.assert_not_called()
+
+    await api.set_led_color("FF0000")
+    listener.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_set_led_color_failure(api):
     """Test set_led_color with failed response."""
@@ -146,3 +198,370 @@ async def test_clear_cache_success(api):
     result = await api.clear_cache()
     
     assert result is True
+
+
+class SlowResponseMock:
+    """Response mock that tracks how many requests are in flight."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def __aenter__(self):
+        SlowResponseMock.in_flight += 1
+        SlowResponseMock.max_in_flight = max(
+            SlowResponseMock.max_in_flight, SlowResponseMock.in_flight
+        )
+        await asyncio.sleep(0.01)
+        resp = MagicMock()
+        resp.status = 200
+        return resp
+
+    async def __aexit__(self, *args):
+        SlowResponseMock.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_commands_are_serialized(api):
+    """Test concurrent commands reach the device one at a time."""
+    SlowResponseMock.in_flight = 0
+    SlowResponseMock.max_in_flight = 0
+    api._websession.get.side_effect = lambda *args, **kwargs: SlowResponseMock()
+
+    results = await asyncio.gather(
+        api.set_led_color("FF0000"),
+        api.reset_ears(),
+        api.play_sound("bip1"),
+        api.wake_up(),
+    )
+
+    assert results == [True, True, True, True]
+    assert SlowResponseMock.max_in_flight == 1
+    assert api.stats["completed"] == 4
+    assert api.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_command():
+    """Test commands are rejected when the queue stays full."""
+    mock_session = MagicMock()
+    mock_session.get.side_effect = lambda *args, **kwargs: SlowResponseMock()
+    api = OpenKarotzAPI(
+        "192.168.1.70", websession=mock_session, queue_size=1, queue_timeout=0.001
+    )
+
+    results = await asyncio.gather(
+        api.play_sound("bip1"),
+        api.play_sound("bling"),
+        api.play_sound("flush"),
+    )
+
+    assert False in results
+    assert api.stats["rejected"] >= 1
+    await api.async_close()
+
+
+@pytest.mark.asyncio
+async def test_led_commands_coalesce(api):
+    """Test queued LED commands collapse to the newest value."""
+    results = await asyncio.gather(
+        api.set_led_color("FF0000"),
+        api.set_led_color("00FF00"),
+        api.set_led_color("0000FF"),
+    )
+
+    assert results == [True, True, True]
+    assert api._websession.get.call_count == 1
+    assert api._websession.get.call_args[0][0].endswith("color=0000FF")
+    assert api.stats["coalesced"] == 2
+    assert api.stats["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_different_command_classes_do_not_coalesce(api):
+    """Test commands of different classes are all sent."""
+    await asyncio.gather(
+        api.set_led_color("FF0000"),
+        api.set_ear_position(8, 8),
+        api.set_volume(0.5),
+        api.play_sound("bip1"),
+        api.play_sound("bip1"),
+    )
+
+    assert api._websession.get.call_count == 5
+    assert api.stats["coalesced"] == 0
+
+
+def test_redact_endpoint():
+    """Test FTP credentials never reach the logs."""
+    assert redact_endpoint(
+        "/cgi-bin/snapshot_ftp?server=10.0.0.2&user=k&password=s3cret&remote_dir=%2F"
+    ) == (
+        "/cgi-bin/snapshot_ftp?server=10.0.0.2&user=k&password=**REDACTED**"
+        "&remote_dir=%2F"
+    )
+
+
+def test_endpoint_timeout_budgets():
+    """Test slow endpoints get a larger timeout budget."""
+    assert endpoint_timeout("/cgi-bin/snapshot?silent=1").total == 20.0
+    assert endpoint_timeout("/cgi-bin/leds?color=FF0000").total == 5.0
+
+
+@pytest.mark.asyncio
+async def test_owned_session_closed():
+    """Test the API closes the pool it created itself."""
+    api = OpenKarotzAPI("192.168.1.70")
+    session = api.session
+
+    assert api.session is session
+    await api.async_close()
+
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_closed_api_refuses_requests():
+    """Test a closed API does not open a new pool for late callers."""
+    api = OpenKarotzAPI("192.168.1.70")
+    api.session
+    await api.async_close()
+
+    assert await api.set_led_color("FF0000") is False
+    assert api._websession is None
+    with pytest.raises(RuntimeError):
+        api.session
+
+
+@pytest.mark.asyncio
+async def test_shared_session_not_closed(api):
+    """Test the API leaves a caller-provided session open."""
+    await api.async_close()
+
+    api._websession.close.assert_not_called()
+
+
+class FlakyResponseMock:
+    """Response mock that times out a given number of times."""
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    async def __aenter__(self):
+        if self.failures:
+            self.failures -= 1
+            raise asyncio.TimeoutError
+        resp = MagicMock()
+        resp.status = 200
+        resp.headers = {"Content-Type": "application/json"}
+        resp.json = AsyncMock(return_value={})
+        return resp
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def test_idempotent_classification():
+    """Test endpoints are classified for retries."""
+    assert is_idempotent("/cgi-bin/leds?color=FF0000")
+    assert is_idempotent("/cgi-bin/rfid_list")
+    assert not is_idempotent("/cgi-bin/tts?text=Hi&voice=5")
+    assert not is_idempotent("/cgi-bin/apps/moods?id=3")
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_retried(api):
+    """Test transient failures of idempotent endpoints are retried."""
+    flaky = FlakyResponseMock(2)
+    api._websession.get.side_effect = lambda *args, **kwargs: flaky
+
+    result = await api.async_request("/cgi-bin/ears?left=8&right=8")
+
+    assert result.ok
+    assert result.attempts == 3
+    assert result.latency > 0
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_request_not_retried(api):
+    """Test non-idempotent endpoints are attempted once."""
+    flaky = FlakyResponseMock(1)
+    api._websession.get.side_effect = lambda *args, **kwargs: flaky
+
+    result = await api.async_request("/cgi-bin/tts?text=Hi&voice=5")
+
+    assert not result.ok
+    assert result.attempts == 1
+    assert result.error == KarotzErrorKind.TIMEOUT
+    assert await api.play_tts("Hi") is True
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast(api):
+    """Test an unreachable device trips the breaker and fails fast."""
+    api._websession.get.side_effect = lambda *args, **kwargs: FlakyResponseMock(100)
+
+    for _ in range(3):
+        assert await api.play_sound("bip1") is False
+
+    assert api.available is False
+    assert api.breaker_state == "open"
+
+    calls = api._websession.get.call_count
+    result = await api.async_request("/cgi-bin/sound?id=bip1")
+
+    assert result.error == KarotzErrorKind.UNAVAILABLE
+    assert api._websession.get.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_breaker_probe_recovers(api):
+    """Test a successful probe closes the breaker again."""
+    api._websession.get.side_effect = lambda *args, **kwargs: FlakyResponseMock(100)
+    for _ in range(3):
+        await api.play_sound("bip1")
+    changes = []
+    api.async_add_listener(lambda: changes.append(api.available))
+
+    api._breaker._opened_at -= 60
+    api._websession.get.side_effect = lambda *args, **kwargs: FlakyResponseMock(0)
+
+    assert await api.play_sound("bip1") is True
+    assert api.available is True
+    assert changes == [True]
+    assert api._websession.get.call_args_list[-2][0][0].endswith("get_free_space")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_request(api):
+    """Test identical concurrent reads hit the device once."""
+    results = await asyncio.gather(
+        api.get_rfid_list(), api.get_rfid_list(), api.get_rfid_list()
+    )
+
+    assert results == [{}, {}, {}]
+    assert api._websession.get.call_count == 1
+    assert api.stats["read_hits"] == 2
+    assert api.stats["read_misses"] == 1
+
+    await api.get_rfid_list()
+
+    assert api._websession.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_different_reads_not_shared(api):
+    """Test reads of different endpoints are not merged."""
+    await asyncio.gather(api.get_rfid_list(), api.get_ear_position())
+
+    assert api._websession.get.call_count == 2
+    assert api.stats["read_hits"] == 0
+
+
+def _image_response(body, content_type="image/jpeg"):
+    """Return a mocked snapshot response yielding ``body`` in small chunks."""
+
+    async def iter_chunked(size):
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+
+    mock_resp = AsyncContextManagerMock()
+    mock_resp.status = 200
+    mock_resp.read = AsyncMock(return_value=body)
+    mock_resp.text = AsyncMock(side_effect=AssertionError("decoded binary body"))
+    mock_resp.content.iter_chunked = iter_chunked
+    type(mock_resp).headers = {"Content-Type": content_type}
+    return mock_resp
+
+
+def test_sniff_image_type():
+    """Test image type detection from the first bytes."""
+    assert sniff_image_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+    assert sniff_image_type(b"\x89PNG\r\n\x1a\n") == "image/png"
+    assert sniff_image_type(b"GIF89a", "image/gif; q=1") == "image/gif"
+    assert sniff_image_type(b"<html>", "text/html") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_snapshot_relays_chunks(api):
+    """Test snapshots are handed over chunk by chunk."""
+    body = b"\xff\xd8\xff" + bytes(100)
+    api._websession.get.return_value.__aenter__.return_value = _image_response(
+        body, "application/octet-stream"
+    )
+    chunks = []
+
+    assert await api.stream_snapshot(chunks.append, chunk_size=32) is True
+
+    assert len(chunks) == 4
+    assert b"".join(chunks) == body
+
+
+@pytest.mark.asyncio
+async def test_stream_snapshot_rejects_non_image(api):
+    """Test a non-image body is not relayed."""
+    api._websession.get.return_value.__aenter__.return_value = _image_response(
+        b"<html>error</html>", "text/html"
+    )
+    chunks = []
+
+    assert await api.stream_snapshot(chunks.append) is False
+    assert chunks == []
+
+
+@pytest.mark.asyncio
+async def test_stream_snapshot_waits_for_queued_command(api):
+    """Test a snapshot stream does not overlap a queued command."""
+    order = []
+
+    async def command():
+        await asyncio.sleep(0.01)
+        order.append("command")
+
+    api._websession.get.return_value.__aenter__.return_value = _image_response(
+        b"\xff\xd8\xff", "image/jpeg"
+    )
+    queued = asyncio.create_task(api._async_submit("/cgi-bin/leds", command))
+    await asyncio.sleep(0)
+    await api.stream_snapshot(lambda chunk: order.append("snapshot"))
+    await queued
+
+    assert order == ["command", "snapshot"]
+
+
+@pytest.mark.asyncio
+async def test_capture_snapshot_non_image_not_decoded(api):
+    """Test a non-image snapshot body is rejected without decoding it."""
+    api._websession.get.return_value.__aenter__.return_value = _image_response(
+        b"\x00\x01 not an image", "application/octet-stream"
+    )
+
+    assert await api.capture_snapshot() is None
+
+
+@pytest.mark.asyncio
+async def test_play_sound_url_rewritten(api):
+    """Test sound URLs go through the rewriter unless proxying is off."""
+    api.set_url_rewriter(lambda url: "http://ha.local/api/open_karotz/media/t.mp3")
+
+    await api.play_sound_url("http://example.com/a.mp3")
+    await api.play_sound_url("http://radio.example.com/live", proxy=False)
+
+    urls = [call.args[0] for call in api._websession.get.call_args_list]
+    assert urls[0].endswith("url=http%3A//ha.local/api/open_karotz/media/t.mp3")
+    assert urls[1].endswith("url=http%3A//radio.example.com/live")
+
+
+@pytest.mark.asyncio
+async def test_command_observer_sees_classed_commands(api):
+    """Test state-setting commands are reported to the observer."""
+    observed = []
+    api.set_command_observer(
+        lambda command_class, endpoint, result: observed.append(
+            (command_class, endpoint, result.ok)
+        )
+    )
+
+    await api.wake_up()
+    await api.play_sound("bip1")
+
+    assert observed == [("power", "/cgi-bin/wake_up", True)]
@@ -0,0 +1,195 @@
+"""Tests for the Open Karotz snapshot archive."""
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.open_karotz.archive import (
+    OpenKarotzPreTriggerBuffer,
+    OpenKarotzSnapshotArchive,
+    snapshot_timestamp,
+)
+
+
+@pytest.fixture
+def hass():
+    """Create a hass stand-in running executor jobs inline."""
+    hass = MagicMock()
+
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    return hass
+
+
+@pytest.fixture
+def api():
+    """Create an API stand-in with two device snapshots."""
+    api = MagicMock()
+    api.get_snapshot_list = AsyncMock(return_value="a.jpg\nb.jpg\n")
+    api.download_snapshot = AsyncMock(side_effect=lambda name: b"image " + name.encode())
+    api.clear_snapshots = AsyncMock(return_value=True)
+    return api
+
+
+@pytest.fixture
+async def archive(hass, api, tmp_path):
+    """Create a loaded archive in a temporary directory."""
+    archive = OpenKarotzSnapshotArchive(hass, api, str(tmp_path / "archive"))
+    await archive.async_load()
+    return archive
+
+
+async def test_add_dedupes_by_hash(archive):
+    """Test identical frames are stored once."""
+    first = await archive.async_add(b"frame", timestamp=2000000000)
+
+    assert await archive.async_add(b"frame", timestamp=2000000001) is None
+    assert archive.stats == {"snapshots": 1, "bytes": 5}
+    assert archive.get(2000000000) is first
+    assert os.path.exists(archive.file_path(first))
+
+
+async def test_lookup_by_timestamp(archive):
+    """Test exact and closest lookups."""
+    await archive.async_add(b"one", timestamp=2000000000)
+    await archive.async_add(b"two", timestamp=2000000010)
+
+    assert archive.closest(2000000005).timestamp == 2000000000
+    assert archive.closest(2000000010).timestamp == 2000000010
+    assert archive.closest(1999999999) is None
+
+
+async def test_evicts_by_size_and_age(hass, api, tmp_path):
+    """Test the oldest frames are evicted beyond the bounds."""
+    archive = OpenKarotzSnapshotArchive(
+        hass, api, str(tmp_path), max_age=3600, max_bytes=8
+    )
+    await archive.async_load()
+    old = await archive.async_add(b"old", timestamp=1000)
+    first = await archive.async_add(b"first")
+    await archive.async_add(b"second")
+
+    assert archive.get(old.timestamp) is None
+    assert archive.get(first.timestamp) is None
+    assert archive.stats == {"snapshots": 1, "bytes": 6}
+    assert not os.path.exists(archive.file_path(first))
+
+
+async def test_index_survives_reload(hass, api, archive):
+    """Test the index file restores the archive."""
+    entry = await archive.async_add(b"frame")
+
+    restored = OpenKarotzSnapshotArchive(hass, api, archive.path)
+    await restored.async_load()
+
+    assert restored.get(entry.timestamp) == entry
+
+
+async def test_sync_clears_device_after_verified_sync(archive, api):
+    """Test device storage is cleared once everything is archived."""
+    assert await archive.async_sync() == 2
+
+    api.clear_snapshots.assert_awaited_once()
+    assert archive.stats["snapshots"] == 2
+
+
+async def test_sync_keeps_device_snapshots_on_failure(archive, api):
+    """Test a failed download keeps the device snapshots."""
+    api.download_snapshot.side_effect = [b"image a", None]
+
+    assert await archive.async_sync() == 1
+    api.clear_snapshots.assert_not_awaited()
+
+    api.download_snapshot.side_effect = [b"image b"]
+    assert await archive.async_sync() == 1
+
+    assert api.download_snapshot.await_count == 3
+    api.clear_snapshots.assert_awaited_once()
+
+
+async def test_sync_keeps_snapshots_taken_during_sync(archive, api):
+    """Test device storage is not cleared while new snapshots are pending."""
+    api.get_snapshot_list.side_effect = [
+        "a.jpg\nb.jpg\n",
+        "a.jpg\nb.jpg\nc.jpg\n",
+        "a.jpg\nb.jpg\nc.jpg\n",
+        "a.jpg\nb.jpg\nc.jpg\n",
+    ]
+
+    assert await archive.async_sync() == 2
+    api.clear_snapshots.assert_not_awaited()
+
+    assert await archive.async_sync() == 1
+    api.clear_snapshots.assert_awaited_once()
+    assert api.download_snapshot.await_count == 3
+
+
+async def test_sync_uses_snapshot_time(archive, api):
+    """Test synced frames are stamped with the time from their name."""
+    api.get_snapshot_list.return_value = "snapshot_1900000000.jpg\n"
+
+    await archive.async_sync()
+
+    assert archive.entries[0].timestamp == 1900000000
+
+
+def test_snapshot_timestamp():
+    """Test capture times are read from snapshot names."""
+    assert snapshot_timestamp("1900000000123.jpg") == 1900000000.123
+    assert snapshot_timestamp(
+        "snapshot_2030_03_17_10_33_22.jpg"
+    ) == dt_util.as_timestamp("2030-03-17T10:33:22")
+    assert snapshot_timestamp("snapshot.jpg") is None
+
+
+def test_pre_trigger_bounded():
+    """Test the buffer keeps at most N frames within the memory cap."""
+    buffer = OpenKarotzPreTriggerBuffer(MagicMock(), max_frames=3, max_bytes=10)
+    for index in range(5):
+        buffer.push(index, b"ab")
+
+    assert [timestamp for timestamp, _ in buffer.frames] == [2, 3, 4]
+
+    buffer.push(5, b"x" * 8)
+    assert [timestamp for timestamp, _ in buffer.frames] == [4, 5]
+
+
+async def test_pre_trigger_flush(archive):
+    """Test a flush archives buffered frames and a post-event burst."""
+    snapshots = MagicMock()
+    snapshots.async_get = AsyncMock(side_effect=[b"after 1", b"after 2"])
+    buffer = OpenKarotzPreTriggerBuffer(snapshots, max_frames=3)
+    buffer.push(2000000000, b"before 1")
+    buffer.push(2000000005, b"before 2")
+
+    entries = await buffer.async_flush(archive, post_frames=2, interval=0)
+
+    assert len(entries) == 4
+    assert entries[0].timestamp == 2000000000
+    assert snapshots.async_get.await_args.kwargs == {"max_age": 0}
+    assert archive.stats["snapshots"] == 4
+
+
+async def test_build_timelapse_from_range(archive, tmp_path):
+    """Test a timelapse only includes the requested period."""
+    for index in range(3):
+        await archive.async_add(b"frame %d" % index, timestamp=2000000000 + index)
+    written = []
+
+    def fake_write(files, path, fps, progress, total):
+        written.extend(files)
+        return len(files)
+
+    with patch("custom_components.open_karotz.archive.write_timelapse", fake_write):
+        frames = await archive.async_build_timelapse(
+            str(tmp_path / "t.avi"), 2000000001, 2000000002, 10
+        )
+
+    assert frames == 2
+    assert written == [
+        archive.file_path(archive.get(2000000001)),
+        archive.file_path(archive.get(2000000002)),
+    ]
@@ -0,0 +1,251 @@
+"""Tests for the Open Karotz audio scheduler."""
+import asyncio
+from urllib.parse import quote
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.audio import (
+    OpenKarotzAnnouncementBuffer,
+    OpenKarotzAudioScheduler,
+    estimate_tts_duration,
+    split_tts_text,
+)
+from custom_components.open_karotz.const import AUDIO_MAX_WAIT
+
+
+@pytest.fixture
+def api():
+    """Create an API stand-in."""
+    api = MagicMock()
+    api.stop = AsyncMock(return_value=True)
+    return api
+
+
+def _player(played, name, result=True):
+    """Return a play callable recording its name."""
+
+    async def play():
+        played.append(name)
+        return result
+
+    return play
+
+
+def test_estimate_tts_duration():
+    """Test longer messages are estimated to play longer."""
+    assert estimate_tts_duration("a" * 140) > estimate_tts_duration("a" * 14) > 0
+
+
+async def test_items_play_in_turn(api):
+    """Test queued items wait for the playing item to finish."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    first = asyncio.create_task(scheduler.async_play(_player(played, "one"), "one", 0.05))
+    second = asyncio.create_task(scheduler.async_play(_player(played, "two"), "two", 0.05))
+    await asyncio.sleep(0.01)
+
+    assert played == ["one"]
+    assert scheduler.current.title == "one"
+    assert scheduler.queue_length == 1
+    assert await first is True
+    assert await second is True
+    assert played == ["one", "two"]
+    await asyncio.sleep(0.1)
+    assert scheduler.current is None
+    api.stop.assert_not_called()
+
+
+async def test_urgent_item_preempts(api):
+    """Test an urgent item stops a normal one."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    await scheduler.async_play(_player(played, "long"), "long", 10)
+    await scheduler.async_play(_player(played, "alarm"), "alarm", 0.05, "urgent")
+
+    assert played == ["long", "alarm"]
+    api.stop.assert_awaited_once()
+    assert scheduler.stats["preempted"] == 1
+    await scheduler.async_close()
+
+
+async def test_urgent_item_jumps_queue(api):
+    """Test urgent items play before queued normal ones."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    await scheduler.async_play(_player(played, "first"), "first", 0.05, "urgent")
+    normal = asyncio.create_task(scheduler.async_play(_player(played, "normal"), "normal", 0.01))
+    await asyncio.sleep(0)
+    await scheduler.async_play(_player(played, "urgent"), "urgent", 0.01, "urgent")
+    await normal
+
+    assert played == ["first", "urgent", "normal"]
+
+
+async def test_stale_low_priority_dropped(api):
+    """Test low priority items are dropped after their deadline."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    with patch.dict(AUDIO_MAX_WAIT, {"low": 0.01}):
+        await scheduler.async_play(_player(played, "speech"), "speech", 0.05)
+        result = await scheduler.async_play(_player(played, "chime"), "chime", 0.01, "low")
+
+    assert result is False
+    assert played == ["speech"]
+    assert scheduler.stats["expired"] == 1
+
+
+async def test_stream_gives_way(api):
+    """Test a stream without duration is replaced by the next item."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    await scheduler.async_play(_player(played, "radio"), "radio", None)
+    assert scheduler.current.title == "radio"
+
+    await scheduler.async_play(_player(played, "sound"), "sound", 0.01)
+
+    assert played == ["radio", "sound"]
+    api.stop.assert_awaited_once()
+
+
+async def test_stream_gives_way_to_queued_item(api):
+    """Test a stream starting behind a busy queue moves straight on."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    await scheduler.async_play(_player(played, "speech"), "speech", 0.05)
+    radio = asyncio.create_task(scheduler.async_play(_player(played, "radio"), "radio", None))
+    sound = asyncio.create_task(scheduler.async_play(_player(played, "sound"), "sound", 0.01))
+
+    assert await asyncio.wait_for(radio, 1) is True
+    assert await asyncio.wait_for(sound, 1) is True
+    assert played == ["speech", "radio", "sound"]
+    api.stop.assert_awaited_once()
+
+
+async def test_stop_drops_queue(api):
+    """Test stopping drops queued items."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    played = []
+
+    await scheduler.async_play(_player(played, "one"), "one", 10)
+    queued = asyncio.create_task(scheduler.async_play(_player(played, "two"), "two", 1))
+    await asyncio.sleep(0)
+    await scheduler.async_stop()
+
+    assert await queued is False
+    assert scheduler.current is None
+    assert played == ["one"]
+
+
+def test_split_tts_text():
+    """Test messages are split at sentences into URL-safe chunks."""
+    text = "Hello there. " + "This sentence, with a comma, goes on and on. " * 20
+
+    chunks = split_tts_text(text, max_length=120, first_length=20)
+
+    assert chunks[0] == "Hello there."
+    assert all(len(quote(chunk)) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == text.strip()
+    assert split_tts_text("") == []
+
+
+def test_split_tts_text_long_word():
+    """Test words longer than a chunk are cut."""
+    chunks = split_tts_text("x" * 50, max_length=20, first_length=20)
+
+    assert "".join(chunks) == "x" * 50
+    assert max(len(chunk) for chunk in chunks) == 20
+
+
+async def test_tts_chunks_pipelined(api):
+    """Test TTS chunks are sent back to back and in order."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    sent = []
+
+    async def play_tts(text, voice):
+        sent.append(text)
+        return True
+
+    api.play_tts = play_tts
+    with patch("custom_components.open_karotz.audio.TTS_CHARS_PER_SECOND", 10000), patch(
+        "custom_components.open_karotz.audio.split_tts_text",
+        lambda text: split_tts_text(text, first_length=10),
+    ):
+        assert await scheduler.async_play_tts("One. Two. Three.", "5") is True
+        assert sent == ["One."]
+        while scheduler.queue_length:
+            await asyncio.sleep(0.01)
+
+    assert sent == ["One.", "Two. Three."]
+    api.stop.assert_not_called()
+
+
+async def test_tts_chunks_dropped_after_failure(api):
+    """Test the rest of a message is dropped when a chunk fails."""
+    scheduler = OpenKarotzAudioScheduler(api)
+    api.play_tts = AsyncMock(return_value=False)
+
+    with patch(
+        "custom_components.open_karotz.audio.split_tts_text",
+        lambda text: split_tts_text(text, first_length=5),
+    ):
+        assert await scheduler.async_play_tts("One. Two.", "5") is False
+    await asyncio.sleep(0.01)
+
+    api.play_tts.assert_awaited_once()
+    assert scheduler.queue_length == 0
+
+
+@pytest.fixture
+def audio():
+    """Create an audio scheduler stand-in."""
+    audio = MagicMock()
+    audio.async_play_tts = AsyncMock(return_value=True)
+    return audio
+
+
+async def test_announcements_coalesce(audio):
+    """Test a burst of messages becomes one deduplicated announcement."""
+    buffer = OpenKarotzAnnouncementBuffer(audio, window=0.02, max_latency=1)
+
+    buffer.async_add("Front door open", "5")
+    buffer.async_add("It will rain.", "5", "low")
+    buffer.async_add("front door open.", "5")
+    await asyncio.sleep(0.05)
+
+    audio.async_play_tts.assert_awaited_once_with(
+        "Front door open. It will rain.", "5", "normal"
+    )
+    assert buffer.stats == {"received": 3, "deduplicated": 1, "announcements": 1}
+
+
+async def test_announcements_max_latency(audio):
+    """Test a steady stream of messages is flushed after the max latency."""
+    buffer = OpenKarotzAnnouncementBuffer(audio, window=0.03, max_latency=0.05)
+
+    for index in range(5):
+        buffer.async_add(f"Message {index}", "5")
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.05)
+
+    assert audio.async_play_tts.await_count == 2
+
+
+async def test_announcements_urgent_flush(audio):
+    """Test urgent messages flush the batch immediately."""
+    buffer = OpenKarotzAnnouncementBuffer(audio, window=10, max_latency=10)
+
+    buffer.async_add("Reminder", "5")
+    buffer.async_add("Smoke detected", "5", "urgent")
+    await asyncio.sleep(0)
+
+    audio.async_play_tts.assert_awaited_once_with(
+        "Reminder. Smoke detected.", "5", "urgent"
+    )
+    await buffer.async_close()
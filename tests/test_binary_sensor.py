@@ -1,70 +1,50 @@
 """Tests for Open Karotz binary sensor platform."""
-from unittest.mock import MagicMock, patch
-
-import pytest
+from unittest.mock import patch
 
 from custom_components.open_karotz.binary_sensor import OpenKarotzRfidSensor
 
 
-@pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
-
-
-def test_rfid_initial_state():
+def test_rfid_initial_state(coordinator):
     """Test RFID sensor initial state."""
-    sensor = OpenKarotzRfidSensor("192.168.1.70", "test_id")
+    sensor = OpenKarotzRfidSensor(coordinator, "test_id")
     
     assert sensor.is_on is False
     assert sensor.extra_state_attributes == {"tag_id": None}
 
 
-async def test_rfid_update_with_tag():
-    """Test RFID sensor update with tag."""
-    mock_response = {"rfids": [{"tag": "1234567890"}]}
-    
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_resp.json = MagicMock(return_value=mock_response)
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        sensor = OpenKarotzRfidSensor("192.168.1.70", "test_id")
-        await sensor.async_update()
-        
-        assert sensor.is_on is True
-        assert sensor.extra_state_attributes["tag_id"] == "1234567890"
+def test_rfid_coordinator_update(coordinator):
+    """Test RFID sensor state follows coordinator data."""
+    coordinator.data = {"rfid": {"rfids": [{"tag": "1234567890"}]}}
+    sensor = OpenKarotzRfidSensor(coordinator, "test_id")
 
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+
+    assert sensor.is_on is True
+    assert sensor.extra_state_attributes["tag_id"] == "1234567890"
 
-async def test_rfid_update_no_tag():
-    """Test RFID sensor update with no tag."""
-    mock_response = {"rfids": []}
-    
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_resp.json = MagicMock(return_value=mock_response)
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        sensor = OpenKarotzRfidSensor("192.168.1.70", "test_id")
-        await sensor.async_update()
-        
-        assert sensor.is_on is False
-        assert sensor.extra_state_attributes is None
 
+def test_rfid_coordinator_update_no_tag(coordinator):
+    """Test RFID sensor turns off when no tag is reported."""
+    sensor = OpenKarotzRfidSensor(coordinator, "test_id")
+    sensor._is_on = True
+    sensor._tag_id = "1234567890"
+    coordinator.data = {"rfid": {"rfids": []}}
 
-async def test_rfid_update_failure():
-    """Test RFID sensor update with failure."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        sensor = OpenKarotzRfidSensor("192.168.1.70", "test_id")
-        await sensor.async_update()
-        
-        assert sensor.is_on is False
-        assert sensor.extra_state_attributes is None
\ No newline at end of file
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+
+    assert sensor.is_on is False
+    assert sensor.extra_state_attributes == {"tag_id": None}
+
+
+def test_rfid_coordinator_update_missing_data(coordinator):
+    """Test RFID sensor stays off when the RFID endpoint failed."""
+    coordinator.data = {"rfid": None}
+    sensor = OpenKarotzRfidSensor(coordinator, "test_id")
+
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+
+    assert sensor.is_on is False
+    assert sensor.extra_state_attributes == {"tag_id": None}
@@ -1,47 +1,27 @@
 """Tests for Open Karotz button platform."""
-from unittest.mock import MagicMock, patch
-
-import pytest
-
 from custom_components.open_karotz.button import OpenKarotzClearCacheButton
 
 
-@pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
-
-
-def test_button_initial_state():
+def test_button_initial_state(api):
     """Test button initial state."""
-    button = OpenKarotzClearCacheButton("192.168.1.70", "test_id")
+    button = OpenKarotzClearCacheButton(api, "test_id")
     
     assert button.name == "Open Karotz Clear Cache"
+    assert button.unique_id == "test_id_clear_cache"
+
+
+async def test_button_press(api):
+    """Test button press clears the device cache."""
+    button = OpenKarotzClearCacheButton(api, "test_id")
+    await button.async_press()
+
+    api.clear_cache.assert_awaited_once_with()
+
 
+async def test_button_press_failure(api):
+    """Test a failed clear does not raise."""
+    api.clear_cache.return_value = False
+    button = OpenKarotzClearCacheButton(api, "test_id")
+    await button.async_press()
 
-async def test_button_press_success():
-    """Test button press with success."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        button = OpenKarotzClearCacheButton("192.168.1.70", "test_id")
-        await button.async_press()
-        
-        assert button.name == "Open Karotz Clear Cache"
-
-
-async def test_button_press_failure():
-    """Test button press with failure."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        button = OpenKarotzClearCacheButton("192.168.1.70", "test_id")
-        await button.async_press()
-        
-        assert button.name == "Open Karotz Clear Cache"
\ No newline at end of file
+    api.clear_cache.assert_awaited_once_with()
@@ -0,0 +1,28 @@
+"""Tests for the Open Karotz camera platform."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.open_karotz.camera import OpenKarotzCamera
+from custom_components.open_karotz.snapshot import OpenKarotzSnapshotStream
+
+
+async def test_mjpeg_viewer_gone_while_device_silent():
+    """Test a viewer that left is dropped even when no frames arrive."""
+    snapshots = MagicMock()
+    snapshots.async_get = AsyncMock(return_value=None)
+    snapshots.image = b"\xff\xd8last"
+    camera = OpenKarotzCamera(
+        MagicMock(), snapshots, MagicMock(), MagicMock(), MagicMock(), "test_id"
+    )
+    camera._stream = OpenKarotzSnapshotStream(snapshots, target_fps=500)
+    response = MagicMock()
+    response.prepare = AsyncMock()
+    response.write = AsyncMock(side_effect=ConnectionResetError)
+
+    with patch(
+        "custom_components.open_karotz.camera.web.StreamResponse",
+        return_value=response,
+    ):
+        assert await camera.handle_async_mjpeg_stream(MagicMock()) is response
+
+    assert b"\xff\xd8last" in response.write.await_args.args[0]
+    assert camera._stream.subscribers == 0
@@ -0,0 +1,143 @@
+"""Tests for the Open Karotz catalog cache."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.api import OpenKarotzAPI
+from custom_components.open_karotz.catalog import (
+    OpenKarotzCatalog,
+    async_update_service_selectors,
+    parse_catalog,
+)
+from custom_components.open_karotz.const import CATALOG_MOODS, CATALOG_SOUNDS
+
+
+def test_parse_json_wrapped_list():
+    """Test parsing a JSON object wrapping a list of items."""
+    text = '{"sounds": [{"id": "bip1"}, {"id": "bling", "name": "Bling"}]}'
+
+    assert parse_catalog(text) == {"bip1": "bip1", "bling": "Bling"}
+
+
+def test_parse_json_mapping():
+    """Test parsing a JSON id to label mapping."""
+    assert parse_catalog('{"1": "French Male"}') == {"1": "French Male"}
+
+
+def test_parse_text_lines():
+    """Test parsing one id and optional label per line."""
+    text = "1,Happy\n2,Sad\n3\n"
+
+    assert parse_catalog(text) == {"1": "Happy", "2": "Sad", "3": "3"}
+
+
+def test_parse_comma_separated():
+    """Test parsing a single comma-separated line."""
+    assert parse_catalog("bip1, bling,flush") == {
+        "bip1": "bip1",
+        "bling": "bling",
+        "flush": "flush",
+    }
+
+
+@pytest.fixture
+def api():
+    """Create an API with mocked catalog endpoints."""
+    api = OpenKarotzAPI("192.168.1.70", websession=MagicMock())
+    api.get_sound_list = AsyncMock(return_value='{"sounds": ["bip1", "ding"]}')
+    api.get_moods_list = AsyncMock(return_value=None)
+    return api
+
+
+@pytest.fixture
+def catalog(api):
+    """Create a catalog with a mocked store."""
+    catalog = OpenKarotzCatalog(MagicMock(), api, "test_entry_id")
+    catalog._store = MagicMock()
+    catalog._store.async_load = AsyncMock(return_value=None)
+    return catalog
+
+
+async def test_defaults_until_fetched(catalog):
+    """Test the built-in lists are served before the first fetch."""
+    await catalog.async_load()
+
+    assert "bip1" in catalog.get(CATALOG_SOUNDS)
+    assert len(catalog.get(CATALOG_MOODS)) == 301
+    assert catalog.is_stale(CATALOG_SOUNDS)
+
+
+async def test_refresh_parses_and_persists(catalog):
+    """Test a fetched catalog replaces the defaults and is saved."""
+    changes = []
+    catalog.async_add_listener(changes.append)
+
+    assert await catalog.async_refresh(CATALOG_SOUNDS) is True
+
+    assert catalog.get(CATALOG_SOUNDS) == {"bip1": "bip1", "ding": "ding"}
+    assert not catalog.is_stale(CATALOG_SOUNDS)
+    assert catalog.is_stale(CATALOG_SOUNDS, max_age=0)
+    assert changes == [CATALOG_SOUNDS]
+    catalog._store.async_delay_save.assert_called_once()
+
+
+async def test_unchanged_hash_renews_ttl(catalog):
+    """Test refetching identical content does not notify listeners."""
+    await catalog.async_refresh(CATALOG_SOUNDS)
+    catalog._entries[CATALOG_SOUNDS]["fetched_at"] = 0
+    changes = []
+    catalog.async_add_listener(changes.append)
+
+    assert await catalog.async_refresh(CATALOG_SOUNDS) is False
+
+    assert not catalog.is_stale(CATALOG_SOUNDS)
+    assert changes == []
+
+
+async def test_failed_fetch_keeps_catalog(catalog):
+    """Test a failed fetch keeps serving the current catalog."""
+    assert await catalog.async_refresh(CATALOG_MOODS) is False
+
+    assert len(catalog.get(CATALOG_MOODS)) == 301
+
+
+async def test_restored_catalog_served_from_store(catalog, api):
+    """Test a persisted catalog is served without refetching."""
+    catalog._store.async_load.return_value = {
+        CATALOG_SOUNDS: {
+            "hash": "abc",
+            "fetched_at": 4102444800,
+            "items": {"ding": "ding"},
+        }
+    }
+
+    await catalog.async_load()
+
+    assert catalog.get(CATALOG_SOUNDS) == {"ding": "ding"}
+    assert not catalog.is_stale(CATALOG_SOUNDS)
+    api.get_sound_list.assert_not_called()
+
+
+async def test_service_selectors_follow_catalog(catalog):
+    """Test service selectors are rebuilt from the cached catalogs."""
+    await catalog.async_refresh(CATALOG_SOUNDS)
+    services = {
+        "play_sound": {
+            "name": "Play Sound",
+            "fields": {"sound_id": {"selector": {"text": None}}},
+        }
+    }
+
+    with patch(
+        "custom_components.open_karotz.catalog.async_set_service_schema"
+    ) as set_schema:
+        async_update_service_selectors(MagicMock(), services, catalog)
+
+    set_schema.assert_called_once()
+    description = set_schema.call_args[0][3]
+    options = description["fields"]["sound_id"]["selector"]["select"]["options"]
+    assert options == [
+        {"value": "bip1", "label": "bip1"},
+        {"value": "ding", "label": "ding"},
+    ]
+    assert services["play_sound"]["fields"]["sound_id"]["selector"] == {"text": None}
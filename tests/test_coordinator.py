@@ -0,0 +1,91 @@
+"""Tests for Open Karotz data update coordinator."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.open_karotz.api import BreakerState, OpenKarotzAPI
+from custom_components.open_karotz.const import (
+    DEFAULT_SCAN_INTERVAL,
+    POLL_BURST_INTERVAL,
+)
+from custom_components.open_karotz.coordinator import OpenKarotzCoordinator
+
+
+@pytest.fixture
+def api():
+    """Create an API with mocked endpoints."""
+    api = OpenKarotzAPI("192.168.1.70", websession=MagicMock())
+    api.get_free_space = AsyncMock(
+        return_value={"karotz": {"percent_used_space": 36}}
+    )
+    api.get_rfid_list = AsyncMock(return_value={"rfids": [{"tag": "1234567890"}]})
+    api.get_ear_position = AsyncMock(return_value={"left": 8, "right": 16})
+    return api
+
+
+@pytest.fixture
+async def coordinator(api):
+    """Create a coordinator on the running loop."""
+    hass = MagicMock()
+    hass.loop = asyncio.get_running_loop()
+    return OpenKarotzCoordinator(hass, api)
+
+
+async def test_update_fetches_all_endpoints(coordinator):
+    """Test one cycle fetches storage, RFID and ears together."""
+    data = await coordinator._async_update_data()
+
+    assert data["storage"]["karotz"]["percent_used_space"] == 36
+    assert data["rfid"]["rfids"][0]["tag"] == "1234567890"
+    assert data["ears"] == {"left": 8, "right": 16}
+
+
+async def test_update_fails_when_unreachable(coordinator, api):
+    """Test the update fails while the breaker is open."""
+    api._breaker.state = BreakerState.OPEN
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+async def test_storage_polled_on_slow_cadence(coordinator, api):
+    """Test storage is reused between storage polls."""
+    coordinator.data = await coordinator._async_update_data()
+    coordinator.data = await coordinator._async_update_data()
+
+    assert api.get_free_space.call_count == 1
+    assert api.get_rfid_list.call_count == 2
+    assert coordinator.data["storage"]["karotz"]["percent_used_space"] == 36
+
+
+async def test_change_triggers_burst(coordinator, api):
+    """Test a detected RFID change switches to burst polling."""
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.poll_interval == DEFAULT_SCAN_INTERVAL
+
+    api.get_rfid_list.return_value = {"rfids": []}
+    await coordinator._async_update_data()
+
+    assert coordinator.poll_interval == POLL_BURST_INTERVAL
+
+
+async def test_command_triggers_burst(coordinator, api):
+    """Test an accepted command switches to burst polling."""
+    resp = MagicMock()
+    resp.status = 200
+    api._websession.get.return_value.__aenter__ = AsyncMock(return_value=resp)
+    api._websession.get.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    await api.set_led_color("FF0000")
+
+    assert coordinator.poll_interval == POLL_BURST_INTERVAL
+
+
+async def test_shutdown_twice(coordinator, api):
+    """Test a repeated shutdown does not fail on released listeners."""
+    await coordinator.async_shutdown()
+    await coordinator.async_shutdown()
+
+    assert api._activity_listeners == []
@@ -1,113 +1,91 @@
 """Tests for Open Karotz cover platform."""
-from unittest.mock import MagicMock, patch
-
-import pytest
+from unittest.mock import patch
 
+from custom_components.open_karotz.const import EAR_DOWN, EAR_HORIZONTAL, EAR_UP
 from custom_components.open_karotz.cover import OpenKarotzEars
 
 
-@pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
-
-
-def test_ears_initial_state():
-    """Test ears initial state."""
-    ears = OpenKarotzEars("192.168.1.70", "test_id")
+def test_ears_initial_state(coordinator):
+    """Test ears start horizontal."""
+    ears = OpenKarotzEars(coordinator, "test_id")
     
-    assert ears.current_cover_position == 50
+    assert ears.current_cover_position == EAR_HORIZONTAL
     assert ears.is_closed is False
 
 
-async def test_ears_open():
+async def test_ears_open(coordinator, api):
     """Test ears open."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_open_cover()
-        
-        assert ears.current_cover_position == 100
-
-
-async def test_ears_close():
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_open_cover()
+
+    api.set_ear_position.assert_awaited_once_with(EAR_UP, EAR_UP)
+    assert ears.current_cover_position == EAR_UP
+
+
+async def test_ears_close(coordinator, api):
     """Test ears close."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_close_cover()
-        
-        assert ears.current_cover_position == 0
-
-
-async def test_ears_set_position():
-    """Test ears set position."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_set_cover_position(position=75)
-        
-        assert ears.current_cover_position == 75
-
-
-async def test_ears_reset():
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_close_cover()
+
+    api.set_ear_position.assert_awaited_once_with(EAR_DOWN, EAR_DOWN)
+    assert ears.current_cover_position == EAR_DOWN
+
+
+async def test_ears_set_position(coordinator, api):
+    """Test the position percentage is scaled to ear steps."""
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_set_cover_position(position=75)
+
+    api.set_ear_position.assert_awaited_once_with(12, 12)
+
+
+async def test_ears_reset(coordinator, api):
     """Test ears reset."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_reset_ears()
-        
-        assert ears.current_cover_position == 50
-
-
-async def test_ears_random():
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_open_cover()
+    await ears.async_reset_ears()
+
+    api.reset_ears.assert_awaited_once_with()
+    assert ears.current_cover_position == EAR_HORIZONTAL
+
+
+async def test_ears_random(coordinator, api):
     """Test ears random."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_random_ears()
-        
-        assert ears.current_cover_position is not None
-
-
-async def test_ears_open_tilt():
-    """Test ears open tilt."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_open_cover_tilt()
-        
-        assert ears.current_cover_position is not None
-
-
-async def test_ears_close_tilt():
-    """Test ears close tilt."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        ears = OpenKarotzEars("192.168.1.70", "test_id")
-        await ears.async_close_cover_tilt()
-        
-        assert ears.current_cover_position is not None
\ No newline at end of file
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_random_ears()
+
+    api.random_ears.assert_awaited_once_with()
+
+
+async def test_ears_tilt(coordinator, api):
+    """Test tilting moves the ears in opposite directions."""
+    ears = OpenKarotzEars(coordinator, "test_id")
+    await ears.async_open_cover_tilt()
+    await ears.async_close_cover_tilt()
+
+    assert [call.args for call in api.set_ear_position.await_args_list] == [
+        (EAR_UP, EAR_DOWN),
+        (EAR_DOWN, EAR_UP),
+    ]
+
+
+def test_ears_coordinator_update(coordinator):
+    """Test ear positions follow coordinator data."""
+    coordinator.data = {"ears": {"left": "16", "right": "0"}}
+    ears = OpenKarotzEars(coordinator, "test_id")
+
+    with patch.object(ears, "async_write_ha_state"):
+        ears._handle_coordinator_update()
+
+    assert ears.current_cover_position == 8
+
+
+def test_ears_coordinator_update_malformed(coordinator):
+    """Test malformed ear data keeps the last known position."""
+    coordinator.data = {"ears": {"left": "up"}}
+    ears = OpenKarotzEars(coordinator, "test_id")
+
+    with patch.object(ears, "async_write_ha_state"):
+        ears._handle_coordinator_update()
+
+    assert ears.current_cover_position == EAR_HORIZONTAL
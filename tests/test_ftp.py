@@ -0,0 +1,91 @@
+"""Tests for the Open Karotz FTP receiver."""
+import asyncio
+import ftplib
+import io
+
+import pytest
+
+from custom_components.open_karotz.ftp import OpenKarotzFtpReceiver
+
+
+@pytest.fixture
+async def receiver():
+    """Start a receiver on a free local port."""
+    receiver = OpenKarotzFtpReceiver(host="127.0.0.1", max_bytes=1024)
+    await receiver.async_start()
+    yield receiver
+    await receiver.async_stop()
+
+
+def _upload(port, user, password, data, passive=True):
+    """Upload a file the way the device does."""
+    with ftplib.FTP() as client:
+        client.connect("127.0.0.1", port, timeout=5)
+        client.login(user, password)
+        client.set_pasv(passive)
+        client.cwd("/snapshots")
+        return client.storbinary("STOR snap.jpg", io.BytesIO(data))
+
+
+@pytest.mark.parametrize("passive", [True, False])
+async def test_upload_routed_to_account(receiver, passive):
+    """Test uploads reach the callback of the account that sent them."""
+    uploads = []
+
+    async def on_upload(name, data):
+        uploads.append((name, data))
+
+    password = receiver.add_account("karotz", on_upload)
+    loop = asyncio.get_running_loop()
+
+    result = await loop.run_in_executor(
+        None, _upload, receiver.port, "karotz", password, b"\xff\xd8jpeg", passive
+    )
+
+    assert result.startswith("226")
+    assert uploads == [("snap.jpg", b"\xff\xd8jpeg")]
+    assert receiver.uploads == 1
+
+
+async def test_wrong_password_rejected(receiver):
+    """Test logins with a wrong password are refused."""
+    receiver.add_account("karotz", None)
+    loop = asyncio.get_running_loop()
+
+    with pytest.raises(ftplib.error_perm):
+        await loop.run_in_executor(
+            None, _upload, receiver.port, "karotz", "wrong", b"data"
+        )
+
+
+async def test_oversized_upload_rejected(receiver):
+    """Test uploads above the size bound are refused."""
+    uploads = []
+
+    async def on_upload(name, data):
+        uploads.append(name)
+
+    password = receiver.add_account("karotz", on_upload)
+    loop = asyncio.get_running_loop()
+
+    with pytest.raises(ftplib.Error):
+        await loop.run_in_executor(
+            None, _upload, receiver.port, "karotz", password, b"x" * 4096
+        )
+    assert uploads == []
+
+
+async def test_malformed_port_rejected(receiver):
+    """Test a bad PORT argument is answered instead of dropping the session."""
+    password = receiver.add_account("karotz", None)
+
+    def _send_port():
+        with ftplib.FTP() as client:
+            client.connect("127.0.0.1", receiver.port, timeout=5)
+            client.login("karotz", password)
+            with pytest.raises(ftplib.error_perm, match="501"):
+                client.sendcmd("PORT 1,2,3")
+            return client.voidcmd("NOOP")
+
+    result = await asyncio.get_running_loop().run_in_executor(None, _send_port)
+    assert result.startswith("200")
@@ -0,0 +1,68 @@
+"""Tests for Open Karotz integration setup."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.open_karotz import OpenKarotzPollScheduler
+
+
+@pytest.fixture
+async def scheduler():
+    """Create a scheduler on the running loop."""
+    hass = MagicMock()
+    hass.loop = asyncio.get_running_loop()
+    return OpenKarotzPollScheduler(hass, max_concurrent=2)
+
+
+async def test_phases_spread_evenly(scheduler):
+    """Test registered pollers get evenly spaced phases."""
+    members = [object() for _ in range(4)]
+    for member in members:
+        scheduler.async_register(member)
+
+    assert [scheduler.phase(member) for member in members] == [0, 0.25, 0.5, 0.75]
+
+
+async def test_phases_rebalance_on_remove(scheduler):
+    """Test removing a poller rebalances the remaining phases."""
+    first, second = object(), object()
+    remove = scheduler.async_register(first)
+    scheduler.async_register(second)
+
+    remove()
+
+    assert scheduler.phase(second) == 0
+
+
+async def test_delay_lands_on_phase_slot(scheduler):
+    """Test delays align each poller to its own slot."""
+    members = [object() for _ in range(10)]
+    for member in members:
+        scheduler.async_register(member)
+    scheduler.hass.loop = MagicMock()
+    scheduler.hass.loop.time.return_value = 1000.0
+
+    slots = sorted((1000.0 + scheduler.delay(member, 30)) % 30 for member in members)
+
+    assert slots == pytest.approx([3.0 * i for i in range(10)])
+    assert all(15 <= scheduler.delay(member, 30) < 45 for member in members)
+
+
+async def test_concurrency_capped(scheduler):
+    """Test no more polls run at once than the cap allows."""
+    running = 0
+    peak = 0
+
+    async def poll():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    results = await asyncio.gather(*(scheduler.async_run(poll) for _ in range(6)))
+
+    assert all(results)
+    assert peak == 2
@@ -1,10 +1,20 @@
-"""Integration tests for Open Karotz device at 192.168.1.70."""
+"""Integration tests against a real Open Karotz device.
+
+They only run when ``OPEN_KAROTZ_HOST`` names a reachable device, e.g.
+``OPEN_KAROTZ_HOST=192.168.1.70 pytest tests/test_integration.py``.
+"""
+import os
+
 import pytest
 import aiohttp
 
-BASE_URL = "http://192.168.1.70"
+HOST = os.environ.get("OPEN_KAROTZ_HOST")
+BASE_URL = f"http://{HOST}"
 
-pytestmark = pytest.mark.asyncio
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not HOST, reason="OPEN_KAROTZ_HOST is not set"),
+]
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,103 @@
+"""Tests for the Open Karotz offline command journal."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.api import KarotzErrorKind, KarotzResult
+from custom_components.open_karotz.journal import OpenKarotzCommandJournal
+
+OFFLINE = KarotzResult(False, error=KarotzErrorKind.UNAVAILABLE)
+REJECTED = KarotzResult(False, status=500, error=KarotzErrorKind.HTTP)
+OK = KarotzResult(True, status=200)
+
+
+@pytest.fixture
+def api():
+    """Create an API stand-in that is back online."""
+    api = MagicMock()
+    api.available = True
+    api.async_request = AsyncMock(return_value=OK)
+    api.has_pending = MagicMock(return_value=False)
+    return api
+
+
+@pytest.fixture
+async def journal(api):
+    """Create a loaded journal."""
+    with patch("custom_components.open_karotz.journal.Store") as store:
+        store.return_value.async_load = AsyncMock(return_value=None)
+        journal = OpenKarotzCommandJournal(MagicMock(), api, "entry")
+        await journal.async_load()
+        yield journal
+
+
+async def test_missed_commands_collapse_per_class(journal):
+    """Test only the last command of each class is kept, in order."""
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+    journal.observe("ears", "/cgi-bin/ears?left=1&right=1", OFFLINE)
+    journal.observe("led", "/cgi-bin/leds?color=00FF00", OFFLINE)
+    journal.observe("volume", "/cgi-bin/volume?level=10", REJECTED)
+
+    assert list(journal.entries.items()) == [
+        ("ears", "/cgi-bin/ears?left=1&right=1"),
+        ("led", "/cgi-bin/leds?color=00FF00"),
+    ]
+
+
+async def test_delivered_command_clears_class(journal):
+    """Test a command accepted live supersedes the journaled one."""
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+    journal.observe("led", "/cgi-bin/leds?color=0000FF", OK)
+
+    assert journal.entries == {}
+
+
+async def test_replay_in_order(journal, api):
+    """Test pending commands are replayed in order and cleared."""
+    journal.observe("power", "/cgi-bin/wake_up", OFFLINE)
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+
+    assert await journal.async_replay() == 2
+
+    assert [call.args[0] for call in api.async_request.await_args_list] == [
+        "/cgi-bin/wake_up",
+        "/cgi-bin/leds?color=FF0000",
+    ]
+    assert journal.entries == {}
+    assert journal.stats["replayed"] == 2
+
+
+async def test_replay_skips_class_with_live_command(journal, api):
+    """Test a live command waiting in the queue wins over the journal."""
+    journal.observe("power", "/cgi-bin/wake_up", OFFLINE)
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+    api.has_pending.side_effect = lambda command_class: command_class == "led"
+
+    assert await journal.async_replay() == 1
+
+    api.async_request.assert_awaited_once_with(
+        "/cgi-bin/wake_up", command_class="power"
+    )
+
+
+async def test_replay_stops_at_failure(journal, api):
+    """Test a failing replay keeps the remaining commands."""
+    journal.observe("power", "/cgi-bin/wake_up", OFFLINE)
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+    api.async_request.return_value = OFFLINE
+
+    assert await journal.async_replay() == 0
+
+    api.async_request.assert_awaited_once()
+    assert len(journal.entries) == 2
+
+
+async def test_replay_scheduled_when_device_returns(journal, api):
+    """Test the journal replays once the breaker closes."""
+    journal.observe("led", "/cgi-bin/leds?color=FF0000", OFFLINE)
+    listener = api.async_add_listener.call_args.args[0]
+
+    listener()
+
+    journal.hass.async_create_background_task.assert_called_once()
+    journal.hass.async_create_background_task.call_args.args[0].close()
@@ -1,75 +1,60 @@
 """Tests for Open Karotz light platform."""
-from unittest.mock import MagicMock, patch
-
-import pytest
-
 from custom_components.open_karotz.light import OpenKarotzLed
 
 
-@pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
-
-
-def test_led_initial_state():
+def test_led_initial_state(coordinator):
     """Test LED initial state."""
-    led = OpenKarotzLed("192.168.1.70", "test_id")
+    led = OpenKarotzLed(coordinator, "test_id")
     
     assert led.is_on is False
     assert led.rgb_color == (0, 0, 0)
 
 
-def test_led_rgb_color_property():
+def test_led_rgb_color_property(coordinator):
     """Test LED RGB color property."""
-    led = OpenKarotzLed("192.168.1.70", "test_id")
+    led = OpenKarotzLed(coordinator, "test_id")
     led._rgb_color = (255, 128, 64)
     
     assert led.rgb_color == (255, 128, 64)
 
 
-async def test_led_turn_on():
-    """Test LED turn on."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        led = OpenKarotzLed("192.168.1.70", "test_id")
-        await led.async_turn_on(rgb_color=(255, 0, 0))
-        
-        assert led.is_on is True
-        assert led.rgb_color == (255, 0, 0)
+async def test_led_turn_on(coordinator, api):
+    """Test LED turn on sends the color as hex."""
+    led = OpenKarotzLed(coordinator, "test_id")
+    await led.async_turn_on(rgb_color=(255, 128, 0))
+
+    api.set_led_color.assert_awaited_once_with("FF8000")
+    assert led.is_on is True
+    assert led.rgb_color == (255, 128, 0)
+
+
+async def test_led_turn_on_keeps_color(coordinator, api):
+    """Test LED turn on without a color reuses the current one."""
+    led = OpenKarotzLed(coordinator, "test_id")
+    led._rgb_color = (0, 0, 255)
+    await led.async_turn_on()
+
+    api.set_led_color.assert_awaited_once_with("0000FF")
 
 
-async def test_led_turn_off():
+async def test_led_turn_off(coordinator, api):
     """Test LED turn off."""
-    led = OpenKarotzLed("192.168.1.70", "test_id")
+    led = OpenKarotzLed(coordinator, "test_id")
     led._rgb_color = (255, 255, 255)
     led._attr_is_on = True
-    
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        await led.async_turn_off()
-        
-        assert led.is_on is False
-        assert led.rgb_color == (0, 0, 0)
-
-
-async def test_led_turn_on_failure():
-    """Test LED turn on with failed response."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        led = OpenKarotzLed("192.168.1.70", "test_id")
-        await led.async_turn_on(rgb_color=(255, 0, 0))
-        
-        assert led.is_on is True
-        assert led.rgb_color == (255, 0, 0)
\ No newline at end of file
+
+    await led.async_turn_off()
+
+    api.set_led_color.assert_awaited_once_with("000000")
+    assert led.is_on is False
+    assert led.rgb_color == (0, 0, 0)
+
+
+async def test_led_turn_on_failure(coordinator, api):
+    """Test LED state is kept optimistically when the command fails."""
+    api.set_led_color.return_value = False
+    led = OpenKarotzLed(coordinator, "test_id")
+    await led.async_turn_on(rgb_color=(255, 0, 0))
+
+    assert led.is_on is True
+    assert led.rgb_color == (255, 0, 0)
@@ -0,0 +1,210 @@
+"""Tests for the Open Karotz media proxy cache."""
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.media import (
+    MediaStream,
+    MediaTooLarge,
+    OpenKarotzMediaCache,
+    url_key,
+)
+
+BODIES = {
+    "http://example.com/chime.mp3": b"chime" * 10,
+    "http://mirror.example.com/chime.mp3": b"chime" * 10,
+    "http://example.com/door.wav": b"door" * 20,
+}
+
+
+class _Response:
+    """Streaming response stand-in."""
+
+    def __init__(self, body):
+        self.headers = {"Content-Type": "audio/mpeg"}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        body = self._body
+
+        class _Content:
+            async def iter_chunked(self, size):
+                for start in range(0, len(body), size):
+                    yield body[start:start + size]
+
+        return _Content()
+
+
+@pytest.fixture
+def hass():
+    """Create a hass stand-in running executor jobs inline."""
+    hass = MagicMock()
+
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    hass.async_create_task = lambda coro: asyncio.get_running_loop().create_task(coro)
+    return hass
+
+
+@pytest.fixture
+def session():
+    """Create a client session serving the test bodies."""
+    session = MagicMock()
+    session.get = MagicMock(side_effect=lambda url, **kwargs: _Response(BODIES[url]))
+    return session
+
+
+@pytest.fixture
+async def cache(hass, session, tmp_path):
+    """Create a loaded media cache in a temporary directory."""
+    with patch("custom_components.open_karotz.media.Store") as store, patch(
+        "custom_components.open_karotz.media.async_get_clientsession",
+        return_value=session,
+    ):
+        store.return_value.async_load = AsyncMock(return_value=None)
+        cache = OpenKarotzMediaCache(hass, str(tmp_path / "media"), max_bytes=150)
+        await cache.async_load()
+        yield cache
+
+
+async def test_fetch_downloads_once(cache, session):
+    """Test repeated and concurrent fetches download a URL once."""
+    url = "http://example.com/chime.mp3"
+
+    first, second = await asyncio.gather(cache.async_fetch(url), cache.async_fetch(url))
+    third = await cache.async_fetch(url)
+
+    assert first == second == third
+    assert session.get.call_count == 1
+    with open(cache.file_path(first["hash"]), "rb") as media_file:
+        assert media_file.read() == BODIES[url]
+    assert first["content_type"] == "audio/mpeg"
+    assert cache.stats["misses"] == 1
+
+
+async def test_open_streams_miss_while_caching(cache, session):
+    """Test a miss is relayed chunk by chunk and cached on the way."""
+    url = "http://example.com/door.wav"
+
+    stream = await cache.async_open(url)
+
+    assert isinstance(stream, MediaStream)
+    assert stream.content_type == "audio/mpeg"
+    assert b"".join([chunk async for chunk in stream]) == BODIES[url]
+    entry = await cache.async_open(url)
+    assert entry == cache.peek(url)
+    with open(cache.file_path(entry["hash"]), "rb") as media_file:
+        assert media_file.read() == BODIES[url]
+    assert session.get.call_count == 1
+
+
+async def test_open_raises_before_first_byte(cache, session):
+    """Test a download failing up front is raised for the redirect."""
+    session.get.side_effect = OSError("unreachable")
+
+    with pytest.raises(OSError):
+        await cache.async_open("http://example.com/door.wav")
+
+
+async def test_identical_content_shares_file(cache):
+    """Test URLs serving the same file are stored once."""
+    await cache.async_fetch("http://example.com/chime.mp3")
+    await cache.async_fetch("http://mirror.example.com/chime.mp3")
+
+    assert cache.stats["entries"] == 2
+    assert cache.stats["files"] == 1
+    assert cache.stats["bytes"] == 50
+
+
+async def test_least_recently_used_evicted(cache):
+    """Test the least recently played URL is evicted over budget."""
+    await cache.async_fetch("http://example.com/chime.mp3")
+    await cache.async_fetch("http://example.com/door.wav")
+    cache.get("http://example.com/chime.mp3")
+    await cache.async_fetch("http://mirror.example.com/chime.mp3")
+    assert cache.stats["bytes"] == 130
+
+    cache._max_bytes = 100
+    await cache._async_evict()
+
+    assert cache.get("http://example.com/door.wav") is None
+    assert cache.get("http://example.com/chime.mp3") is not None
+    assert cache.stats["bytes"] == 50
+
+
+async def test_too_large_download_discarded(cache, tmp_path):
+    """Test oversized downloads are aborted and cleaned up."""
+    cache._max_file_bytes = 10
+
+    with pytest.raises(MediaTooLarge):
+        await cache.async_fetch("http://example.com/door.wav")
+
+    assert cache.get("http://example.com/door.wav") is None
+    assert os.listdir(tmp_path / "media") == []
+
+
+async def test_open_redirects_announced_large_file(cache, session):
+    """Test a body announced as too large is refused before streaming."""
+    response = _Response(BODIES["http://example.com/door.wav"])
+    response.headers["Content-Length"] = "80"
+    session.get.side_effect = lambda url, **kwargs: response
+    cache._max_file_bytes = 10
+
+    with pytest.raises(MediaTooLarge):
+        await cache.async_open("http://example.com/door.wav")
+
+
+async def test_open_relays_large_file_without_caching(cache):
+    """Test a body growing too large midway is relayed whole but not cached."""
+    url = "http://example.com/door.wav"
+    cache._max_file_bytes = 10
+
+    stream = await cache.async_open(url)
+
+    assert b"".join([chunk async for chunk in stream]) == BODIES[url]
+    await asyncio.sleep(0)
+    assert cache.peek(url) is None
+
+
+def test_local_url_tokens(cache):
+    """Test proxy URLs carry a stable unguessable token."""
+    url = "http://example.com/chime.mp3?x=1"
+    with patch(
+        "custom_components.open_karotz.media.get_url", return_value="http://ha.local:8123"
+    ):
+        local = cache.local_url(url)
+        assert cache.local_url(url) == local
+
+    assert local.startswith("http://ha.local:8123/api/open_karotz/media/")
+    assert local.endswith(".mp3")
+    token = local.rsplit("/", 1)[1].partition(".")[0]
+    assert cache.token_url(token) == url
+    assert cache.token_url("guess") is None
+    assert url_key(url) != token
+
+
+async def test_pinned_urls_not_evicted(cache):
+    """Test pinned URLs survive eviction."""
+    await cache.async_fetch("http://example.com/door.wav")
+    await cache.async_fetch("http://example.com/chime.mp3")
+    cache.set_pinned("entry", ["http://example.com/door.wav"])
+
+    cache._max_bytes = 100
+    await cache._async_evict()
+
+    assert cache.peek("http://example.com/door.wav") is not None
+    assert cache.peek("http://example.com/chime.mp3") is None
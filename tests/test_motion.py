@@ -0,0 +1,97 @@
+"""Tests for Open Karotz motion detection."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.const import EVENT_MOTION
+from custom_components.open_karotz.motion import (
+    OpenKarotzMotionDetector,
+    _process_frame,
+    parse_region,
+)
+
+
+def test_parse_region():
+    """Test motion regions are parsed and validated."""
+    assert parse_region("0,0.5,1,1") == (0, 0.5, 1, 1)
+    with pytest.raises(ValueError):
+        parse_region("0.5,0,0.2,1")
+    with pytest.raises(ValueError):
+        parse_region("0,0,1")
+
+
+def test_process_frame_detects_change():
+    """Test changed pixels inside the region are measured."""
+    pytest.importorskip("numpy")
+    image_module = pytest.importorskip("PIL.Image")
+    import io
+
+    def jpeg(color):
+        buffer = io.BytesIO()
+        frame = image_module.new("L", (640, 480), 0)
+        frame.paste(color, (0, 0, 320, 480))
+        frame.save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    previous, score = _process_frame(jpeg(0), None, (0, 0, 1, 1))
+    assert score == 0.0
+
+    _, score = _process_frame(jpeg(255), previous, (0, 0, 1, 1))
+    assert 40 < score < 60
+
+    _, score = _process_frame(jpeg(255), previous, (0.5, 0, 1, 1))
+    assert score < 5
+
+
+@pytest.fixture
+async def detector():
+    """Create a detector with a hass stand-in running jobs inline."""
+    hass = MagicMock()
+
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    return OpenKarotzMotionDetector(hass, MagicMock(), "test_entry_id", threshold=5)
+
+
+async def test_motion_state_and_events(detector):
+    """Test motion is reported and cleared with events."""
+    changes = []
+    detector.async_add_listener(lambda: changes.append(detector.motion))
+
+    with patch(
+        "custom_components.open_karotz.motion._process_frame",
+        side_effect=[("frame", 0.0), ("frame", 12.0), ("frame", 1.0)],
+    ):
+        for _ in range(3):
+            await detector._async_process(b"jpeg")
+
+    assert changes == [True, False]
+    events = [call.args for call in detector.hass.bus.async_fire.call_args_list]
+    assert events[0] == (
+        EVENT_MOTION,
+        {"entry_id": "test_entry_id", "motion": True, "score": 12.0},
+    )
+    assert events[1][1]["motion"] is False
+
+
+async def test_disable_clears_state(detector):
+    """Test disabling stops detection and clears motion."""
+    detector.hass.async_create_background_task = (
+        lambda coro, name: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def async_get(max_age):
+        await asyncio.sleep(3600)
+
+    detector._snapshots.async_get = async_get
+
+    detector.async_enable()
+    assert detector.enabled
+    detector.motion = True
+    detector.async_disable()
+
+    assert not detector.enabled
+    assert not detector.motion
@@ -0,0 +1,23 @@
+"""Tests for the Open Karotz notify platform."""
+from unittest.mock import MagicMock
+
+from custom_components.open_karotz.const import DOMAIN
+from custom_components.open_karotz.notify import OpenKarotzNotificationService
+
+
+async def test_notification_uses_live_entry_data():
+    """Test messages follow reloads and are dropped once unloaded."""
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"test_id": MagicMock()}}
+    service = OpenKarotzNotificationService(hass, "test_id")
+
+    reloaded = MagicMock()
+    hass.data[DOMAIN]["test_id"] = reloaded
+    await service.async_send_message("Dinner", title="Home", data={"voice": 3})
+    reloaded.announcements.async_add.assert_called_once_with(
+        "Home: Dinner", "3", "normal"
+    )
+
+    del hass.data[DOMAIN]["test_id"]
+    await service.async_send_message("Ignored")
+    reloaded.announcements.async_add.assert_called_once()
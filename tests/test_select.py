@@ -1,62 +1,58 @@
 """Tests for Open Karotz select platform."""
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from custom_components.open_karotz.catalog import OpenKarotzCatalog
+from custom_components.open_karotz.const import MOOD_DEFAULT_DURATION, MOOD_IDS
 from custom_components.open_karotz.select import OpenKarotzMood
 
 
 @pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
+def audio():
+    """Create an audio scheduler stand-in."""
+    audio = MagicMock()
+    audio.async_play = AsyncMock(return_value=True)
+    return audio
 
 
-def test_mood_initial_state():
+@pytest.fixture
+def mood(api, audio):
+    """Create a mood select backed by the built-in catalog."""
+    mood = OpenKarotzMood(
+        api, OpenKarotzCatalog(MagicMock(), api, "test_id"), audio, "test_id"
+    )
+    mood.async_write_ha_state = MagicMock()
+    return mood
+
+
+def test_mood_initial_state(mood):
     """Test mood initial state."""
-    mood = OpenKarotzMood("192.168.1.70", "test_id")
-    
     assert mood.current_option == "1"
-    assert len(mood.options) == 50
-
-
-async def test_mood_select_option():
-    """Test mood select option."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        mood = OpenKarotzMood("192.168.1.70", "test_id")
-        await mood.async_select_option("5")
-        
-        assert mood.current_option == "5"
-
-
-async def test_mood_select_invalid_option():
-    """Test mood select invalid option."""
-    mood = OpenKarotzMood("192.168.1.70", "test_id")
-    
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        await mood.async_select_option("999")
-        
-        assert mood.current_option == "1"
-
-
-async def test_mood_play_random():
-    """Test mood play random."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        mood = OpenKarotzMood("192.168.1.70", "test_id")
-        await mood.async_play_random()
-        
-        assert mood.current_option is not None
\ No newline at end of file
+    assert mood.options == MOOD_IDS
+
+
+async def test_mood_select_invalid_option(mood, audio):
+    """Test unknown moods are ignored."""
+    await mood.async_select_option("999")
+
+    audio.async_play.assert_not_awaited()
+    assert mood.current_option == "1"
+
+
+async def test_mood_play_random(mood, api, audio):
+    """Test random moods are queued on the audio scheduler."""
+    await mood.async_play_random()
+
+    audio.async_play.assert_awaited_once_with(
+        api.play_random_mood, "Random mood", MOOD_DEFAULT_DURATION
+    )
+
+
+async def test_mood_plays_through_audio_scheduler(mood, audio):
+    """Test moods are queued on the audio scheduler."""
+    await mood.async_select_option("5")
+
+    audio.async_play.assert_awaited_once()
+    assert audio.async_play.await_args.args[1] == "Mood 5"
+    assert mood.current_option == "5"
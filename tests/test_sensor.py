@@ -1,21 +1,16 @@
 """Tests for Open Karotz sensor platform."""
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
 from custom_components.open_karotz.sensor import (
-    OpenKarotzCoordinator,
     KarotzStorageSensor,
+    PollIntervalSensor,
+    StagingCandidatesSensor,
     UsbStorageSensor,
 )
 
 
-@pytest.fixture
-def coordinator(hass):
-    """Create a coordinator instance."""
-    return OpenKarotzCoordinator(hass, "192.168.1.70")
-
-
 @pytest.fixture
 def entry():
     """Create a config entry."""
@@ -25,52 +20,13 @@ def entry():
     return entry
 
 
-async def test_coordinator_async_update_data_success(coordinator):
-    """Test coordinator data update with successful response."""
-    mock_data = {
-        "karotz": {"percent_used_space": 45},
-        "usb": {"percent_used_space": 30}
-    }
-    
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_resp.json = AsyncMock(return_value=mock_data)
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        result = await coordinator._async_update_data()
-        
-        assert result is not None
-        assert result["karotz"]["percent_used_space"] == 45
-
-
-async def test_coordinator_async_update_data_failure(coordinator):
-    """Test coordinator data update with failed response."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        result = await coordinator._async_update_data()
-        
-        assert result is None
-
-
-async def test_coordinator_async_update_data_exception(coordinator):
-    """Test coordinator data update with exception."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_session.return_value.get.return_value.__aenter__.side_effect = Exception("Connection error")
-        
-        result = await coordinator._async_update_data()
-        
-        assert result is None
-
-
 def test_karotz_sensor_native_value(coordinator, entry):
     """Test Karotz sensor native value."""
     coordinator.data = {
-        "karotz": {"percent_used_space": 45},
-        "usb": {"percent_used_space": 30}
+        "storage": {
+            "karotz": {"percent_used_space": 45},
+            "usb": {"percent_used_space": 30}
+        }
     }
     
     sensor = KarotzStorageSensor(coordinator, entry)
@@ -90,8 +46,10 @@ def test_karotz_sensor_no_data(coordinator, entry):
 def test_usb_sensor_native_value(coordinator, entry):
     """Test USB sensor native value."""
     coordinator.data = {
-        "karotz": {"percent_used_space": 45},
-        "usb": {"percent_used_space": 30}
+        "storage": {
+            "karotz": {"percent_used_space": 45},
+            "usb": {"percent_used_space": 30}
+        }
     }
     
     sensor = UsbStorageSensor(coordinator, entry)
@@ -102,8 +60,10 @@ def test_usb_sensor_native_value(coordinator, entry):
 def test_usb_sensor_not_connected(coordinator, entry):
     """Test USB sensor when not connected."""
     coordinator.data = {
-        "karotz": {"percent_used_space": 45},
-        "usb": {"percent_used_space": -1}
+        "storage": {
+            "karotz": {"percent_used_space": 45},
+            "usb": {"percent_used_space": -1}
+        }
     }
     
     sensor = UsbStorageSensor(coordinator, entry)
@@ -115,10 +75,39 @@ def test_usb_sensor_not_connected(coordinator, entry):
 def test_usb_sensor_available(coordinator, entry):
     """Test USB sensor when connected."""
     coordinator.data = {
-        "karotz": {"percent_used_space": 45},
-        "usb": {"percent_used_space": 30}
+        "storage": {
+            "karotz": {"percent_used_space": 45},
+            "usb": {"percent_used_space": 30}
+        }
     }
     
     sensor = UsbStorageSensor(coordinator, entry)
     
-    assert sensor.available is True
\ No newline at end of file
+    assert sensor.available is True
+
+def test_poll_interval_sensor(coordinator, entry):
+    """Test the poll interval sensor reports the coordinator cadence."""
+    coordinator.poll_interval = 5.0
+
+    sensor = PollIntervalSensor(coordinator, entry)
+
+    assert sensor.native_value == 5.0
+
+
+def test_staging_candidates_sensor(coordinator, entry):
+    """Test the staging sensor counts and lists the candidates."""
+    staging = MagicMock()
+    staging.candidates = [
+        {
+            "url": "http://example.com/chime.mp3",
+            "name": "abababababababab.mp3",
+            "file": "/config/open_karotz_media/abab",
+            "size": 1000,
+            "plays": 3,
+        }
+    ]
+
+    sensor = StagingCandidatesSensor(coordinator, entry, staging)
+
+    assert sensor.native_value == 1
+    assert sensor.extra_state_attributes == {"candidates": staging.candidates}
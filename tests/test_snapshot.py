@@ -0,0 +1,211 @@
+"""Tests for the Open Karotz snapshot cache."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.snapshot import (
+    OpenKarotzSnapshotCache,
+    OpenKarotzSnapshotStream,
+    OpenKarotzThumbnailCache,
+)
+
+
+@pytest.fixture
+def api():
+    """Create an API stand-in with a slow snapshot capture."""
+    api = MagicMock()
+    api.host = "192.168.1.70"
+    api.captures = 0
+
+    async def capture_snapshot():
+        api.captures += 1
+        await asyncio.sleep(0.01)
+        return b"\xff\xd8frame%d" % api.captures
+
+    async def stream_snapshot(on_chunk):
+        api.captures += 1
+        for part in (b"\xff\xd8", b"frame%d" % api.captures):
+            await asyncio.sleep(0.005)
+            on_chunk(part)
+        return True
+
+    api.capture_snapshot = capture_snapshot
+    api.stream_snapshot = stream_snapshot
+    return api
+
+
+async def test_concurrent_requests_share_capture(api):
+    """Test concurrent viewers cost a single capture."""
+    cache = OpenKarotzSnapshotCache(api, max_age=5)
+
+    images = await asyncio.gather(*(cache.async_get() for _ in range(5)))
+
+    assert images == [b"\xff\xd8frame1"] * 5
+    assert api.captures == 1
+    assert cache.stats == {"hits": 4, "captures": 1}
+
+
+async def test_streamed_capture_shared_and_cached(api):
+    """Test streamed viewers share one capture that is cached afterwards."""
+    cache = OpenKarotzSnapshotCache(api, max_age=5)
+
+    async def read():
+        return b"".join([chunk async for chunk in cache.async_stream()])
+
+    images = await asyncio.gather(read(), read(), cache.async_get())
+
+    assert images == [b"\xff\xd8frame1"] * 3
+    assert await read() == b"\xff\xd8frame1"
+    assert api.captures == 1
+    assert cache.image == b"\xff\xd8frame1"
+
+
+async def test_cached_until_max_age(api):
+    """Test snapshots are reused until they are older than the max age."""
+    cache = OpenKarotzSnapshotCache(api, max_age=5)
+
+    await cache.async_get()
+    assert await cache.async_get() == b"\xff\xd8frame1"
+
+    cache._captured_at -= 10
+    assert await cache.async_get() == b"\xff\xd8frame2"
+    assert api.captures == 2
+
+
+async def test_oversized_snapshot_not_retained(api):
+    """Test images above the size bound are returned but not cached."""
+    cache = OpenKarotzSnapshotCache(api, max_age=5, max_bytes=4)
+
+    assert await cache.async_get() == b"\xff\xd8frame1"
+    assert cache.image is None
+    assert await cache.async_get() == b"\xff\xd8frame2"
+
+
+async def test_stream_fans_out_frames(api):
+    """Test one producer feeds every viewer."""
+    stream = OpenKarotzSnapshotStream(OpenKarotzSnapshotCache(api), target_fps=50)
+    first = stream.subscribe()
+    second = stream.subscribe()
+
+    frames = await asyncio.gather(first.get(), second.get())
+
+    assert frames[0] == frames[1]
+    await stream.async_close()
+
+
+async def test_stream_pauses_without_viewers(api):
+    """Test the producer stops when the last viewer leaves."""
+    stream = OpenKarotzSnapshotStream(OpenKarotzSnapshotCache(api), target_fps=50)
+    queue = stream.subscribe()
+    await queue.get()
+
+    stream.unsubscribe(queue)
+    await asyncio.sleep(0.05)
+    captures = api.captures
+    await asyncio.sleep(0.05)
+
+    assert stream.subscribers == 0
+    assert api.captures == captures
+
+
+async def test_stream_close_wakes_viewers(api):
+    """Test closing the stream ends viewers waiting for a frame."""
+    stream = OpenKarotzSnapshotStream(OpenKarotzSnapshotCache(api), target_fps=50)
+    queue = stream.subscribe()
+    await queue.get()
+    waiting = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+
+    await stream.async_close()
+
+    assert await asyncio.wait_for(waiting, 1) is None
+    assert stream.subscribers == 0
+
+
+async def test_stream_adapts_to_latency(api):
+    """Test slow captures lower the frame rate."""
+    stream = OpenKarotzSnapshotStream(OpenKarotzSnapshotCache(api), target_fps=1000)
+    queue = stream.subscribe()
+    for _ in range(3):
+        await queue.get()
+
+    assert stream.interval > 1 / 1000
+    await stream.async_close()
+
+
+@pytest.fixture
+async def thumbnails():
+    """Create a thumbnail cache with a hass stand-in running jobs inline."""
+    hass = MagicMock()
+    loop = asyncio.get_running_loop()
+    hass.async_create_task = loop.create_task
+
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    return OpenKarotzThumbnailCache(hass, max_bytes=20)
+
+
+def _fake_scale(image, width, height):
+    """Return a fake scaled image."""
+    return b"%dx%d" % (width, height)
+
+
+async def test_thumbnail_cached_by_hash_and_size(thumbnails):
+    """Test repeated renders of the same frame are memory hits."""
+    with patch(
+        "custom_components.open_karotz.snapshot._scale_image", side_effect=_fake_scale
+    ) as scale:
+        results = await asyncio.gather(
+            thumbnails.async_get(b"frame", 320, 240),
+            thumbnails.async_get(b"frame", 320, 240),
+        )
+        await thumbnails.async_get(b"frame", 320, 240)
+        await thumbnails.async_get(b"frame", 160, 120)
+
+    assert results == [b"320x240", b"320x240"]
+    assert scale.call_count == 2
+    assert thumbnails.stats["hits"] == 2
+
+
+async def test_thumbnail_evicted_by_bytes(thumbnails):
+    """Test least recently used thumbnails are evicted over budget."""
+    with patch(
+        "custom_components.open_karotz.snapshot._scale_image", side_effect=_fake_scale
+    ):
+        await thumbnails.async_get(b"first", 320, 240)
+        await thumbnails.async_get(b"second", 320, 240)
+        await thumbnails.async_get(b"first", 320, 240)
+        await thumbnails.async_get(b"third", 320, 240)
+
+    assert thumbnails.stats["entries"] == 2
+    assert thumbnails.stats["bytes"] <= 20
+    assert thumbnails.stats["misses"] == 3
+
+
+async def test_push_trigger_replaces_pull(api):
+    """Test captures wait for a pushed upload instead of pulling."""
+    cache = OpenKarotzSnapshotCache(api)
+
+    async def trigger():
+        asyncio.get_running_loop().call_soon(cache.push, b"\xff\xd8pushed")
+        return True
+
+    cache.set_push_trigger(trigger)
+
+    assert await cache.async_get() == b"\xff\xd8pushed"
+    assert api.captures == 0
+
+
+async def test_push_trigger_falls_back_to_pull(api):
+    """Test a failed trigger falls back to an HTTP capture."""
+    cache = OpenKarotzSnapshotCache(api)
+
+    async def trigger():
+        return False
+
+    cache.set_push_trigger(trigger)
+
+    assert await cache.async_get() == b"\xff\xd8frame1"
@@ -0,0 +1,112 @@
+"""Tests for Open Karotz sound staging."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.open_karotz.const import CATALOG_SOUNDS, STAGING_CATALOG_MAX_AGE
+from custom_components.open_karotz.staging import OpenKarotzSoundStager, staged_name
+
+URL = "http://example.com/chime.mp3"
+DIGEST = "ab" * 32
+
+
+@pytest.fixture
+def media():
+    """Create a media cache stand-in holding one clip."""
+    media = MagicMock()
+    entries = {URL: {"hash": DIGEST, "size": 1000}}
+    media.peek = MagicMock(side_effect=entries.get)
+    media.file_path = MagicMock(side_effect=lambda digest: f"/media/{digest}")
+    return media
+
+
+@pytest.fixture
+def catalog():
+    """Create a catalog stand-in with the built-in sounds."""
+    catalog = MagicMock()
+    catalog.sounds = {"bip1": "bip1"}
+    catalog.get = MagicMock(side_effect=lambda kind: catalog.sounds)
+    return catalog
+
+
+@pytest.fixture
+def coordinator():
+    """Create a coordinator stand-in reporting 45% used storage."""
+    coordinator = MagicMock()
+    coordinator.data = {"storage": {"karotz": {"percent_used_space": "45"}}}
+    return coordinator
+
+
+@pytest.fixture
+async def stager(media, catalog, coordinator):
+    """Create a loaded stager."""
+    with patch("custom_components.open_karotz.staging.Store") as store:
+        store.return_value.async_load = AsyncMock(return_value=None)
+        stager = OpenKarotzSoundStager(
+            MagicMock(), "entry", media, catalog, coordinator, max_bytes=10000
+        )
+        await stager.async_load()
+        yield stager
+
+
+def test_staged_name():
+    """Test staged clips are named after their content hash."""
+    assert staged_name(URL, DIGEST) == "abababababababab.mp3"
+
+
+async def test_hot_clip_pinned_and_listed(stager, media):
+    """Test frequently played clips are pinned and become candidates."""
+    for _ in range(2):
+        assert stager.route(URL) is None
+    assert stager.candidates == []
+
+    assert stager.route(URL) is None
+
+    media.set_pinned.assert_called_with("entry", [URL])
+    assert stager.candidates == [
+        {
+            "url": URL,
+            "name": "abababababababab.mp3",
+            "file": f"/media/{DIGEST}",
+            "size": 1000,
+            "plays": 3,
+        }
+    ]
+
+
+async def test_staged_clip_routed_to_local_id(stager, catalog):
+    """Test plays of a clip present on the device use its local id."""
+    catalog.sounds["abababababababab"] = "abababababababab"
+
+    assert stager.route(URL) == "abababababababab"
+    assert stager.stats["routed"] == 1
+
+
+async def test_budget_follows_device_storage(stager, coordinator, media):
+    """Test the budget shrinks as the device fills up."""
+    assert stager.budget == 5000
+
+    coordinator.data["storage"]["karotz"]["percent_used_space"] = "95"
+    for _ in range(3):
+        stager.route(URL)
+
+    assert stager.budget == 0
+    media.set_pinned.assert_called_with("entry", [])
+
+
+async def test_sound_list_refreshed_while_candidates_wait(stager, catalog, coordinator):
+    """Test polls refetch the sound list only while clips wait to be copied."""
+    check = coordinator.async_add_listener.call_args.args[0]
+
+    check()
+    catalog.async_ensure_fresh.assert_not_called()
+
+    for _ in range(3):
+        stager.route(URL)
+    check()
+    catalog.async_ensure_fresh.assert_called_once_with(
+        [CATALOG_SOUNDS], STAGING_CATALOG_MAX_AGE
+    )
+
+    stager.async_close()
+    coordinator.async_add_listener.return_value.assert_called_once()
@@ -1,5 +1,5 @@
 """Tests for Open Karotz switch platform."""
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -7,69 +7,48 @@ from custom_components.open_karotz.switch import OpenKarotzSleepSwitch
 
 
 @pytest.fixture
-def entry():
-    """Create a config entry."""
-    entry = MagicMock()
-    entry.entry_id = "test_entry_id"
-    return entry
+def switch(coordinator):
+    """Create a sleep switch that is not attached to hass."""
+    switch = OpenKarotzSleepSwitch(coordinator, "test_id")
+    switch.async_write_ha_state = MagicMock()
+    return switch
 
 
-def test_switch_initial_state():
+def test_switch_initial_state(switch):
     """Test switch initial state."""
-    switch = OpenKarotzSleepSwitch("192.168.1.70", "test_id")
-    
     assert switch.is_on is False
 
 
-async def test_switch_turn_on():
-    """Test switch turn on."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        switch = OpenKarotzSleepSwitch("192.168.1.70", "test_id")
-        await switch.async_turn_on()
-        
-        assert switch.is_on is True
-
-
-async def test_switch_turn_off():
-    """Test switch turn off."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        switch = OpenKarotzSleepSwitch("192.168.1.70", "test_id")
-        switch._is_on = True
-        await switch.async_turn_off()
-        
-        assert switch.is_on is False
-
-
-async def test_switch_turn_on_failure():
-    """Test switch turn on with failed response."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        switch = OpenKarotzSleepSwitch("192.168.1.70", "test_id")
-        await switch.async_turn_on()
-        
-        assert switch.is_on is True
-
-
-async def test_switch_turn_off_failure():
-    """Test switch turn off with failed response."""
-    with patch('homeassistant.helpers.aiohttp_client.ClientSession') as mock_session:
-        mock_resp = MagicMock()
-        mock_resp.status = 500
-        mock_session.return_value.get.return_value.__aenter__.return_value = mock_resp
-        
-        switch = OpenKarotzSleepSwitch("192.168.1.70", "test_id")
-        switch._is_on = True
-        await switch.async_turn_off()
-        
-        assert switch.is_on is False
\ No newline at end of file
+async def test_switch_turn_on(switch, api):
+    """Test switch turn on wakes the device up."""
+    await switch.async_turn_on()
+
+    api.wake_up.assert_awaited_once_with()
+    assert switch.is_on is True
+    switch.async_write_ha_state.assert_called_once()
+
+
+async def test_switch_turn_off(switch, api):
+    """Test switch turn off puts the device to sleep."""
+    switch._is_on = True
+    await switch.async_turn_off()
+
+    api.sleep.assert_awaited_once_with()
+    assert switch.is_on is False
+
+
+async def test_switch_turn_on_failure(switch, api):
+    """Test switch state is kept optimistically when waking up fails."""
+    api.wake_up.return_value = False
+    await switch.async_turn_on()
+
+    assert switch.is_on is True
+
+
+async def test_switch_turn_off_failure(switch, api):
+    """Test switch state is kept optimistically when sleeping fails."""
+    api.sleep.return_value = False
+    switch._is_on = True
+    await switch.async_turn_off()
+
+    assert switch.is_on is False
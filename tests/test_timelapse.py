@@ -0,0 +1,70 @@
+"""Tests for the Open Karotz timelapse writer."""
+import io
+import struct
+
+from PIL import Image
+
+from custom_components.open_karotz.timelapse import write_timelapse
+
+
+def _jpeg(color):
+    """Return a small JPEG frame."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 24), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _write_frames(tmp_path, count):
+    """Write ``count`` JPEG files and return their paths."""
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"{index}.jpg"
+        path.write_bytes(_jpeg((index * 40, 0, 0)))
+        paths.append(str(path))
+    return paths
+
+
+def test_write_timelapse_structure(tmp_path):
+    """Test frames are written into a well-formed AVI."""
+    files = _write_frames(tmp_path, 3)
+    output = tmp_path / "out" / "timelapse.avi"
+
+    assert write_timelapse(files, str(output), 10) == 3
+
+    data = output.read_bytes()
+    assert data[:4] == b"RIFF" and data[8:12] == b"AVI "
+    assert struct.unpack_from("<I", data, 4)[0] == len(data) - 8
+    assert struct.unpack_from("<I", data, 48)[0] == 3
+    assert struct.unpack_from("<II", data, 64)[0:2] == (32, 24)
+    movi_size = struct.unpack_from("<I", data, 216)[0]
+    assert data[220:224] == b"movi"
+    idx1 = 220 + movi_size
+    assert data[idx1:idx1 + 4] == b"idx1"
+    assert struct.unpack_from("<I", data, idx1 + 4)[0] == 3 * 16
+    # Index offsets point at the frame chunks inside movi.
+    _, _, offset, size = struct.unpack_from("<4sIII", data, idx1 + 8 + 16)
+    assert data[220 + offset:220 + offset + 4] == b"00dc"
+    assert data[220 + offset + 8:220 + offset + 8 + size] == _jpeg((40, 0, 0))
+    assert not (tmp_path / "out" / "timelapse.avi.part").exists()
+
+
+def test_write_timelapse_skips_missing_frames(tmp_path):
+    """Test evicted frames are skipped and progress is reported."""
+    files = _write_frames(tmp_path, 2)
+    files.insert(1, str(tmp_path / "gone.jpg"))
+    calls = []
+
+    frames = write_timelapse(
+        files, str(tmp_path / "t.avi"), 5, lambda done, total: calls.append((done, total)), 3
+    )
+
+    assert frames == 2
+    assert calls == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_write_timelapse_without_frames(tmp_path):
+    """Test nothing is written when no frame is readable."""
+    output = tmp_path / "t.avi"
+
+    assert write_timelapse([str(tmp_path / "gone.jpg")], str(output), 5) == 0
+    assert not output.exists()